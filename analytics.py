@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+
+# Selectable analysis windows, in days (None = full history)
+RANGES = {"week": 7, "month": 30, "year": 365, "all": None}
+WEEKDAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def range_bounds(range_name, today=None):
+    today = today or date.today()
+    days = RANGES[range_name]
+    start = "0000-01-01" if days is None else (today - timedelta(days=days - 1)).isoformat()
+    return start, today.isoformat()
+
+
+class EmotionalAnalytics:
+    # Headless mood/rating analysis. Counting and grouping happen in SQL; the
+    # per-day series that comes back is processed with numpy/pandas.
+    def __init__(self, db_manager, rolling_window=7):
+        self.db_manager = db_manager
+        self.rolling_window = rolling_window
+    
+    def mood_distribution(self, start_date, end_date):
+        return dict(self.db_manager.get_mood_counts(start_date, end_date))
+    
+    def daily_ratings(self, start_date, end_date):
+        # Mean rating per calendar day, with NaN for days nothing was logged
+        rows = self.db_manager.get_daily_ratings(start_date, end_date)
+        if not rows:
+            return pd.Series(dtype=float)
+        days, ratings, _ = zip(*rows)
+        series = pd.Series(np.array(ratings, dtype=float), index=pd.DatetimeIndex(days))
+        return series.asfreq("D")
+    
+    def rolling_ratings(self, start_date, end_date, window=None):
+        window = window or self.rolling_window
+        daily = self.daily_ratings(start_date, end_date)
+        rolling = daily.rolling(window, min_periods=1)
+        return pd.DataFrame({"rating": daily, "mean": rolling.mean(), "std": rolling.std()})
+    
+    def weekday_pattern(self, start_date, end_date):
+        # {weekday name: (average rating, entries)}
+        return {
+            WEEKDAYS[weekday]: (rating, entries)
+            for weekday, rating, entries in self.db_manager.get_weekday_ratings(start_date, end_date)
+        }
+    
+    def streaks(self, start_date, end_date, today=None):
+        # (current, longest) runs of consecutive days with at least one entry
+        rows = self.db_manager.get_daily_ratings(start_date, end_date)
+        if not rows:
+            return 0, 0
+        days = np.array([row[0] for row in rows], dtype="datetime64[D]").astype(np.int64)
+        breaks = np.flatnonzero(np.diff(days) != 1) + 1
+        starts = np.concatenate(([0], breaks))
+        lengths = np.diff(np.concatenate((starts, [len(days)])))
+        
+        today = np.datetime64(today or date.today(), "D").astype(np.int64)
+        # A streak is still current if the last entry was today or yesterday
+        current = int(lengths[-1]) if today - days[-1] <= 1 else 0
+        return current, int(lengths.max())
+    
+    def summary(self, range_name, today=None):
+        start_date, end_date = range_bounds(range_name, today)
+        daily = self.rolling_ratings(start_date, end_date)
+        ratings = daily["rating"].to_numpy()
+        logged = ratings[~np.isnan(ratings)]
+        current, longest = self.streaks(start_date, end_date, today)
+        weekdays = self.weekday_pattern(start_date, end_date)
+        
+        return {
+            "range": range_name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "moods": self.mood_distribution(start_date, end_date),
+            "days_logged": int(len(logged)),
+            "average_rating": float(logged.mean()) if len(logged) else None,
+            "rating_std": float(logged.std()) if len(logged) else None,
+            "rolling_mean": float(daily["mean"].iloc[-1]) if len(daily) else None,
+            "best_weekday": max(weekdays, key=lambda day: weekdays[day][0]) if weekdays else None,
+            "weekdays": weekdays,
+            "current_streak": current,
+            "longest_streak": longest,
+        }
@@ -1,18 +1,82 @@
 import requests
 import json
+import os
+import threading
+from datetime import date
 
 class ZenQuotesAPI:
-    def __init__(self):
-        self.base_url = "https://zenquotes.io/api/today"
-    
-    def get_thought_of_day(self):
+    # (connect, read) timeouts in seconds
+    TIMEOUT = (3.05, 5)
+    FALLBACK_QUOTE = "The best way to get started is to quit talking and begin doing. - Walt Disney"
+    OFFLINE_QUOTE = "The future depends on what you do today. - Mahatma Gandhi"
+
+    def __init__(self, base_url="https://zenquotes.io/api/today", cache_path="quote_cache.json"):
+        self.base_url = base_url
+        self.cache_path = cache_path
+        # One session so repeat fetches reuse the pooled keep-alive connection
+        self.session = requests.Session()
+        self._fetch_lock = threading.Lock()
+
+    def get_cached_thought(self, any_day=False):
+        # Today's quote from the disk cache, or None if we haven't fetched it
+        # yet; with any_day, the last quote fetched whatever its date
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict):
+            return None
+        if any_day or cached.get("date") == date.today().isoformat():
+            return cached.get("quote")
+        return None
+
+    def save_cached_thought(self, quote):
+        data = {"date": date.today().isoformat(), "quote": quote}
+        tmp_path = self.cache_path + ".tmp"
         try:
-            response = requests.get(self.base_url)
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    quote = data[0]
-                    return f"\"{quote['q']}\" - {quote['a']}"
-            return "The best way to get started is to quit talking and begin doing. - Walt Disney"
-        except:
-            return "The future depends on what you do today. - Mahatma Gandhi"
\ No newline at end of file
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def fetch_thought(self):
+        response = self.session.get(self.base_url, timeout=self.TIMEOUT)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if data and len(data) > 0:
+            quote = data[0]
+            return f"\"{quote['q']}\" - {quote['a']}"
+        return None
+
+    def get_thought_of_day(self):
+        cached = self.get_cached_thought()
+        if cached:
+            return cached
+        with self._fetch_lock:
+            # Another thread may have fetched it while we waited
+            cached = self.get_cached_thought()
+            if cached:
+                return cached
+            try:
+                thought = self.fetch_thought()
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                # Yesterday's quote reads better than a canned one
+                return self.get_cached_thought(any_day=True) or self.OFFLINE_QUOTE
+            if not thought:
+                return self.get_cached_thought(any_day=True) or self.FALLBACK_QUOTE
+            self.save_cached_thought(thought)
+            return thought
+
+    def get_thought_of_day_async(self, callback):
+        # Runs the fetch on a daemon thread and hands the text to callback there;
+        # GUI callers should marshal back with wx.CallAfter
+        thread = threading.Thread(
+            target=lambda: callback(self.get_thought_of_day()),
+            name="thought-of-day",
+            daemon=True
+        )
+        thread.start()
+        return thread
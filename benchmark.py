@@ -0,0 +1,382 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from database import DatabaseManager
+from models import Task
+from task_store import TaskStore
+
+# Reproducible timings for the database, analytics/chart and page-build hot
+# paths. Synthetic databases are seeded once per (size, seed) and reused.
+#
+#   python benchmark.py --sizes 1000,100000 --out before.json
+#   python benchmark.py --sizes 1000,100000 --compare before.json
+#   xvfb-run -a python benchmark.py --gui        # also time MainFrame pages
+
+WORDS = ["read", "write", "review", "chapter", "essay", "math", "physics", "lab",
+         "notes", "exam", "project", "slides", "history", "draft", "quiz", "email",
+         "group", "meeting", "outline", "revise", "problem", "set", "lecture", "paper"]
+MOODS = ["Happy", "Sad", "Anxious", "Excited", "Tired", "Angry", "Peaceful", "Stressed"]
+PAGES = ["home", "add_task", "view_tasks", "timer", "emotional_tracker"]
+
+
+# -------------------- Seeding --------------------
+
+def seed_database(path, tasks, mood_years, seed, today):
+    # Tasks are spread over three years around `today`; mood entries cover the
+    # last `mood_years` years with one to three entries on most days
+    rng = random.Random(seed)
+    with DatabaseManager(path) as db:
+        conn = db.get_connection()
+        span = 3 * 365
+        first_day = today - timedelta(days=2 * 365)
+        batch = []
+        for i in range(tasks):
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+            description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+            due = first_day + timedelta(days=rng.randrange(span))
+            completed = 1 if due < today and rng.random() < 0.7 else 0
+            batch.append((title, description, due.isoformat(), completed))
+            if len(batch) == 10000 or i == tasks - 1:
+                with db.transaction():
+                    conn.executemany(
+                        "INSERT INTO tasks (title, description, due_date, completed) VALUES (?, ?, ?, ?)",
+                        batch
+                    )
+                batch = []
+
+        entries = []
+        day = today - timedelta(days=mood_years * 365)
+        while day <= today:
+            if rng.random() < 0.85:
+                for _ in range(rng.randint(1, 3)):
+                    entries.append((day.isoformat(), rng.choice(MOODS), rng.randint(1, 10),
+                                    " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8)))))
+            day += timedelta(days=1)
+        with db.transaction():
+            conn.executemany(
+                "INSERT INTO emotional_entries (date, mood, day_rating, notes) VALUES (?, ?, ?, ?)",
+                entries
+            )
+        conn.execute("ANALYZE")
+
+
+def seeded_database(workdir, tasks, mood_years, seed, today):
+    path = os.path.join(workdir, f"bench_{tasks}_{mood_years}y_{seed}_{today.isoformat()}.db")
+    if not os.path.exists(path):
+        log(f"seeding {tasks} tasks -> {path}")
+        started = time.perf_counter()
+        seed_database(path + ".tmp", tasks, mood_years, seed, today)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(path + ".tmp" + suffix):
+                os.remove(path + ".tmp" + suffix)
+        os.replace(path + ".tmp", path)
+        log(f"  seeded in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+# -------------------- Timing --------------------
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def measure(func, repeat, warmup=1):
+    for _ in range(warmup):
+        result = func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, result
+
+
+def summarize(name, size, samples, result=None):
+    entry = {
+        "name": name,
+        "size": size,
+        "runs": len(samples),
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+    if isinstance(result, (list, dict)):
+        entry["rows"] = len(result)
+    elif isinstance(result, int):
+        entry["rows"] = result
+    log(f"  {name:<40} {entry['median_ms']:>10.2f} ms")
+    return entry
+
+
+def drain(cursor):
+    # Consume a streaming cursor without keeping the rows; returns the count
+    count = 0
+    for count, _ in enumerate(cursor, 1):
+        pass
+    return count
+
+
+def database_cases(db, today):
+    busiest = db.get_connection().execute(
+        "SELECT due_date FROM tasks GROUP BY due_date ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    middle = db.get_tasks_page(1, offset=db.count_tasks() // 2, columns=("id", "due_date"))
+    after = (middle[0].due_date, middle[0].id) if middle else None
+    end = today.isoformat()
+    week = (today - timedelta(days=6)).isoformat()
+    month = (today - timedelta(days=29)).isoformat()
+    year = (today - timedelta(days=364)).isoformat()
+    # Sync only reads the changes past a watermark; this should not grow with size
+    last_seq = db.get_connection().execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    return [
+        ("get_all_tasks", lambda: db.get_all_tasks()),
+        ("get_all_tasks[list columns]", lambda: db.get_all_tasks(Task.LIST_COLUMNS)),
+        ("iter_tasks[stream]", lambda: drain(db.iter_tasks(Task.LIST_COLUMNS))),
+        ("get_tasks_page[first]", lambda: db.get_tasks_page(100)),
+        ("get_tasks_page[keyset middle]", lambda: db.get_tasks_page(100, after=after)),
+        ("get_tasks_by_date[busiest]", lambda: db.get_tasks_by_date(busiest)),
+        ("get_month_task_counts", lambda: db.get_month_task_counts(today.year, today.month)),
+        ("search_tasks[prefix]", lambda: db.search_tasks("rev ess")),
+        ("count_tasks", db.count_tasks),
+        ("get_emotional_entries[week]", lambda: db.get_emotional_entries(week, end)),
+        ("get_emotional_entries[year]", lambda: db.get_emotional_entries(year, end)),
+        ("get_emotional_entries[all]", lambda: db.get_emotional_entries("0000-01-01", end)),
+        ("get_mood_counts[month]", lambda: db.get_mood_counts(month, end)),
+        ("get_daily_ratings[year]", lambda: db.get_daily_ratings(year, end)),
+        ("get_weekday_ratings[all]", lambda: db.get_weekday_ratings("0000-01-01", end)),
+        ("get_emotional_data_version", db.get_emotional_data_version),
+        ("get_changes_since[last 10]", lambda: db.get_changes_since(last_seq - 10)[0]),
+    ]
+
+
+def analytics_cases(db, today):
+    # Imported here so the database benchmarks run without pandas/matplotlib
+    from analytics import EmotionalAnalytics
+    from chart_renderer import render_mood_pie
+    analytics = EmotionalAnalytics(db)
+    month_moods = analytics.mood_distribution((today - timedelta(days=29)).isoformat(), today.isoformat())
+    return [
+        ("analytics.summary[month]", lambda: analytics.summary("month", today)),
+        ("analytics.summary[year]", lambda: analytics.summary("year", today)),
+        ("analytics.summary[all]", lambda: analytics.summary("all", today)),
+        ("render_mood_pie[400x300]", lambda: render_mood_pie(month_moods, "Moods", "No data")),
+    ]
+
+
+def store_cases(db, today):
+    store = TaskStore(db)
+    return [
+        ("TaskStore.load", lambda: store.load() or store.count()),
+        ("TaskStore.get_month_task_counts", lambda: store.get_month_task_counts(today.year, today.month)),
+        ("TaskStore.get_row[scroll 1000]", lambda: [store.get_row(i) for i in range(1000)]),
+    ]
+
+
+def run_cases(cases, size, repeat):
+    results = []
+    for name, func in cases:
+        samples, result = measure(func, repeat)
+        results.append(summarize(name, size, samples, result))
+    return results
+
+
+def gdi_handles():
+    # GDI objects held by this process (fonts, brushes, pens); Windows only
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    user32 = ctypes.windll.user32
+    return user32.GetGuiResources(ctypes.windll.kernel32.GetCurrentProcess(), 0)
+
+
+def skipped_gui(size, reason):
+    log(f"  {'gui':<40} skipped: {reason}")
+    return {"name": "gui", "size": size, "skipped": reason}
+
+
+def run_gui(db_path, size, repeat):
+    # Times MainFrame construction and every page build and refresh. Needs a
+    # display; run under `xvfb-run -a` on headless machines.
+    try:
+        import wx
+    except ImportError as e:
+        return [skipped_gui(size, f"wxPython unavailable: {e}")]
+    if not wx.App.IsDisplayAvailable():
+        return [skipped_gui(size, "no display (use xvfb-run)")]
+    app = wx.GetApp() or wx.App(False)
+    import theme
+    from gui import MainFrame
+
+    def settle():
+        while app.Pending():
+            app.Dispatch()
+        app.ProcessPendingEvents()
+
+    results = []
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        # The seeded data is dated in the past; an archive pass would move it
+        # out from under the pages being timed
+        frame = MainFrame(db_path, archive_days=0, stall_ms=0)
+        frame.Show()
+        # Until the store has loaded on the writer thread
+        frame.db_writer.flush()
+        settle()
+        samples.append((time.perf_counter() - started) * 1000)
+        if len(samples) < repeat:
+            frame.Close(True)
+            settle()
+    results.append(summarize("MainFrame()", size, samples))
+
+    # Every page is built `repeat` times; a leak shows as handles growing
+    # with the number of builds rather than settling after the first
+    handles_before = gdi_handles()
+    for name in PAGES:
+        build, refresh = [], []
+        for _ in range(repeat):
+            page = frame.pages.pop(name, None)
+            if page is not None:
+                frame.book.DeletePage(frame.book.FindPage(page))
+                settle()
+            started = time.perf_counter()
+            frame.show_page(name)
+            settle()
+            build.append((time.perf_counter() - started) * 1000)
+
+            frame.show_page("home" if name != "home" else "timer")
+            frame.dirty_pages.add(name)
+            started = time.perf_counter()
+            frame.show_page(name)
+            settle()
+            refresh.append((time.perf_counter() - started) * 1000)
+        results.append(summarize(f"show_page[{name}] build", size, build))
+        results.append(summarize(f"show_page[{name}] cached", size, refresh))
+
+    # Style registry: fonts and colours built vs served from the cache
+    font_new, font_cached = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(1000):
+            theme._new_font(11, wx.FONTWEIGHT_BOLD, False)
+        font_new.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        for _ in range(1000):
+            theme.get_font(11, wx.FONTWEIGHT_BOLD)
+        font_cached.append((time.perf_counter() - started) * 1000)
+    results.append(summarize("1000 x new wx.Font", size, font_new))
+    results.append(summarize("1000 x theme.get_font", size, font_cached))
+    styles = {"name": "theme styles", "size": size, **theme.STYLE_STATS}
+    handles = gdi_handles()
+    if handles is not None:
+        styles["gdi_handles_before_pages"] = handles_before
+        styles["gdi_handles"] = handles
+        log(f"  {'GDI handles':<40} {handles_before} before page builds, {handles} after")
+    log(f"  {'theme styles':<40} {styles['created']} created, {styles['reused']} reused")
+    results.append(styles)
+
+    frame.Close(True)
+    settle()
+    return results
+
+
+# -------------------- Reporting --------------------
+
+def metadata(args, today):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit or None,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "mood_years": args.mood_years,
+        "today": today.isoformat(),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    # Prints median ratios against a previous run; returns the regressions
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"] if "median_ms" in r}
+    regressions = []
+    print(f"{'case':<44}{'size':>9}{'before':>11}{'after':>11}{'ratio':>8}")
+    for result in results:
+        before = baseline.get((result["name"], result["size"]))
+        if before is None or "median_ms" not in result:
+            continue
+        ratio = result["median_ms"] / max(before["median_ms"], 1e-6)
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"{result['name']:<44}{result['size']:>9}{before['median_ms']:>11.2f}"
+              f"{result['median_ms']:>11.2f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(result["name"])
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Study Zone performance benchmarks")
+    parser.add_argument("--sizes", default="1000,100000",
+                        help="comma-separated task counts, e.g. 1000,100000,1000000")
+    parser.add_argument("--mood-years", type=int, default=5, help="years of mood entries")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--today", type=date.fromisoformat, default=date(2024, 6, 15),
+                        help="fixed 'today' so runs on different days are comparable")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "studyzone-benchmarks"),
+                        help="where seeded databases are kept")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", metavar="JSON", help="compare against an earlier --out file")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median ratio reported as a regression by --compare")
+    parser.add_argument("--skip-analytics", action="store_true", help="skip the pandas/matplotlib cases")
+    parser.add_argument("--gui", action="store_true", help="also time MainFrame page builds")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    today = args.today
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for size in (int(text) for text in args.sizes.split(",")):
+        path = seeded_database(args.workdir, size, args.mood_years, args.seed, today)
+        log(f"{size} tasks")
+        with DatabaseManager(path) as db:
+            results += run_cases(database_cases(db, today), size, args.repeat)
+            results += run_cases(store_cases(db, today), size, args.repeat)
+            if not args.skip_analytics:
+                results += run_cases(analytics_cases(db, today), size, args.repeat)
+        if args.gui:
+            results += run_gui(path, size, args.repeat)
+
+    report = {"meta": metadata(args, today), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        log(f"wrote {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Raw RGBA pixels; the GUI turns these into a wx.Bitmap on the main thread
+ChartImage = namedtuple("ChartImage", ["width", "height", "rgba"])
+
+MOOD_COLORS = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99',
+               '#FF99CC', '#99FFFF', '#FFFF99', '#CC99FF']
+
+
+def render_mood_pie(mood_counts, title, empty_message, size=(400, 300), dpi=100):
+    # Uses the object-oriented Agg API only, so it is safe off the main thread
+    figure = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    if mood_counts:
+        labels = list(mood_counts.keys())
+        sizes = list(mood_counts.values())
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
+               colors=MOOD_COLORS[:len(labels)])
+        ax.set_title(title, fontsize=12)
+        ax.axis('equal')
+    else:
+        ax.text(0.5, 0.5, empty_message, ha='center', va='center', fontsize=14)
+        ax.axis('off')
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    return ChartImage(width, height, bytes(canvas.buffer_rgba()))
+
+
+class ChartRenderer:
+    # Renders charts on one background worker and caches the images by key.
+    # Keys should include everything the picture depends on, e.g. the date
+    # range and a data-version stamp, so unchanged data is never re-rendered.
+    def __init__(self, max_cached=16):
+        self.max_cached = max_cached
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-render")
+
+    def get_cached(self, key):
+        with self.lock:
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+            return image
+
+    def request(self, key, render, callback):
+        # callback(key, image, error) runs on the worker thread, or immediately
+        # on a cache hit; GUI callers should marshal it with wx.CallAfter.
+        # image is None when render raised `error`; failures are not cached.
+        image = self.get_cached(key)
+        if image is not None:
+            callback(key, image, None)
+            return None
+
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None:
+                future = self.executor.submit(self._render, key, render)
+                self.pending[key] = future
+        future.add_done_callback(
+            lambda f: callback(key, None, f.exception()) if f.exception() else callback(key, f.result(), None)
+        )
+        return future
+
+    def _render(self, key, render):
+        image = None
+        try:
+            image = render()
+            return image
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+                if image is not None:
+                    self.cache[key] = image
+                    self.cache.move_to_end(key)
+                    while len(self.cache) > self.max_cached:
+                        self.cache.popitem(last=False)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,470 @@
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+import profiles
+from database import DatabaseManager
+
+# Headless command line over DatabaseManager. Nothing here imports wx, and
+# the pandas-based analytics module is only loaded by the "analytics" command.
+
+
+def valid_date(text):
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date, got {text!r}")
+
+
+def valid_rating(text):
+    rating = int(text)
+    if not 1 <= rating <= 10:
+        raise argparse.ArgumentTypeError("rating must be between 1 and 10")
+    return rating
+
+
+def emit(record, as_json, fields):
+    # One line per record, written as soon as it is read
+    if as_json:
+        print(json.dumps({name: getattr(record, name) for name in fields}))
+    else:
+        print("\t".join("" if getattr(record, name) is None else str(getattr(record, name))
+                        for name in fields))
+
+
+# -------------------- Task commands --------------------
+
+def cmd_task_add(db, args):
+    task_id = db.add_task(args.title, args.description, args.due)
+    print(task_id)
+
+
+def cmd_task_list(db, args):
+    fields = ("id", "due_date", "completed", "title")
+    if args.search:
+        rows = db.search_tasks(args.search, args.limit or 50, columns=fields)
+    elif args.overdue:
+        rows = db.get_overdue(columns=fields)
+    elif args.upcoming is not None:
+        rows = db.get_upcoming(args.upcoming, columns=fields)
+    elif args.start or args.end:
+        completed = {"pending": False, "completed": True}.get(args.status)
+        rows = db.get_tasks_between(args.start or "0000-01-01", args.end or "9999-12-31",
+                                    columns=fields, completed=completed)
+    elif args.date:
+        rows = db.get_tasks_by_date(args.date, columns=fields, include_archived=args.archived)
+    else:
+        completed = {"pending": False, "completed": True}.get(args.status)
+        rows = db.iter_tasks(columns=fields, completed=completed, include_archived=args.archived)
+    for count, task in enumerate(rows, 1):
+        emit(task, args.json, fields)
+        if args.limit and count >= args.limit:
+            break
+
+
+def cmd_task_counts(db, args):
+    counts = db.get_task_status_counts(args.start, args.end)
+    if args.json:
+        print(json.dumps(counts))
+        return
+    for status, count in counts.items():
+        print(f"{status}\t{count}")
+
+
+def cmd_task_complete(db, args):
+    missing = [task_id for task_id in args.ids
+               if not db.set_task_completed(task_id, not args.undo)]
+    if missing:
+        print(f"No such task: {', '.join(map(str, missing))}", file=sys.stderr)
+        return 1
+
+
+def cmd_task_delete(db, args):
+    for task_id in args.ids:
+        db.delete_task(task_id)
+
+
+def cmd_task_repeat(db, args):
+    print(db.add_task_rule(args.title, args.description, args.every, args.start,
+                           args.interval, args.until))
+
+
+def cmd_task_rules(db, args):
+    fields = ("id", "frequency", "interval", "start_date", "end_date", "title")
+    for rule in db.get_task_rules():
+        emit(rule, args.json, fields)
+
+
+def cmd_task_rule_delete(db, args):
+    for rule_id in args.ids:
+        db.delete_task_rule(rule_id)
+
+
+def cmd_task_occurrence(db, args):
+    if args.skip:
+        done = db.skip_occurrence(args.rule, args.date)
+    else:
+        done = db.set_occurrence_completed(args.rule, args.date, not args.undo)
+    if not done:
+        print(f"No such rule: {args.rule}", file=sys.stderr)
+        return 1
+
+
+def cmd_task_agenda(db, args):
+    # One-off tasks and recurring occurrences; recurring rows show "r<rule id>"
+    start = args.start or date.today().isoformat()
+    end = args.end or (date.fromisoformat(start) + timedelta(days=6)).isoformat()
+    for item in db.get_agenda(start, end, args.limit):
+        item_id = getattr(item, "id", None)
+        row = {
+            "id": item_id if item_id is not None else f"r{item.rule_id}",
+            "due_date": item.due_date,
+            "completed": item.completed,
+            "title": item.title,
+        }
+        if args.json:
+            print(json.dumps(row))
+        else:
+            print("\t".join(str(value) for value in row.values()))
+
+
+def cmd_task_archive(db, args):
+    moved = db.archive_completed_tasks(args.older_than, args.batch)
+    print(f"archived\t{moved}")
+    if args.compact:
+        print(f"pages_freed\t{db.compact()}")
+
+
+def cmd_task_restore(db, args):
+    missing = [task_id for task_id in args.ids if not db.restore_archived_task(task_id)]
+    if missing:
+        print(f"No such archived task: {', '.join(map(str, missing))}", file=sys.stderr)
+        return 1
+
+
+# -------------------- Mood commands --------------------
+
+def cmd_mood_log(db, args):
+    print(db.add_emotional_entry(args.mood, args.rating, args.notes, args.date))
+
+
+def cmd_mood_list(db, args):
+    fields = ("id", "date", "mood", "day_rating", "notes")
+    start = args.start or "0000-01-01"
+    end = args.end or date.today().isoformat()
+    for entry in db.iter_emotional_entries(start, end, columns=fields):
+        emit(entry, args.json, fields)
+
+
+def cmd_analytics(db, args):
+    from analytics import EmotionalAnalytics
+    summary = EmotionalAnalytics(db).summary(args.range)
+    if args.json:
+        print(json.dumps(summary))
+        return
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            value = ", ".join(f"{name}={count}" for name, count in value.items())
+        print(f"{key}\t{value}")
+
+
+# -------------------- Focus sessions --------------------
+
+def cmd_focus_stats(db, args):
+    # Totals from the daily rollup kept by the focus_sessions triggers
+    end = args.end or date.today().isoformat()
+    start = args.start or (date.fromisoformat(end) - timedelta(days=29)).isoformat()
+    query = {"day": db.get_focus_by_day, "week": db.get_focus_by_week,
+             "label": db.get_focus_by_label}[args.by]
+    for key, sessions, minutes in query(start, end):
+        if args.json:
+            print(json.dumps({args.by: key, "sessions": sessions, "minutes": round(minutes, 1)}))
+        else:
+            print(f"{key}\t{sessions}\t{minutes:.1f}")
+
+
+# -------------------- Profiles --------------------
+# These commands work on the profile files themselves, so main() does not
+# open a database for them (db is None).
+
+def cmd_profile_list(db, args):
+    for name, path in profiles.list_profiles(args.profiles_dir).items():
+        print(f"{name}\t{path}")
+
+
+def cmd_profile_create(db, args):
+    print(profiles.create_profile(args.name, args.profiles_dir))
+
+
+def cmd_profile_report(db, args):
+    found = profiles.list_profiles(args.profiles_dir)
+    if args.only:
+        missing = set(args.only) - set(found)
+        if missing:
+            print(f"unknown profiles: {', '.join(sorted(missing))}", file=sys.stderr)
+            return 1
+        found = {name: found[name] for name in args.only}
+    start = args.start or "0000-01-01"
+    end = args.end or date.today().isoformat()
+    with profiles.ProfileReport(found) as report:
+        tasks = report.task_counts()
+        moods = report.mood_summary(start, end)
+    for name in found:
+        row = {"profile": name, **tasks[name], **moods[name]}
+        if args.json:
+            print(json.dumps(row))
+        else:
+            print("\t".join("" if value is None else str(value) for value in row.values()))
+
+
+# -------------------- Sync --------------------
+
+def cmd_sync_run(db, args):
+    import sync
+    peer = sync.open_peer(args.target)
+    try:
+        report = sync.sync(db, peer, args.batch)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        # OSError covers an unreachable sync server
+        print(f"sync failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        peer.close()
+    print(f"peer\t{report.peer}")
+    print(f"sent\t{report.sent}")
+    print(f"received\t{report.received}")
+    print(f"applied\t{report.applied}")
+    print(f"skipped\t{report.skipped}")
+    print(f"rejected\t{len(report.rejected)}")
+    for side, table, uuid, reason in report.rejected:
+        print(f"{side} rejected {table} {uuid}: {reason}", file=sys.stderr)
+    return 1 if report.rejected else 0
+
+
+def cmd_sync_serve(db, args):
+    import sync
+    print(f"serving {args.db or 'profile database'} on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        sync.serve(db, args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_sync_reset_site(db, args):
+    print(db.reset_site_id())
+
+
+# -------------------- Import / export --------------------
+
+def detect_format(args):
+    if args.format:
+        return args.format
+    return "jsonl" if args.file.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def cmd_import(db, args):
+    importer = {"tasks": db.import_tasks, "moods": db.import_emotional_entries}[args.table]
+    with open(args.file, newline="", encoding="utf-8") as fileobj:
+        report = importer(fileobj, detect_format(args), skip_duplicates=not args.keep_duplicates)
+    print(f"inserted\t{report.inserted}")
+    print(f"duplicates\t{report.duplicates}")
+    print(f"rejected\t{report.rejected_count}")
+    for line, reason in report.rejected:
+        print(f"line {line}: {reason}", file=sys.stderr)
+    return 1 if report.rejected_count else 0
+
+
+def cmd_export(db, args):
+    exporter = {"tasks": db.export_tasks, "moods": db.export_emotional_entries}[args.table]
+    if args.file == "-":
+        exporter(sys.stdout, args.format or "csv")
+    else:
+        with open(args.file, "w", newline="", encoding="utf-8") as fileobj:
+            exporter(fileobj, detect_format(args))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="studyzone", description="Study Zone command line")
+    parser.add_argument("--db", help="database file (overrides --profile)")
+    parser.add_argument("--profile", help=f"profile to use (default: ${profiles.PROFILE_ENV} or "
+                                          f"{profiles.DEFAULT_PROFILE!r})")
+    parser.add_argument("--profiles-dir", help=f"where profile databases live (default: {profiles.PROFILE_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    task = commands.add_parser("task", help="manage tasks").add_subparsers(dest="action", required=True)
+
+    add = task.add_parser("add", help="add a task")
+    add.add_argument("title")
+    add.add_argument("--due", type=valid_date, default=date.today().isoformat())
+    add.add_argument("--description", default="")
+    add.set_defaults(handler=cmd_task_add)
+
+    listing = task.add_parser("list", help="list tasks, newest due date first")
+    listing.add_argument("--date", type=valid_date, help="only tasks due on this date")
+    listing.add_argument("--status", choices=["all", "pending", "completed"], default="all")
+    listing.add_argument("--search", help="full-text search instead of listing")
+    listing.add_argument("--limit", type=int)
+    listing.add_argument("--json", action="store_true", help="JSON Lines output")
+    listing.add_argument("--archived", action="store_true", help="include archived tasks")
+    listing.add_argument("--from", dest="start", type=valid_date, help="due on or after this date")
+    listing.add_argument("--to", dest="end", type=valid_date, help="due on or before this date")
+    listing.add_argument("--overdue", action="store_true", help="pending tasks due before today")
+    listing.add_argument("--upcoming", type=int, metavar="DAYS", help="pending tasks due in the next DAYS")
+    listing.set_defaults(handler=cmd_task_list)
+
+    counts = task.add_parser("counts", help="pending/overdue/completed counts")
+    counts.add_argument("--from", dest="start", type=valid_date)
+    counts.add_argument("--to", dest="end", type=valid_date)
+    counts.add_argument("--json", action="store_true")
+    counts.set_defaults(handler=cmd_task_counts)
+
+    complete = task.add_parser("complete", help="mark tasks completed")
+    complete.add_argument("ids", type=int, nargs="+")
+    complete.add_argument("--undo", action="store_true", help="mark as pending again")
+    complete.set_defaults(handler=cmd_task_complete)
+
+    delete = task.add_parser("delete", help="delete tasks")
+    delete.add_argument("ids", type=int, nargs="+")
+    delete.set_defaults(handler=cmd_task_delete)
+
+    archive = task.add_parser("archive", help="move old completed tasks to the archive")
+    archive.add_argument("--older-than", type=int, default=90, metavar="DAYS",
+                         help="archive completed tasks due more than DAYS ago")
+    archive.add_argument("--batch", type=int, help="tasks moved per transaction")
+    archive.add_argument("--compact", action="store_true",
+                         help="then return free pages to the file system (first run: full VACUUM)")
+    archive.set_defaults(handler=cmd_task_archive)
+
+    restore = task.add_parser("restore", help="move archived tasks back")
+    restore.add_argument("ids", type=int, nargs="+")
+    restore.set_defaults(handler=cmd_task_restore)
+
+    repeat = task.add_parser("repeat", help="add a recurring task")
+    repeat.add_argument("title")
+    repeat.add_argument("--every", choices=["daily", "weekly", "monthly"], default="weekly")
+    repeat.add_argument("--interval", type=int, default=1, help="every N days/weeks/months")
+    repeat.add_argument("--start", type=valid_date, default=date.today().isoformat())
+    repeat.add_argument("--until", type=valid_date, help="last possible date")
+    repeat.add_argument("--description", default="")
+    repeat.set_defaults(handler=cmd_task_repeat)
+
+    rules = task.add_parser("rules", help="list recurring tasks")
+    rules.add_argument("--json", action="store_true", help="JSON Lines output")
+    rules.set_defaults(handler=cmd_task_rules)
+
+    rule_delete = task.add_parser("rule-delete", help="delete recurring tasks")
+    rule_delete.add_argument("ids", type=int, nargs="+")
+    rule_delete.set_defaults(handler=cmd_task_rule_delete)
+
+    occurrence = task.add_parser("occurrence", help="complete or skip one occurrence")
+    occurrence.add_argument("rule", type=int)
+    occurrence.add_argument("date", type=valid_date)
+    occurrence.add_argument("--undo", action="store_true", help="mark as pending again")
+    occurrence.add_argument("--skip", action="store_true", help="drop this occurrence")
+    occurrence.set_defaults(handler=cmd_task_occurrence)
+
+    agenda = task.add_parser("agenda", help="tasks and recurring occurrences by date")
+    agenda.add_argument("--from", dest="start", type=valid_date, help="default: today")
+    agenda.add_argument("--to", dest="end", type=valid_date, help="default: a week after --from")
+    agenda.add_argument("--limit", type=int)
+    agenda.add_argument("--json", action="store_true", help="JSON Lines output")
+    agenda.set_defaults(handler=cmd_task_agenda)
+
+    mood = commands.add_parser("mood", help="emotional tracker").add_subparsers(dest="action", required=True)
+
+    log = mood.add_parser("log", help="record a mood entry")
+    log.add_argument("mood")
+    log.add_argument("rating", type=valid_rating)
+    log.add_argument("--notes", default="")
+    log.add_argument("--date", type=valid_date)
+    log.set_defaults(handler=cmd_mood_log)
+
+    mood_list = mood.add_parser("list", help="list mood entries")
+    mood_list.add_argument("--start", type=valid_date, help="default: earliest entry")
+    mood_list.add_argument("--end", type=valid_date, help="default: today")
+    mood_list.add_argument("--json", action="store_true", help="JSON Lines output")
+    mood_list.set_defaults(handler=cmd_mood_list)
+
+    analytics = commands.add_parser("analytics", help="mood and rating summary")
+    analytics.add_argument("--range", choices=["week", "month", "year", "all"], default="month")
+    analytics.add_argument("--json", action="store_true")
+    analytics.set_defaults(handler=cmd_analytics)
+
+    focus = commands.add_parser("focus", help="timer focus sessions").add_subparsers(dest="action", required=True)
+
+    focus_stats = focus.add_parser("stats", help="sessions and focus minutes per day, week or label")
+    focus_stats.add_argument("--by", choices=["day", "week", "label"], default="day")
+    focus_stats.add_argument("--start", type=valid_date, help="default: 29 days before --end")
+    focus_stats.add_argument("--end", type=valid_date, help="default: today")
+    focus_stats.add_argument("--json", action="store_true", help="JSON Lines output")
+    focus_stats.set_defaults(handler=cmd_focus_stats)
+
+    profile = commands.add_parser("profile", help="per-user databases").add_subparsers(dest="action", required=True)
+
+    profile_list = profile.add_parser("list", help="list profiles and their database files")
+    profile_list.set_defaults(handler=cmd_profile_list, open_db=False)
+
+    profile_create = profile.add_parser("create", help="create an empty profile")
+    profile_create.add_argument("name")
+    profile_create.set_defaults(handler=cmd_profile_create, open_db=False)
+
+    report = profile.add_parser("report", help="task and mood totals for every profile")
+    report.add_argument("--only", type=lambda text: text.split(","), help="comma-separated profile names")
+    report.add_argument("--from", dest="start", type=valid_date, help="mood entries on or after this date")
+    report.add_argument("--to", dest="end", type=valid_date, help="mood entries on or before this date")
+    report.add_argument("--json", action="store_true", help="JSON Lines output")
+    report.set_defaults(handler=cmd_profile_report, open_db=False)
+
+    sync = commands.add_parser("sync", help="incremental sync with another copy").add_subparsers(
+        dest="action", required=True)
+
+    sync_run = sync.add_parser("run", help="exchange changes with a database file or sync server")
+    sync_run.add_argument("target", help="path of the other database, or http://host:port")
+    sync_run.add_argument("--batch", type=int, default=500, help="changes per round trip")
+    sync_run.set_defaults(handler=cmd_sync_run)
+
+    sync_serve = sync.add_parser("serve", help="serve this database to `sync run` over HTTP")
+    sync_serve.add_argument("--host", default="127.0.0.1")
+    sync_serve.add_argument("--port", type=int, default=8765)
+    sync_serve.set_defaults(handler=cmd_sync_serve)
+
+    reset_site = sync.add_parser("reset-site", help="give a copied database file its own sync identity")
+    reset_site.set_defaults(handler=cmd_sync_reset_site)
+
+    importing = commands.add_parser("import", help="bulk import from CSV or JSON Lines")
+    importing.add_argument("table", choices=["tasks", "moods"])
+    importing.add_argument("file")
+    importing.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    importing.add_argument("--keep-duplicates", action="store_true", help="insert rows already present")
+    importing.set_defaults(handler=cmd_import)
+
+    exporting = commands.add_parser("export", help="export to CSV or JSON Lines")
+    exporting.add_argument("table", choices=["tasks", "moods"])
+    exporting.add_argument("file", nargs="?", default="-", help="default: standard output")
+    exporting.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    exporting.set_defaults(handler=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if not getattr(args, "open_db", True):
+            return args.handler(None, args) or 0
+        try:
+            path = args.db or profiles.prepare_path(profiles.resolve_profile(args.profile), args.profiles_dir)
+        except ValueError as e:
+            parser.error(str(e))
+        with DatabaseManager(path) as db:
+            return args.handler(db, args) or 0
+    except BrokenPipeError:
+        # Output piped into e.g. `head`; stop quietly
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
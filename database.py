@@ -1,121 +1,1441 @@
 import sqlite3
+import threading
+import weakref
 import json
-from datetime import datetime, timedelta
+import csv
+import heapq
+from itertools import islice
+from uuid import NAMESPACE_URL, uuid5
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from models import Task, EmotionalEntry, TaskRule
+from recurrence import FREQUENCIES, expand_rules
+
+def _create_tasks_fts(conn):
+    # External-content FTS5 index kept in sync with tasks by triggers. Builds
+    # without FTS5 skip it, and search_tasks falls back to LIKE.
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+            "title, description, content='tasks', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return
+        raise
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (NEW.id, NEW.title, NEW.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', OLD.id, OLD.title, OLD.description);
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (NEW.id, NEW.title, NEW.description);
+        END
+    ''')
+
+
+def fts_prefix_query(text):
+    # Turn free text into an FTS5 query where every word must match as a prefix
+    words = [word.replace('"', '') for word in text.split()]
+    return " ".join(f'"{word}"*' for word in words if word)
+
+
+class ImportReport:
+    # Outcome of a bulk import; `rejected` holds (line number, reason) pairs
+    MAX_REJECTED = 1000
+
+    def __init__(self):
+        self.inserted = 0
+        self.duplicates = 0
+        self.rejected_count = 0
+        self.rejected = []
+
+    def reject(self, line, reason):
+        self.rejected_count += 1
+        if len(self.rejected) < self.MAX_REJECTED:
+            self.rejected.append((line, reason))
+
+    def __repr__(self):
+        return (f"ImportReport(inserted={self.inserted}, duplicates={self.duplicates}, "
+                f"rejected={self.rejected_count})")
+
+
+class ImportRejected(ValueError):
+    # Raised by on_error="raise"; chunks before the bad line stay committed
+    def __init__(self, line, reason, report):
+        super().__init__(f"line {line}: {reason}")
+        self.line = line
+        self.reason = reason
+        self.report = report
+
+
+def read_records(fileobj, fmt):
+    # Yields (line number, dict) from a CSV (with header) or JSON Lines stream
+    if fmt == "csv":
+        reader = csv.DictReader(fileobj)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(fileobj, 1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as e:
+                    yield line_number, e
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected 'csv' or 'jsonl'")
+
+
+def write_records(fileobj, fmt, columns, rows):
+    # Streams rows from a cursor; returns the number written
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(fileobj)
+        writer.writerow(columns)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+    elif fmt == "jsonl":
+        for count, row in enumerate(rows, 1):
+            fileobj.write(json.dumps(dict(zip(columns, row))) + "\n")
+    else:
+        raise ValueError(f"Unknown format {fmt!r}; expected 'csv' or 'jsonl'")
+    return count
+
+
+def parse_iso_date(value):
+    # Strict YYYY-MM-DD; fromisoformat is much cheaper than strptime per row
+    text = str(value).strip()
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        try:
+            return date.fromisoformat(text).isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"bad date {value!r}; expected YYYY-MM-DD")
+
+
+def normalize_date(value):
+    # Lenient form of parse_iso_date for legacy values: "2024-1-5", "2024/01/05"
+    text = str(value).strip().replace("/", "-").replace(".", "-")
+    parts = text.split("-")
+    if len(parts) != 3 or len(parts[0]) != 4:
+        raise ValueError(f"bad date {value!r}")
+    try:
+        return date(*(int(part) for part in parts)).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"bad date {value!r}")
+
+
+def text_field(value):
+    # Import fields may be numbers or null in JSON Lines; None stays None
+    return None if value is None else str(value)
+
+
+def parse_flag(value):
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "y"):
+        return 1
+    if text in ("", "0", "false", "no", "n", "none"):
+        return 0
+    raise ValueError(f"bad completed flag {value!r}")
+
+
+def _normalize_task_dates(conn):
+    # Rewrites due dates like "2024-1-5" or "2024/01/05" as YYYY-MM-DD, then
+    # makes SQLite reject anything else, so every date range query can be a
+    # plain index range scan. Unparseable legacy values are left untouched.
+    for table in ("tasks", "tasks_archive"):
+        rows = conn.execute(
+            f"SELECT id, due_date FROM {table} WHERE due_date IS NOT date(due_date)"
+        ).fetchall()
+        for task_id, due_date in rows:
+            try:
+                normalized = normalize_date(due_date)
+            except ValueError:
+                continue
+            conn.execute(f"UPDATE {table} SET due_date = ? WHERE id = ?", (normalized, task_id))
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_due_date_insert_check
+        BEFORE INSERT ON tasks WHEN NEW.due_date IS NOT date(NEW.due_date) BEGIN
+            SELECT RAISE(ABORT, 'due_date must be a valid YYYY-MM-DD date');
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_due_date_update_check
+        BEFORE UPDATE OF due_date ON tasks WHEN NEW.due_date IS NOT date(NEW.due_date) BEGIN
+            SELECT RAISE(ABORT, 'due_date must be a valid YYYY-MM-DD date');
+        END
+    ''')
+    # Overdue and upcoming lists only ever look at pending tasks
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_pending_due ON tasks (due_date) WHERE completed = 0")
+    conn.execute("ANALYZE tasks")
+
+
+# Columns exchanged by sync for each replicated table (see sync.py)
+SYNC_COLUMNS = {
+    "tasks": ("title", "description", "due_date", "completed", "created_at"),
+    "emotional_entries": ("date", "mood", "day_rating", "notes", "created_at"),
+}
+_SITE_ID = "(SELECT value FROM sync_state WHERE key = 'site')"
+
+
+def _add_change_log(conn):
+    # Change data capture for sync. Every replicated row gets a stable uuid
+    # plus the version and site (database) of its last change, and
+    # triggers keep one change_log entry per row: its latest version, or a
+    # tombstone once deleted. Each change moves the entry to a new, higher seq,
+    # so "everything since seq N" is a range scan whose cost depends on the
+    # number of changes, not the size of the tables.
+    conn.execute("CREATE TABLE sync_state (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+    conn.execute("INSERT INTO sync_state (key, value) VALUES ('site', lower(hex(randomblob(16))))")
+    conn.execute('''
+        CREATE TABLE change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            uuid TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            site TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("CREATE UNIQUE INDEX idx_change_log_row ON change_log (table_name, uuid)")
+    # Per-peer watermarks: our seq sent to the peer, the peer's seq received
+    conn.execute('''
+        CREATE TABLE sync_peers (
+            peer TEXT PRIMARY KEY,
+            sent_seq INTEGER NOT NULL DEFAULT 0,
+            received_seq INTEGER NOT NULL DEFAULT 0,
+            synced_at TEXT
+        ) WITHOUT ROWID
+    ''')
+    site = conn.execute(f"SELECT {_SITE_ID}").fetchone()[0]
+    for table in ("tasks", "tasks_archive", "emotional_entries"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN uuid TEXT")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN site TEXT")
+        # Existing rows get uuids derived from their id and creation time, so
+        # two copies of one file upgraded separately agree on them and the
+        # first sync matches rows up instead of duplicating them
+        kind = "tasks" if table == "tasks_archive" else table
+        conn.executemany(
+            f"UPDATE {table} SET uuid = ?, version = 1, site = ? WHERE id = ?",
+            ((uuid5(NAMESPACE_URL, f"studyzone:{kind}:{row_id}:{created_at}").hex, site, row_id)
+             for row_id, created_at in conn.execute(f"SELECT id, created_at FROM {table}").fetchall())
+        )
+        conn.execute(f"CREATE UNIQUE INDEX idx_{table}_uuid ON {table} (uuid)")
+    conn.execute(
+        "INSERT INTO change_log (table_name, uuid, version, site) "
+        "SELECT 'tasks', uuid, version, site FROM tasks "
+        "UNION ALL SELECT 'tasks', uuid, version, site FROM tasks_archive "
+        "UNION ALL SELECT 'emotional_entries', uuid, version, site FROM emotional_entries"
+    )
+    for table in SYNC_COLUMNS:
+        # Moving a task to or from the archive is not a change; the row still
+        # exists, just in the other table
+        if table == "tasks":
+            inserted = "WHEN NOT EXISTS (SELECT 1 FROM tasks_archive WHERE uuid = NEW.uuid)"
+            deleted = "WHEN NOT EXISTS (SELECT 1 FROM tasks_archive WHERE uuid = OLD.uuid)"
+        else:
+            inserted = deleted = ""
+        # Local inserts arrive with version 0 and get their uuid, version 1 and
+        # this site here; rows applied by sync already carry all three
+        conn.execute(f'''
+            CREATE TRIGGER {table}_cdc_insert AFTER INSERT ON {table} {inserted} BEGIN
+                UPDATE {table} SET uuid = COALESCE(uuid, lower(hex(randomblob(16)))),
+                    version = 1, site = {_SITE_ID}
+                WHERE id = NEW.id AND NEW.version = 0;
+                DELETE FROM change_log WHERE table_name = '{table}'
+                    AND uuid = (SELECT uuid FROM {table} WHERE id = NEW.id);
+                INSERT INTO change_log (table_name, uuid, version, site)
+                SELECT '{table}', uuid, version, site FROM {table} WHERE id = NEW.id;
+            END
+        ''')
+        # A local edit leaves version and site alone, so bump them here (the
+        # nested UPDATE does not re-fire this trigger: recursive_triggers is off)
+        conn.execute(f'''
+            CREATE TRIGGER {table}_cdc_update AFTER UPDATE ON {table} WHEN OLD.version > 0 BEGIN
+                UPDATE {table} SET version = OLD.version + 1, site = {_SITE_ID}
+                WHERE id = NEW.id AND NEW.version = OLD.version AND NEW.site IS OLD.site;
+                DELETE FROM change_log WHERE table_name = '{table}' AND uuid = OLD.uuid;
+                INSERT INTO change_log (table_name, uuid, version, site)
+                SELECT '{table}', uuid, version, site FROM {table} WHERE id = NEW.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER {table}_cdc_delete AFTER DELETE ON {table} {deleted} BEGIN
+                DELETE FROM change_log WHERE table_name = '{table}' AND uuid = OLD.uuid;
+                INSERT INTO change_log (table_name, uuid, version, site, deleted)
+                VALUES ('{table}', OLD.uuid, OLD.version + 1, {_SITE_ID}, 1);
+            END
+        ''')
+
+
+def split_statements(script):
+    # The statements of an SQL script, one at a time; semicolons inside
+    # strings, comments and trigger bodies do not end a statement
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \t\n;"):
+                yield statement
+            statement = ""
+
+
+# Schema migrations, applied in order. The position in this list (1-based) is the
+# schema version stored in PRAGMA user_version. Entries are SQL scripts or
+# callables taking an open connection; never edit one that has been released.
+MIGRATIONS = [
+    # 1: base tables (databases created before migrations already have these)
+    '''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        due_date TEXT NOT NULL,
+        completed INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS emotional_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        mood TEXT NOT NULL,
+        day_rating INTEGER,
+        notes TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    ''',
+    # 2: indexes for calendar lookups, the all-tasks listing and mood ranges.
+    # (due_date, created_at) serves both "WHERE due_date = ? ORDER BY created_at"
+    # and "ORDER BY due_date DESC" without a sort step.
+    '''
+    CREATE INDEX IF NOT EXISTS idx_tasks_due_date_created
+        ON tasks (due_date, created_at);
+    CREATE INDEX IF NOT EXISTS idx_emotional_entries_date
+        ON emotional_entries (date, mood, day_rating);
+    ANALYZE;
+    ''',
+    # 3: keyset pagination over the all-tasks listing, ordered by (due_date, id)
+    '''
+    CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+    ''',
+    # 4: covering index for the per-day pending/completed month aggregate
+    '''
+    CREATE INDEX IF NOT EXISTS idx_tasks_due_date_completed ON tasks (due_date, completed);
+    ''',
+    # 5: focus timer session log, with a per-day/per-label rollup kept up to
+    # date by triggers so statistics never have to scan the raw sessions
+    '''
+    CREATE TABLE IF NOT EXISTS focus_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        label TEXT NOT NULL DEFAULT '',
+        started_at TEXT NOT NULL,
+        ended_at TEXT NOT NULL,
+        planned_seconds INTEGER NOT NULL,
+        actual_seconds INTEGER NOT NULL,
+        pauses INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS idx_focus_sessions_started ON focus_sessions (started_at);
+    CREATE TABLE IF NOT EXISTS focus_daily_rollup (
+        day TEXT NOT NULL,
+        label TEXT NOT NULL,
+        sessions INTEGER NOT NULL,
+        focus_seconds INTEGER NOT NULL,
+        PRIMARY KEY (day, label)
+    ) WITHOUT ROWID;
+    CREATE TRIGGER IF NOT EXISTS focus_sessions_rollup_insert
+    AFTER INSERT ON focus_sessions BEGIN
+        INSERT INTO focus_daily_rollup (day, label, sessions, focus_seconds)
+        VALUES (substr(NEW.started_at, 1, 10), NEW.label, 1, NEW.actual_seconds)
+        ON CONFLICT (day, label) DO UPDATE SET
+            sessions = sessions + 1,
+            focus_seconds = focus_seconds + excluded.focus_seconds;
+    END;
+    CREATE TRIGGER IF NOT EXISTS focus_sessions_rollup_delete
+    AFTER DELETE ON focus_sessions BEGIN
+        UPDATE focus_daily_rollup
+        SET sessions = sessions - 1, focus_seconds = focus_seconds - OLD.actual_seconds
+        WHERE day = substr(OLD.started_at, 1, 10) AND label = OLD.label;
+        DELETE FROM focus_daily_rollup
+        WHERE day = substr(OLD.started_at, 1, 10) AND label = OLD.label AND sessions <= 0;
+    END;
+    ''',
+    # 6: full-text search over task titles/descriptions
+    _create_tasks_fts,
+    # 7: (due_date, title) is the natural key bulk imports use to skip duplicates
+    '''
+    CREATE INDEX IF NOT EXISTS idx_tasks_due_date_title ON tasks (due_date, title);
+    ''',
+    # 8: recurring tasks. A rule is stored once; its occurrences are generated
+    # for the range being viewed, and only completed or skipped occurrences
+    # get a row in task_rule_exceptions.
+    '''
+    CREATE TABLE IF NOT EXISTS task_rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        frequency TEXT NOT NULL CHECK (frequency IN ('daily', 'weekly', 'monthly')),
+        interval INTEGER NOT NULL DEFAULT 1 CHECK (interval >= 1),
+        start_date TEXT NOT NULL,
+        end_date TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_task_rules_start ON task_rules (start_date);
+    CREATE TABLE IF NOT EXISTS task_rule_exceptions (
+        rule_id INTEGER NOT NULL REFERENCES task_rules (id) ON DELETE CASCADE,
+        date TEXT NOT NULL,
+        completed INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (rule_id, date)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_task_rule_exceptions_date ON task_rule_exceptions (date);
+    ''',
+    # 9: archive tier. Old completed tasks move here so everyday queries,
+    # the task store and the full-text index only cover live tasks.
+    '''
+    CREATE TABLE IF NOT EXISTS tasks_archive (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        due_date TEXT NOT NULL,
+        completed INTEGER DEFAULT 0,
+        created_at TEXT,
+        archived_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_tasks_archive_due_date ON tasks_archive (due_date);
+    ''',
+    # 10: validated YYYY-MM-DD due dates and a partial index over pending tasks
+    _normalize_task_dates,
+    # 11: uuids, row versions and the change log used by sync
+    _add_change_log,
+    # 12: latest change per table, the data-version stamp for cached charts
+    '''
+    CREATE INDEX IF NOT EXISTS idx_change_log_table_seq ON change_log (table_name, seq);
+    ''',
+    # 13: fewer indexes for every insert to maintain. (due_date) already serves
+    # day lookups (a day's handful of tasks sorts by created_at for free), the
+    # all-tasks order and month counts; the task store counts months in
+    # memory anyway, and imports find duplicates from a key set read once.
+    '''
+    DROP INDEX IF EXISTS idx_tasks_due_date_created;
+    DROP INDEX IF EXISTS idx_tasks_due_date_completed;
+    DROP INDEX IF EXISTS idx_tasks_due_date_title;
+    ''',
+]
+
+
+class _ConnectionHolder:
+    # Lives in a thread's threading.local, so it is freed when the thread
+    # exits; a finalizer then hands the connection back to the pool
+    __slots__ = ("conn", "release", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.release = None
+
+
+def _reclaim_connection(manager_ref, conn):
+    manager = manager_ref()
+    if manager is not None and manager._reclaim(conn):
+        return
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
 
 class DatabaseManager:
+    # Idle connections kept around for reuse by short-lived worker threads
+    POOL_SIZE = 4
+    STATEMENT_CACHE_SIZE = 128
+
     def __init__(self, db_name="task_manager.db"):
         self.db_name = db_name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._idle = []
+        self._closed = False
         self.init_database()
-    
+
+    # Connection management
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_name,
+            check_same_thread=False,
+            cached_statements=self.STATEMENT_CACHE_SIZE
+        )
+        # Only takes effect for a new file; existing ones are converted by compact()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")  # ~8 MB page cache
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def get_connection(self):
+        # Each thread keeps its own connection for its whole lifetime; it goes
+        # back to the pool when the thread exits (or calls release_connection)
+        holder = getattr(self._local, "holder", None)
+        if holder is not None:
+            return holder.conn
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("DatabaseManager is closed")
+            conn = self._idle.pop() if self._idle else self._connect()
+            self._connections.add(conn)
+        holder = _ConnectionHolder(conn)
+        holder.release = weakref.finalize(holder, _reclaim_connection, weakref.ref(self), conn)
+        self._local.holder = holder
+        return conn
+
+    def release_connection(self):
+        # Returns this thread's connection to the pool right away
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            return
+        self._local.holder = None
+        holder.release()
+
+    def _reclaim(self, conn):
+        # True if the connection was kept for reuse; the caller closes it otherwise
+        with self._lock:
+            self._connections.discard(conn)
+            if self._closed or len(self._idle) >= self.POOL_SIZE:
+                return False
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                return False
+            self._idle.append(conn)
+            return True
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            connections = list(self._connections) + self._idle
+            self._connections.clear()
+            self._idle = []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def query(self, record_type, sql, params=()):
+        # Cursor whose rows come back as record_type instances
+        cursor = self.get_connection().cursor()
+        cursor.row_factory = record_type.row_factory
+        return cursor.execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        # Commits on success and rolls back on error. Nested uses on the same
+        # thread become savepoints, so a batch of writes can share one commit
+        # while a failing write only undoes its own changes.
+        conn = self.get_connection()
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            name = f"sp{depth}"
+            conn.execute(f"SAVEPOINT {name}")
+        elif not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+            else:
+                conn.rollback()
+            raise
+        else:
+            if depth:
+                conn.execute(f"RELEASE {name}")
+            else:
+                conn.commit()
+        finally:
+            self._local.depth = depth
+
     def init_database(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        # Tasks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                due_date TEXT NOT NULL,
-                completed INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Emotional entries table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emotional_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                mood TEXT NOT NULL,
-                day_rating INTEGER,
-                notes TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        self.migrate()
+
+    # Schema migrations
+    def schema_version(self):
+        return self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        # Each migration and its version bump are applied atomically. The
+        # version is re-read under the write lock before each step, so two
+        # processes opening an old file at once never apply one twice.
+        conn = self.get_connection()
+        if self.schema_version() == len(MIGRATIONS):
+            return len(MIGRATIONS)
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = self.schema_version()
+                if current > len(MIGRATIONS):
+                    raise RuntimeError(
+                        f"{self.db_name} has schema version {current}, newer than this app "
+                        f"supports ({len(MIGRATIONS)})"
+                    )
+                if current == len(MIGRATIONS):
+                    conn.commit()
+                    return current
+                migration = MIGRATIONS[current]
+                if callable(migration):
+                    migration(conn)
+                else:
+                    # Not executescript(), which would commit before the bump
+                    for statement in split_statements(migration):
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {current + 1}")
+                conn.commit()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+
     # Task methods
     def add_task(self, title, description, due_date):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)",
-            (title, description, due_date)
+        due_date = parse_iso_date(due_date)
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)",
+                (title, description, due_date)
+            )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _task_source(include_archived):
+        # Live tasks only, unless the caller opts in to the archive tier as well
+        if not include_archived:
+            return "tasks"
+        columns = Task.columns()
+        return f"(SELECT {columns} FROM tasks UNION ALL SELECT {columns} FROM tasks_archive)"
+
+    def get_all_tasks(self, columns=None, include_archived=False):
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM {self._task_source(include_archived)} "
+            "ORDER BY due_date DESC"
+        ).fetchall()
+
+    def iter_tasks(self, columns=None, completed=None, include_archived=False):
+        # Cursor over tasks in get_all_tasks order, for streaming large results
+        where = "" if completed is None else f"WHERE completed {'!=' if completed else '='} 0 "
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM {self._task_source(include_archived)} "
+            f"{where}ORDER BY due_date DESC, id DESC"
         )
-        task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return task_id
-    
-    def get_all_tasks(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks ORDER BY due_date DESC")
-        tasks = cursor.fetchall()
-        conn.close()
-        return tasks
-    
-    def get_tasks_by_date(self, date):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE due_date = ? ORDER BY created_at", (date,))
-        tasks = cursor.fetchall()
-        conn.close()
-        return tasks
-    
+
+    def get_tasks_page(self, limit=100, after=None, offset=0, columns=Task.LIST_COLUMNS):
+        # Page through tasks in get_all_tasks order (newest due date first).
+        # `after` is the (due_date, id) key of the last row already seen and
+        # makes the query an index seek; `offset` is only for random jumps.
+        if after is not None:
+            return self.query(
+                Task,
+                f"SELECT {Task.columns(columns)} FROM tasks "
+                "WHERE (due_date, id) < (?, ?) "
+                "ORDER BY due_date DESC, id DESC LIMIT ?",
+                (after[0], after[1], limit)
+            ).fetchall()
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM tasks "
+            "ORDER BY due_date DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+
+    def has_full_text_search(self):
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+        ).fetchone() is not None
+
+    # Most matches search_tasks ranks; see there
+    SEARCH_CANDIDATES = 1000
+    SEARCH_SHORT_CANDIDATES = 200
+
+    def search_tasks(self, query, limit=50, columns=Task.LIST_COLUMNS):
+        # Best matches first; each word in `query` is matched as a prefix
+        match = fts_prefix_query(query)
+        if not match:
+            return []
+        projection = ", ".join(f"t.{column}" for column in Task.columns(columns).split(", "))
+        if not self.has_full_text_search():
+            like = f"%{query.strip()}%"
+            return self.query(
+                Task,
+                f"SELECT {projection} FROM tasks t WHERE t.title LIKE ? OR t.description LIKE ? "
+                "ORDER BY t.due_date DESC LIMIT ?",
+                (like, like, limit)
+            ).fetchall()
+        # Ranking computes bm25 for every match, and a common word matches
+        # most of the table. Only the newest few matches are ranked: a range
+        # on rowid, which FTS5 walks in order and stops early, bounds them.
+        # One- and two-letter prefixes match almost everything, so they get
+        # fewer candidates still.
+        short = min(len(word) for word in query.replace('"', '').split()) <= 2
+        floor = self.get_connection().execute(
+            "SELECT MIN(rowid) FROM ("
+            "    SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ? ORDER BY rowid DESC LIMIT ?"
+            ")",
+            (match, max(limit, self.SEARCH_SHORT_CANDIDATES if short else self.SEARCH_CANDIDATES))
+        ).fetchone()[0]
+        if floor is None:
+            return []
+        return self.query(
+            Task,
+            "WITH hits AS ("
+            "    SELECT rowid, rank FROM tasks_fts WHERE tasks_fts MATCH ? AND rowid >= ?"
+            "    ORDER BY rank LIMIT ?"
+            f") SELECT {projection} FROM hits JOIN tasks t ON t.id = hits.rowid ORDER BY hits.rank",
+            (match, floor, limit)
+        ).fetchall()
+
+    def count_tasks(self, include_archived=False):
+        conn = self.get_connection()
+        count = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        if include_archived:
+            count += conn.execute("SELECT COUNT(*) FROM tasks_archive").fetchone()[0]
+        return count
+
+    def get_tasks_by_date(self, date, columns=None, include_archived=False):
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM {self._task_source(include_archived)} "
+            "WHERE due_date = ? ORDER BY created_at",
+            (date,)
+        ).fetchall()
+
+    def get_month_task_counts(self, year, month):
+        # {date: (pending, completed)} for every day in the month that has tasks
+        start = f"{year:04d}-{month:02d}-01"
+        end = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+        conn = self.get_connection()
+        rows = conn.execute(
+            "SELECT due_date, SUM(completed = 0), SUM(completed != 0) FROM tasks "
+            "WHERE due_date >= ? AND due_date < ? GROUP BY due_date",
+            (start, end)
+        ).fetchall()
+        return {due_date: (pending, completed) for due_date, pending, completed in rows}
+
+    # Date range queries. Dates are validated YYYY-MM-DD text, so each of these
+    # is a single range scan over a due_date index.
+    def get_tasks_between(self, start_date, end_date, columns=None, completed=None):
+        # Tasks due in [start_date, end_date], earliest first
+        where = "" if completed is None else f"AND completed {'!=' if completed else '='} 0 "
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM tasks "
+            f"WHERE due_date >= ? AND due_date <= ? {where}ORDER BY due_date, id",
+            (start_date, end_date)
+        ).fetchall()
+
+    def get_overdue(self, today=None, columns=None, limit=None):
+        # Pending tasks due before today, oldest first
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM tasks "
+            "WHERE completed = 0 AND due_date < ? ORDER BY due_date, id LIMIT ?",
+            ((today or date.today()).isoformat(), -1 if limit is None else limit)
+        ).fetchall()
+
+    def get_upcoming(self, n_days=7, today=None, columns=None, limit=None):
+        # Pending tasks due from today through n_days from now, soonest first
+        today = today or date.today()
+        return self.query(
+            Task,
+            f"SELECT {Task.columns(columns)} FROM tasks "
+            "WHERE completed = 0 AND due_date >= ? AND due_date <= ? ORDER BY due_date, id LIMIT ?",
+            (today.isoformat(), (today + timedelta(days=n_days)).isoformat(),
+             -1 if limit is None else limit)
+        ).fetchall()
+
+    def get_task_status_counts(self, start_date=None, end_date=None, today=None):
+        # {"pending", "overdue", "completed", "total"} for tasks due in the
+        # range (all live tasks when omitted); "pending" excludes overdue ones
+        today = (today or date.today()).isoformat()
+        pending, overdue, completed, total = self.get_connection().execute(
+            "SELECT COALESCE(SUM(completed = 0 AND due_date >= ?1), 0), "
+            "COALESCE(SUM(completed = 0 AND due_date < ?1), 0), "
+            "COALESCE(SUM(completed != 0), 0), COUNT(*) FROM tasks "
+            "WHERE due_date >= COALESCE(?2, '') AND due_date <= COALESCE(?3, '9999-12-31')",
+            (today, start_date, end_date)
+        ).fetchone()
+        return {"pending": pending, "overdue": overdue, "completed": completed, "total": total}
+
     def update_task(self, task_id, title, description, due_date, completed):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE tasks SET title=?, description=?, due_date=?, completed=? WHERE id=?",
-            (title, description, due_date, completed, task_id)
-        )
-        conn.commit()
-        conn.close()
-    
+        due_date = parse_iso_date(due_date)
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET title=?, description=?, due_date=?, completed=? WHERE id=?",
+                (title, description, due_date, completed, task_id)
+            )
+
+    def set_task_completed(self, task_id, completed=True):
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET completed=? WHERE id=?", (1 if completed else 0, task_id)
+            )
+        return cursor.rowcount > 0
+
     def delete_task(self, task_id):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+
+    def get_task(self, task_id, include_archived=False):
+        return self.query(
+            Task, f"SELECT {Task.columns()} FROM {self._task_source(include_archived)} WHERE id=?",
+            (task_id,)
+        ).fetchone()
+
+    # Archive tier
+    ARCHIVE_BATCH_SIZE = 500
+
+    @staticmethod
+    def archive_cutoff(older_than_days, today=None):
+        # Completed tasks due before this date are archived
+        return ((today or date.today()) - timedelta(days=older_than_days)).isoformat()
+
+    def archive_completed_tasks(self, older_than_days=90, batch_size=None, today=None):
+        # Moves completed tasks due more than `older_than_days` ago into
+        # tasks_archive. Each batch is its own short transaction so other
+        # writers are never blocked for long. Returns the number moved.
+        cutoff = self.archive_cutoff(older_than_days, today)
+        batch_size = batch_size or self.ARCHIVE_BATCH_SIZE
+        moved = 0
+        while True:
+            count = self.archive_completed_batch(cutoff, batch_size)
+            moved += count
+            if count < batch_size:
+                return moved
+
+    def archive_completed_batch(self, cutoff, batch_size=None):
+        # One step of archive_completed_tasks: moves up to batch_size completed
+        # tasks due before `cutoff` and returns how many it moved
+        columns = Task.columns()
+        with self.transaction() as conn:
+            ids = json.dumps([row[0] for row in conn.execute(
+                "SELECT id FROM tasks WHERE due_date < ? AND completed != 0 LIMIT ?",
+                (cutoff, batch_size or self.ARCHIVE_BATCH_SIZE)
+            )])
+            conn.execute(
+                f"INSERT OR REPLACE INTO tasks_archive ({columns}) "
+                f"SELECT {columns} FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+                (ids,)
+            )
+            cursor = conn.execute(
+                "DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+            )
+        return cursor.rowcount
+
+    def restore_archived_task(self, task_id):
+        # Moves one task back to the live table (and so back into search)
+        columns = Task.columns()
+        with self.transaction() as conn:
+            conn.execute(
+                f"INSERT INTO tasks ({columns}) SELECT {columns} FROM tasks_archive WHERE id = ?",
+                (task_id,)
+            )
+            cursor = conn.execute("DELETE FROM tasks_archive WHERE id = ?", (task_id,))
+        return cursor.rowcount > 0
+
+    def get_live_task_ids(self, task_ids):
+        # The subset of task_ids still in the live table
+        return {row[0] for row in self.get_connection().execute(
+            "SELECT id FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(task_ids)),)
+        )}
+
+    def count_archived_tasks(self):
+        return self.get_connection().execute("SELECT COUNT(*) FROM tasks_archive").fetchone()[0]
+
+    def compact(self, max_pages=None, convert=True):
+        # Returns free pages to the file system after archiving or deletes.
+        # Files created before incremental auto_vacuum are converted once with
+        # a full VACUUM (skipped when convert is False, as it locks the whole
+        # file); after that each call only frees up to max_pages pages (all of
+        # them when None). Returns the number of pages freed; a conversion can
+        # add pointer-map pages, so that may be 0 even though VACUUM ran.
+        conn = self.get_connection()
         conn.commit()
-        conn.close()
-    
-    def get_task(self, task_id):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE id=?", (task_id,))
-        task = cursor.fetchone()
-        conn.close()
-        return task
-    
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if not convert:
+                return 0
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        elif max_pages is None:
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+        else:
+            conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+        freed = max(0, pages - conn.execute("PRAGMA page_count").fetchone()[0])
+        # Shrink the WAL too, so the freed space actually leaves the disk
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return freed
+
     # Emotional tracker methods
-    def add_emotional_entry(self, mood, day_rating, notes):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        today = datetime.now().strftime("%Y-%m-%d")
-        cursor.execute(
-            "INSERT INTO emotional_entries (date, mood, day_rating, notes) VALUES (?, ?, ?, ?)",
-            (today, mood, day_rating, notes)
-        )
-        conn.commit()
-        conn.close()
-    
-    def get_emotional_entries(self, start_date, end_date):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM emotional_entries WHERE date BETWEEN ? AND ? ORDER BY date",
+    def add_emotional_entry(self, mood, day_rating, notes, date=None):
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO emotional_entries (date, mood, day_rating, notes) VALUES (?, ?, ?, ?)",
+                (date, mood, day_rating, notes)
+            )
+        return cursor.lastrowid
+
+    def get_emotional_entries(self, start_date, end_date, columns=None):
+        return self.iter_emotional_entries(start_date, end_date, columns).fetchall()
+
+    def iter_emotional_entries(self, start_date, end_date, columns=None):
+        return self.query(
+            EmotionalEntry,
+            f"SELECT {EmotionalEntry.columns(columns)} FROM emotional_entries "
+            "WHERE date BETWEEN ? AND ? ORDER BY date",
             (start_date, end_date)
         )
-        entries = cursor.fetchall()
-        conn.close()
-        return entries
-    
+
+    def get_emotional_data_version(self):
+        # Changes whenever an entry is added, edited or removed, here or by a
+        # sync: every change moves the row's change_log entry to a new seq.
+        # Used to key rendered charts.
+        return self.get_connection().execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM change_log WHERE table_name = 'emotional_entries'"
+        ).fetchone()[0]
+
+    # Emotional analytics aggregates (all served by idx_emotional_entries_date)
+    def get_mood_counts(self, start_date, end_date):
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT mood, COUNT(*) AS entries FROM emotional_entries "
+            "WHERE date BETWEEN ? AND ? GROUP BY mood ORDER BY entries DESC, mood",
+            (start_date, end_date)
+        ).fetchall()
+
+    def get_daily_ratings(self, start_date, end_date):
+        # (date, average rating, entries) per logged day
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT date, AVG(day_rating), COUNT(*) FROM emotional_entries "
+            "WHERE date BETWEEN ? AND ? GROUP BY date ORDER BY date",
+            (start_date, end_date)
+        ).fetchall()
+
+    def get_weekday_ratings(self, start_date, end_date):
+        # (weekday 0=Sunday..6, average rating, entries)
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT CAST(strftime('%w', date) AS INTEGER) AS weekday, AVG(day_rating), COUNT(*) "
+            "FROM emotional_entries WHERE date BETWEEN ? AND ? GROUP BY weekday ORDER BY weekday",
+            (start_date, end_date)
+        ).fetchall()
+
     def get_recent_emotional_entries(self, days=7):
         end_date = datetime.now().strftime("%Y-%m-%d")
         start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        return self.get_emotional_entries(start_date, end_date)
\ No newline at end of file
+        return self.get_emotional_entries(start_date, end_date)
+
+    # Recurring task methods
+    def add_task_rule(self, title, description, frequency, start_date, interval=1, end_date=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"frequency must be one of {', '.join(FREQUENCIES)}")
+        if int(interval) < 1:
+            raise ValueError("interval must be at least 1")
+        start_date = parse_iso_date(start_date)
+        if end_date is not None:
+            end_date = parse_iso_date(end_date)
+            if end_date < start_date:
+                raise ValueError("end_date is before start_date")
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO task_rules (title, description, frequency, interval, start_date, end_date) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (title, description, frequency, int(interval), start_date, end_date)
+            )
+        return cursor.lastrowid
+
+    def get_task_rules(self, start_date=None, end_date=None):
+        # Rules active at some point in [start_date, end_date] (all if omitted)
+        return self.query(
+            TaskRule,
+            f"SELECT {TaskRule.columns()} FROM task_rules "
+            "WHERE start_date <= COALESCE(?2, '9999-12-31') AND (end_date IS NULL OR end_date >= COALESCE(?1, '')) "
+            "ORDER BY start_date, id",
+            (start_date, end_date)
+        ).fetchall()
+
+    def get_task_rule(self, rule_id):
+        return self.query(
+            TaskRule, f"SELECT {TaskRule.columns()} FROM task_rules WHERE id=?", (rule_id,)
+        ).fetchone()
+
+    def get_rule_exceptions(self, rule_id=None):
+        # {(rule_id, date): (completed, skipped)} for one rule, or all of them
+        return {
+            (row_rule_id, day): (completed, skipped)
+            for row_rule_id, day, completed, skipped in self.get_connection().execute(
+                "SELECT rule_id, date, completed, skipped FROM task_rule_exceptions "
+                "WHERE ?1 IS NULL OR rule_id = ?1",
+                (rule_id,)
+            )
+        }
+
+    def end_task_rule(self, rule_id, end_date):
+        # Stops a rule after end_date; earlier occurrences and their completions stay
+        end_date = parse_iso_date(end_date)
+        with self.transaction() as conn:
+            cursor = conn.execute("UPDATE task_rules SET end_date=? WHERE id=?", (end_date, rule_id))
+        return cursor.rowcount > 0
+
+    def delete_task_rule(self, rule_id):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM task_rule_exceptions WHERE rule_id=?", (rule_id,))
+            conn.execute("DELETE FROM task_rules WHERE id=?", (rule_id,))
+
+    def set_occurrence_completed(self, rule_id, date, completed=True):
+        return self._set_occurrence_flag(rule_id, date, "completed", completed)
+
+    def skip_occurrence(self, rule_id, date, skipped=True):
+        return self._set_occurrence_flag(rule_id, date, "skipped", skipped)
+
+    def _set_occurrence_flag(self, rule_id, date, flag, value):
+        # Rows that end up with neither flag set are removed again
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO task_rule_exceptions (rule_id, date, {flag}) "
+                "SELECT id, ?2, ?3 FROM task_rules WHERE id = ?1 "
+                f"ON CONFLICT (rule_id, date) DO UPDATE SET {flag} = excluded.{flag}",
+                (rule_id, date, 1 if value else 0)
+            )
+            conn.execute(
+                "DELETE FROM task_rule_exceptions WHERE rule_id=? AND date=? AND completed=0 AND skipped=0",
+                (rule_id, date)
+            )
+        return cursor.rowcount > 0
+
+    def iter_rule_occurrences(self, start_date, end_date, include_skipped=False):
+        # Occurrences of every rule in [start_date, end_date], in date order.
+        # Generated lazily; only the exception rows for the range are read.
+        rules = self.get_task_rules(start_date, end_date)
+        if not rules:
+            return iter(())
+        exceptions = {
+            (rule_id, day): (completed, skipped)
+            for rule_id, day, completed, skipped in self.get_connection().execute(
+                "SELECT rule_id, date, completed, skipped FROM task_rule_exceptions "
+                "WHERE date >= ? AND date <= ?",
+                (start_date, end_date)
+            )
+        }
+        return expand_rules(rules, exceptions, start_date, end_date, include_skipped)
+
+    def get_rule_occurrence_counts(self, start_date, end_date):
+        # {date: (pending, completed)} over generated occurrences
+        counts = {}
+        for occurrence in self.iter_rule_occurrences(start_date, end_date):
+            pending, completed = counts.get(occurrence.due_date, (0, 0))
+            if occurrence.completed:
+                counts[occurrence.due_date] = (pending, completed + 1)
+            else:
+                counts[occurrence.due_date] = (pending + 1, completed)
+        return counts
+
+    def get_agenda(self, start_date, end_date, limit=None):
+        # One-off tasks and rule occurrences in [start_date, end_date], merged in
+        # date order; with a limit only the first page is generated
+        tasks = self.query(
+            Task,
+            f"SELECT {Task.columns(Task.LIST_COLUMNS)} FROM tasks "
+            "WHERE due_date >= ? AND due_date <= ? ORDER BY due_date, id",
+            (start_date, end_date)
+        )
+        merged = heapq.merge(tasks, self.iter_rule_occurrences(start_date, end_date),
+                             key=lambda item: item.due_date)
+        if limit is None:
+            return list(merged)
+        return list(islice(merged, limit))
+
+    # Bulk import/export
+    IMPORT_CHUNK_SIZE = 20000
+    IMPORT_CACHE_KB = 64000
+    TASK_EXPORT_COLUMNS = ("id", "title", "description", "due_date", "completed", "created_at")
+    ENTRY_EXPORT_COLUMNS = ("id", "date", "mood", "day_rating", "notes", "created_at")
+
+    def export_tasks(self, fileobj, fmt="csv", include_archived=True):
+        cursor = self.get_connection().execute(
+            f"SELECT {', '.join(self.TASK_EXPORT_COLUMNS)} FROM {self._task_source(include_archived)} "
+            "ORDER BY id"
+        )
+        return write_records(fileobj, fmt, self.TASK_EXPORT_COLUMNS, cursor)
+
+    def export_emotional_entries(self, fileobj, fmt="csv"):
+        cursor = self.get_connection().execute(
+            f"SELECT {', '.join(self.ENTRY_EXPORT_COLUMNS)} FROM emotional_entries ORDER BY id"
+        )
+        return write_records(fileobj, fmt, self.ENTRY_EXPORT_COLUMNS, cursor)
+
+    def import_tasks(self, fileobj, fmt="csv", skip_duplicates=True, on_error="skip"):
+        # A duplicate is a task with the same title and due date, already in the
+        # database or earlier in the same file
+        def parse(record):
+            title = (text_field(record.get("title")) or "").strip()
+            if not title:
+                raise ValueError("missing title")
+            try:
+                due_date = parse_iso_date(record.get("due_date"))
+            except ValueError:
+                raise ValueError(f"bad due_date {record.get('due_date')!r}")
+            return (title, text_field(record.get("description")) or "", due_date,
+                    parse_flag(record.get("completed", 0)), text_field(record.get("created_at")) or None)
+
+        return self._import("tasks", ("title", "description", "due_date", "completed", "created_at"),
+                            ("title", "due_date") if skip_duplicates else None,
+                            fileobj, fmt, parse, on_error)
+
+    def import_emotional_entries(self, fileobj, fmt="csv", skip_duplicates=True, on_error="skip"):
+        # A duplicate is an entry with the same date, mood and rating
+        def parse(record):
+            mood = (text_field(record.get("mood")) or "").strip()
+            if not mood:
+                raise ValueError("missing mood")
+            try:
+                entry_date = parse_iso_date(record.get("date"))
+            except ValueError:
+                raise ValueError(f"bad date {record.get('date')!r}")
+            try:
+                rating = int(record.get("day_rating"))
+            except (TypeError, ValueError):
+                raise ValueError(f"bad day_rating {record.get('day_rating')!r}")
+            # Same range the tracker's slider and `mood log` allow
+            if not 1 <= rating <= 10:
+                raise ValueError(f"day_rating {rating} is not between 1 and 10")
+            return (entry_date, mood, rating, text_field(record.get("notes")) or "",
+                    text_field(record.get("created_at")) or None)
+
+        return self._import("emotional_entries", ("date", "mood", "day_rating", "notes", "created_at"),
+                            ("date", "mood", "day_rating") if skip_duplicates else None,
+                            fileobj, fmt, parse, on_error)
+
+    def _import(self, table, columns, key, fileobj, fmt, parse, on_error):
+        # Parses a stream of records into `columns` tuples and bulk-inserts
+        # them, one transaction per chunk. With a `key` (column names), rows
+        # whose key is already in the table or earlier in the file count as
+        # duplicates; the existing keys are read once, up front, rather than
+        # probed row by row. on_error is "skip" (record in the report) or
+        # "raise".
+        if on_error not in ("skip", "raise"):
+            raise ValueError("on_error must be 'skip' or 'raise'")
+        report = ImportReport()
+        conn = self.get_connection()
+        seen = None
+        if key is not None:
+            seen = set(conn.execute(f"SELECT {', '.join(key)} FROM {table}"))
+            key = [columns.index(name) for name in key]
+        # Index maintenance dominates bulk inserts; a bigger page cache for the
+        # duration keeps the index pages hot between chunks
+        conn.execute(f"PRAGMA cache_size=-{self.IMPORT_CACHE_KB}")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        try:
+            chunk = []
+            for line, record in read_records(fileobj, fmt):
+                try:
+                    if isinstance(record, Exception):
+                        raise ValueError(f"unreadable record: {record}")
+                    if not isinstance(record, dict):
+                        raise ValueError(f"expected an object, got {type(record).__name__}")
+                    row = parse(record)
+                except ValueError as e:
+                    if on_error == "raise":
+                        self._bulk_insert(conn, table, columns, chunk, report)
+                        raise ImportRejected(line, str(e), report)
+                    report.reject(line, str(e))
+                    continue
+                if seen is not None:
+                    row_key = tuple(row[i] for i in key)
+                    if row_key in seen:
+                        report.duplicates += 1
+                        continue
+                    seen.add(row_key)
+                chunk.append(row)
+                if len(chunk) >= self.IMPORT_CHUNK_SIZE:
+                    self._bulk_insert(conn, table, columns, chunk, report)
+                    chunk = []
+            self._bulk_insert(conn, table, columns, chunk, report)
+            return report
+        finally:
+            conn.execute("PRAGMA cache_size=-8000")
+            conn.execute("PRAGMA wal_autocheckpoint=1000")
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+
+    # Per-row triggers a bulk insert does set-based instead (see _bulk_insert)
+    BULK_SUSPENDED_TRIGGERS = {
+        "tasks": ("tasks_cdc_insert", "tasks_fts_insert", "tasks_due_date_insert_check"),
+        "emotional_entries": ("emotional_entries_cdc_insert",),
+    }
+
+    def _bulk_insert(self, conn, table, columns, rows, report):
+        # Inserts validated rows into a replicated table in one transaction
+        # with its per-row insert triggers suspended, then does their work once
+        # for the whole chunk: uuids, version and site go in with the rows,
+        # the change_log entries and the full-text index entries follow as one
+        # INSERT ... SELECT each over the new ids. Due dates were already
+        # checked by parse_iso_date.
+        if not rows:
+            return
+        values = ", ".join("COALESCE(?, CURRENT_TIMESTAMP)" if name == "created_at" else "?"
+                           for name in columns)
+        with self.transaction():
+            last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+            with self._triggers_suspended(conn, self.BULK_SUSPENDED_TRIGGERS[table]) as suspended:
+                # Time-ordered uuids: a chunk lands at the end of the uuid
+                # index instead of at random pages all over it
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}, uuid, version, site) "
+                    f"VALUES ({values}, printf('%012x', CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)) "
+                    f"|| lower(hex(randomblob(10))), 1, {_SITE_ID})",
+                    rows
+                )
+                conn.execute(
+                    f"INSERT INTO change_log (table_name, uuid, version, site) "
+                    f"SELECT '{table}', uuid, version, site FROM {table} WHERE id > ?",
+                    (last_id,)
+                )
+                if "tasks_fts_insert" in suspended:
+                    conn.execute(
+                        "INSERT INTO tasks_fts (rowid, title, description) "
+                        "SELECT id, title, description FROM tasks WHERE id > ?",
+                        (last_id,)
+                    )
+        report.inserted += len(rows)
+
+    @contextmanager
+    def _triggers_suspended(self, conn, names):
+        # Drops the named triggers and creates them again on the way out. Only
+        # for use inside a transaction: other connections never see the table
+        # without its triggers, and a rollback restores them anyway.
+        saved = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+            "AND name IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(names)),)
+        ).fetchall()
+        for name, _ in saved:
+            conn.execute(f"DROP TRIGGER {name}")
+        try:
+            yield [name for name, _ in saved]
+        finally:
+            for _, sql in saved:
+                conn.execute(sql)
+
+    # Change log and sync (see sync.py)
+    def get_site_id(self):
+        # Random id naming this database file among its replicas
+        return self.get_connection().execute(
+            "SELECT value FROM sync_state WHERE key = 'site'"
+        ).fetchone()[0]
+
+    def reset_site_id(self):
+        # For a file copied from another replica after both had synced: gives
+        # it its own identity and forgets the copied watermarks
+        with self.transaction() as conn:
+            conn.execute("UPDATE sync_state SET value = lower(hex(randomblob(16))) WHERE key = 'site'")
+            conn.execute("DELETE FROM sync_peers")
+        return self.get_site_id()
+
+    def get_sync_peer(self, peer):
+        # (sent_seq, received_seq) watermarks for a peer site; (0, 0) if new
+        row = self.get_connection().execute(
+            "SELECT sent_seq, received_seq FROM sync_peers WHERE peer = ?", (peer,)
+        ).fetchone()
+        return tuple(row) if row else (0, 0)
+
+    def set_sync_peer(self, peer, sent_seq=None, received_seq=None):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO sync_peers (peer, sent_seq, received_seq, synced_at) "
+                "VALUES (?1, COALESCE(?2, 0), COALESCE(?3, 0), CURRENT_TIMESTAMP) "
+                "ON CONFLICT (peer) DO UPDATE SET sent_seq = COALESCE(?2, sent_seq), "
+                "received_seq = COALESCE(?3, received_seq), synced_at = CURRENT_TIMESTAMP",
+                (peer, sent_seq, received_seq)
+            )
+
+    @staticmethod
+    def _sync_sources(table):
+        # Archived tasks are still replicated rows, just stored elsewhere
+        return ("tasks", "tasks_archive") if table == "tasks" else (table,)
+
+    def get_changes_since(self, since, exclude_site=None, limit=500):
+        # Up to `limit` changes after seq `since`, oldest first, as dicts
+        # carrying the row's current data ("row" is None for deletions).
+        # Changes last made by `exclude_site` are left out: that peer has them.
+        # Returns (changes, next_since) where next_since is the watermark to
+        # ask from next time.
+        changes = []
+        with self.transaction() as conn:
+            # Log and rows are read under one lock, so data matches its version
+            upto = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+            entries = conn.execute(
+                "SELECT seq, table_name, uuid, version, site, deleted FROM change_log "
+                "WHERE seq > ? AND site IS NOT ? ORDER BY seq LIMIT ?",
+                (since, exclude_site, limit)
+            ).fetchall()
+            rows = {}
+            for table, columns in SYNC_COLUMNS.items():
+                uuids = json.dumps([uuid for _, name, uuid, _, _, deleted in entries
+                                    if name == table and not deleted])
+                for source in self._sync_sources(table):
+                    for uuid, *values in conn.execute(
+                        f"SELECT uuid, {', '.join(columns)} FROM {source} "
+                        "WHERE uuid IN (SELECT value FROM json_each(?))",
+                        (uuids,)
+                    ):
+                        rows[table, uuid] = dict(zip(columns, values))
+        for seq, table, uuid, version, site, deleted in entries:
+            changes.append({"table": table, "uuid": uuid, "version": version, "site": site,
+                            "deleted": bool(deleted), "row": rows.get((table, uuid))})
+        next_since = entries[-1][0] if len(entries) == limit else upto
+        return changes, next_since
+
+    def apply_changes(self, changes, peer=None, received_seq=None):
+        # Applies changes from another replica in one transaction. The higher
+        # (version, site) wins, so every replica settles on the same row no
+        # matter who syncs with whom or in what order; stale or repeated
+        # changes are skipped. A change this database cannot store (e.g. a
+        # legacy task whose due date was never a date) is rejected on its own
+        # instead of failing the batch. When `peer` is given its received
+        # watermark is stored in the same transaction. Returns (applied,
+        # skipped, rejected) where rejected lists (table, uuid, reason).
+        applied = skipped = 0
+        rejected = []
+        with self.transaction() as conn:
+            for change in changes:
+                try:
+                    with self.transaction():
+                        if self._apply_change(conn, change):
+                            applied += 1
+                        else:
+                            skipped += 1
+                except (ValueError, sqlite3.IntegrityError) as e:
+                    rejected.append((change.get("table"), change.get("uuid"), str(e)))
+            if peer is not None:
+                self.set_sync_peer(peer, received_seq=received_seq)
+        return applied, skipped, rejected
+
+    def _apply_change(self, conn, change):
+        # False if the local row is already as new as the change
+        table, uuid = change["table"], change["uuid"]
+        if table not in SYNC_COLUMNS:
+            raise ValueError(f"Unknown sync table {table!r}")
+        incoming = (change["version"], change["site"])
+        local = conn.execute(
+            "SELECT version, site FROM change_log WHERE table_name = ? AND uuid = ?",
+            (table, uuid)
+        ).fetchone()
+        if local is not None and tuple(local) >= incoming:
+            return False
+        source = next((name for name in self._sync_sources(table) if conn.execute(
+            f"SELECT 1 FROM {name} WHERE uuid = ?", (uuid,)
+        ).fetchone()), None)
+        columns = SYNC_COLUMNS[table]
+        if change["deleted"]:
+            if source:
+                conn.execute(f"DELETE FROM {source} WHERE uuid = ?", (uuid,))
+            self._record_change(conn, table, uuid, *incoming, deleted=True)
+            return True
+        row = dict(change["row"])
+        if table == "tasks":
+            # Same leniency as migration 10; anything else is rejected
+            row["due_date"] = normalize_date(row["due_date"])
+        values = [row[name] for name in columns]
+        if source:
+            # The triggers log live rows; archived ones are logged here
+            conn.execute(
+                f"UPDATE {source} SET {', '.join(f'{name} = ?' for name in columns)}, "
+                "version = ?, site = ? WHERE uuid = ?",
+                (*values, *incoming, uuid)
+            )
+            if source != table:
+                self._record_change(conn, table, uuid, *incoming)
+        else:
+            conn.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}, uuid, version, site) "
+                f"VALUES ({', '.join('?' * (len(columns) + 3))})",
+                (*values, uuid, *incoming)
+            )
+        return True
+
+    @staticmethod
+    def _record_change(conn, table, uuid, version, site, deleted=False):
+        # Moves the row's change_log entry to a new seq with the given version
+        conn.execute("DELETE FROM change_log WHERE table_name = ? AND uuid = ?", (table, uuid))
+        conn.execute(
+            "INSERT INTO change_log (table_name, uuid, version, site, deleted) VALUES (?, ?, ?, ?, ?)",
+            (table, uuid, version, site, 1 if deleted else 0)
+        )
+
+    # Focus session methods
+    def add_focus_sessions(self, sessions):
+        # sessions: iterable of (label, started_at, ended_at, planned_seconds,
+        # actual_seconds, pauses, completed), written in one transaction
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO focus_sessions (label, started_at, ended_at, planned_seconds, "
+                "actual_seconds, pauses, completed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                sessions
+            )
+
+    def get_focus_by_day(self, start_date, end_date):
+        # (day, sessions, focus minutes) from the daily rollup
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT day, SUM(sessions), SUM(focus_seconds) / 60.0 FROM focus_daily_rollup "
+            "WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day",
+            (start_date, end_date)
+        ).fetchall()
+
+    def get_focus_by_week(self, start_date, end_date):
+        # (Monday of the week, sessions, focus minutes). Keyed by date rather
+        # than %W, which splits the week around New Year in two
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT date(day, 'weekday 0', '-6 days') AS week, SUM(sessions), SUM(focus_seconds) / 60.0 "
+            "FROM focus_daily_rollup WHERE day BETWEEN ? AND ? GROUP BY week ORDER BY week",
+            (start_date, end_date)
+        ).fetchall()
+
+    def get_focus_by_label(self, start_date, end_date):
+        # (label, sessions, focus minutes), most focused first
+        conn = self.get_connection()
+        return conn.execute(
+            "SELECT label, SUM(sessions), SUM(focus_seconds) / 60.0 AS minutes "
+            "FROM focus_daily_rollup WHERE day BETWEEN ? AND ? "
+            "GROUP BY label ORDER BY minutes DESC",
+            (start_date, end_date)
+        ).fetchall()
@@ -0,0 +1,122 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class DatabaseWriter:
+    # Runs every mutation on one background thread that owns the write
+    # connection. Requests queued while a commit is in progress are applied
+    # together in a single transaction (group commit), each inside its own
+    # savepoint so one failing request does not undo the others.
+    #
+    # submit() returns a concurrent.futures.Future that resolves only after the
+    # transaction has committed, so a reader notified by it sees the write.
+    # Done callbacks run on the writer thread; GUI callers marshal them with
+    # wx.CallAfter.
+    #
+    # submit_alone() is for work that cannot run inside a transaction, such as
+    # VACUUM or a WAL checkpoint: it runs by itself, in submission order.
+    MAX_BATCH = 200
+
+    def __init__(self, db_manager, max_batch=MAX_BATCH):
+        self.db_manager = db_manager
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        # func runs on the writer thread, typically a DatabaseManager method
+        return self._submit(func, args, kwargs, alone=False)
+
+    def submit_alone(self, func, *args, **kwargs):
+        return self._submit(func, args, kwargs, alone=True)
+
+    def _submit(self, func, args, kwargs, alone):
+        if self.closed:
+            raise RuntimeError("DatabaseWriter is closed")
+        future = Future()
+        self.requests.put((func, args, kwargs, future, alone))
+        return future
+
+    def flush_async(self):
+        # Resolves once everything submitted so far is committed
+        return self.submit(lambda: None)
+
+    def flush(self, timeout=None):
+        # Blocks until everything submitted so far is committed; not for the
+        # UI thread, which uses flush_async() instead
+        self.flush_async().result(timeout)
+
+    def _run(self):
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self.requests.get()]
+                # Coalesce whatever piled up while the last commit was running
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self.requests.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    stopping = True
+                    batch = [request for request in batch if request is not None]
+                # Requests that must run alone split the batch in order
+                grouped = []
+                for request in batch:
+                    if request[-1]:
+                        self._commit(grouped)
+                        grouped = []
+                        self._run_alone(request)
+                    else:
+                        grouped.append(request)
+                self._commit(grouped)
+        finally:
+            self.db_manager.release_connection()
+
+    def _commit(self, batch):
+        if not batch:
+            return
+        outcomes = []
+        try:
+            with self.db_manager.transaction():
+                for func, args, kwargs, future, _ in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self.db_manager.transaction():
+                            outcomes.append((future, func(*args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # The transaction itself failed, so nothing in the batch was written
+            for _, _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _run_alone(self, request):
+        func, args, kwargs, future, _ = request
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def close(self):
+        # Drains the queue, commits what is left and stops the thread
+        if self.closed:
+            return
+        self.closed = True
+        self.requests.put(None)
+        self.thread.join()
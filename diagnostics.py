@@ -0,0 +1,76 @@
+import wx
+import instrumentation
+import theme
+
+
+class DiagnosticsDialog(wx.Dialog):
+    # Hidden panel (Ctrl+Shift+D on the main window) showing the latency
+    # histograms collected by instrumentation.py
+    COLUMNS = [("Call", 260), ("Calls", 60), ("Errors", 60), ("Mean ms", 80),
+               ("p50 ms", 80), ("p95 ms", 80), ("Max ms", 80), ("Total ms", 90)]
+    KEYS = ["calls", "errors", "mean_ms", "p50_ms", "p95_ms", "max_ms", "total_ms"]
+    
+    def __init__(self, parent):
+        super().__init__(parent, title="Diagnostics", size=(900, 500),
+                         style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        panel = wx.Panel(self)
+        panel.SetBackgroundColour(theme.CONTENT_BG)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        
+        if instrumentation.is_enabled():
+            status = "Instrumentation is on. Times are wall-clock per call."
+        else:
+            status = "Instrumentation is off. Start the app with STUDYZONE_PROFILE=1 to collect timings."
+        status_label = wx.StaticText(panel, label=status)
+        status_label.SetFont(theme.FONT_NORMAL)
+        sizer.Add(status_label, 0, wx.ALL, 10)
+        
+        self.list_ctrl = wx.ListCtrl(panel, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        for i, (label, width) in enumerate(self.COLUMNS):
+            self.list_ctrl.InsertColumn(i, label, width=width,
+                                        format=wx.LIST_FORMAT_LEFT if i == 0 else wx.LIST_FORMAT_RIGHT)
+        sizer.Add(self.list_ctrl, 1, wx.ALL | wx.EXPAND, 10)
+        
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        for label, handler in [("Refresh", self.on_refresh), ("Reset", self.on_reset),
+                               ("Save JSON...", self.on_save), ("Close", self.on_close)]:
+            btn = wx.Button(panel, label=label)
+            btn.Bind(wx.EVT_BUTTON, handler)
+            button_sizer.Add(btn, 0, wx.ALL, 5)
+        sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.BOTTOM, 10)
+        
+        panel.SetSizer(sizer)
+        self.refresh()
+    
+    def refresh(self):
+        # Slowest calls (by total time) first
+        metrics = instrumentation.METRICS.snapshot()
+        rows = sorted(metrics.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        self.list_ctrl.DeleteAllItems()
+        for i, (name, metric) in enumerate(rows):
+            index = self.list_ctrl.InsertItem(i, name)
+            for column, key in enumerate(self.KEYS, 1):
+                value = metric[key]
+                self.list_ctrl.SetItem(index, column, f"{value:.2f}" if isinstance(value, float) else str(value))
+    
+    def on_refresh(self, event):
+        self.refresh()
+    
+    def on_reset(self, event):
+        instrumentation.METRICS.reset()
+        self.refresh()
+    
+    def on_save(self, event):
+        with wx.FileDialog(self, "Save metrics", defaultFile="metrics.json",
+                           wildcard="JSON files (*.json)|*.json",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dialog:
+            if dialog.ShowModal() != wx.ID_OK:
+                return
+            path = dialog.GetPath()
+        try:
+            instrumentation.METRICS.dump(path)
+        except OSError as e:
+            wx.MessageBox(f"Could not save metrics: {e}", "Error", wx.OK | wx.ICON_ERROR)
+    
+    def on_close(self, event):
+        self.EndModal(wx.ID_OK)
@@ -1,15 +1,17 @@
 import wx
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
-from matplotlib.figure import Figure
 from datetime import datetime, timedelta
+from analytics import EmotionalAnalytics
+from chart_renderer import ChartRenderer, render_mood_pie
 import theme
 
 
 class EmotionalTracker:
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, db_writer=None):
         self.parent = parent
         self.db_manager = db_manager
+        self.db_writer = db_writer
+        # Outlives the dialog so reopening it with unchanged data reuses the charts
+        self.chart_renderer = ChartRenderer()
         
     def create_tracker_panel(self):
         panel = wx.Panel(self.parent)
@@ -17,67 +19,43 @@ class EmotionalTracker:
         
         sizer = wx.BoxSizer(wx.VERTICAL)
         
-        # Title
-        title = wx.StaticText(panel, label="Emotional Tracker")
-        title.SetFont(theme.FONT_SUBTITLE)
-        title.SetForegroundColour(theme.NORMAL_TEXT)
-        sizer.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
-        
-        # Mood selection
-        mood_label = wx.StaticText(panel, label="How are you feeling today?")
-        mood_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        mood_label.SetForegroundColour(theme.SUB_TEXT)
-        sizer.Add(mood_label, 0, wx.ALL, 10)
-        
-        self.mood_choices = ["Happy", "Sad", "Anxious", "Excited", 
-                            "Tired", "Angry", "Peaceful", "Stressed"]
-        self.mood_combo = wx.ComboBox(panel, choices=self.mood_choices, 
-                                      style=wx.CB_READONLY, size=(300, -1))
-        self.mood_combo.SetFont(theme.FONT_NORMAL)
-        sizer.Add(self.mood_combo, 0, wx.ALL | wx.ALIGN_CENTER_HORIZONTAL, 10)
-        
-        # Rating
-        rating_label = wx.StaticText(panel, label="Rate your day (1-10):")
-        rating_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        rating_label.SetForegroundColour(theme.SUB_TEXT)
-        sizer.Add(rating_label, 0, wx.ALL, 10)
-        
-        self.rating_slider = wx.Slider(panel, minValue=1, maxValue=10, value=5,
-                                       style=wx.SL_HORIZONTAL | wx.SL_LABELS)
-        self.rating_slider.SetTickFreq(1)
-        sizer.Add(self.rating_slider, 0, wx.ALL | wx.ALIGN_CENTER_HORIZONTAL, 10)
-        
-        # Notes
-        notes_label = wx.StaticText(panel, label="Notes (optional):")
-        notes_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        notes_label.SetForegroundColour(theme.SUB_TEXT)
-        sizer.Add(notes_label, 0, wx.ALL, 10)
-        
-        self.notes_textctrl = wx.TextCtrl(panel, style=wx.TE_MULTILINE, size=(-1, 80))
-        self.notes_textctrl.SetFont(theme.FONT_NORMAL)
-        sizer.Add(self.notes_textctrl, 0, wx.ALL | wx.EXPAND, 10)
-        
-        # Buttons
-        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
-        save_btn = wx.Button(panel, label="Save Entry")
-        view_btn = wx.Button(panel, label="View Analysis")
-        
-        save_btn.SetBackgroundColour(theme.EMOTION_COLOR)
-        save_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        save_btn.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        
-        view_btn.SetBackgroundColour(theme.BUTTON_SECONDARY_BG)
-        view_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        view_btn.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        
-        save_btn.Bind(wx.EVT_BUTTON, self.on_save_entry)
-        view_btn.Bind(wx.EVT_BUTTON, self.on_view_analysis)
-        
-        button_sizer.Add(save_btn, 0, wx.ALL, 5)
-        button_sizer.Add(view_btn, 0, wx.ALL, 5)
-        sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.BOTTOM, 15)
-        
-        panel.SetSizer(sizer)
+        with theme.building(panel):
+            # Title
+            sizer.Add(theme.label(panel, "Emotional Tracker", theme.FONT_SUBTITLE), 0, wx.ALL | wx.ALIGN_CENTER, 15)
+            
+            # Mood selection
+            sizer.Add(theme.field_label(panel, "How are you feeling today?"), 0, wx.ALL, 10)
+            
+            self.mood_choices = ["Happy", "Sad", "Anxious", "Excited", 
+                                "Tired", "Angry", "Peaceful", "Stressed"]
+            self.mood_combo = wx.ComboBox(panel, choices=self.mood_choices, 
+                                          style=wx.CB_READONLY, size=(300, -1))
+            self.mood_combo.SetFont(theme.FONT_NORMAL)
+            sizer.Add(self.mood_combo, 0, wx.ALL | wx.ALIGN_CENTER_HORIZONTAL, 10)
+            
+            # Rating
+            sizer.Add(theme.field_label(panel, "Rate your day (1-10):"), 0, wx.ALL, 10)
+            
+            self.rating_slider = wx.Slider(panel, minValue=1, maxValue=10, value=5,
+                                           style=wx.SL_HORIZONTAL | wx.SL_LABELS)
+            self.rating_slider.SetTickFreq(1)
+            sizer.Add(self.rating_slider, 0, wx.ALL | wx.ALIGN_CENTER_HORIZONTAL, 10)
+            
+            # Notes
+            self.notes_textctrl = theme.form_row(panel, sizer, "Notes (optional):",
+                                                 wx.TextCtrl(panel, style=wx.TE_MULTILINE, size=(-1, 80)))
+            self.notes_textctrl.SetFont(theme.FONT_NORMAL)
+            
+            # Buttons
+            button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+            save_btn = theme.button(panel, "Save Entry", self.on_save_entry, theme.EMOTION_COLOR)
+            view_btn = theme.button(panel, "View Analysis", self.on_view_analysis)
+            
+            button_sizer.Add(save_btn, 0, wx.ALL, 5)
+            button_sizer.Add(view_btn, 0, wx.ALL, 5)
+            sizer.Add(button_sizer, 0, wx.ALIGN_CENTER | wx.BOTTOM, 15)
+            
+            panel.SetSizer(sizer)
         return panel
     
     def on_save_entry(self, event):
@@ -89,29 +67,75 @@ class EmotionalTracker:
             wx.MessageBox("Please select a mood!", "Error", wx.OK | wx.ICON_ERROR)
             return
         
-        self.db_manager.add_emotional_entry(mood, rating, notes)
+        if self.db_writer is None:
+            self.db_manager.add_emotional_entry(mood, rating, notes)
+            self.on_entry_saved(None)
+            return
+        
+        # Committed on the writer thread; the result comes back via CallAfter
+        future = self.db_writer.submit(self.db_manager.add_emotional_entry, mood, rating, notes)
+        future.add_done_callback(lambda f: wx.CallAfter(self.on_entry_saved, f.exception()))
+    
+    def on_entry_saved(self, error):
+        if error is not None:
+            wx.MessageBox(f"Could not save the entry: {error}", "Error", wx.OK | wx.ICON_ERROR)
+            return
         wx.MessageBox("Entry saved!", "Success", wx.OK | wx.ICON_INFORMATION)
+        if not self.mood_combo:
+            return
         
         self.mood_combo.SetValue("")
         self.rating_slider.SetValue(5)
         self.notes_textctrl.SetValue("")
     
     def on_view_analysis(self, event):
-        dialog = AnalysisDialog(self.parent, self.db_manager)
+        if self.db_writer is None:
+            self.show_analysis()
+            return
+        # Read-your-writes: the analysis must include entries just saved, so
+        # it opens once the writer has committed them, without blocking here
+        future = self.db_writer.flush_async()
+        future.add_done_callback(lambda f: wx.CallAfter(self.show_analysis))
+    
+    def show_analysis(self):
+        dialog = AnalysisDialog(self.parent, self.db_manager, self.chart_renderer)
         dialog.ShowModal()
         dialog.Destroy()
 
 
 class AnalysisDialog(wx.Dialog):
-    def __init__(self, parent, db_manager):
-        super().__init__(parent, title="Emotional Analysis - Last 4 Days", size=(800, 500))
+    RANGE_CHOICES = [("Last 7 Days", "week"), ("Last 30 Days", "month"),
+                     ("Last Year", "year"), ("All Time", "all")]
+    
+    CHART_SIZE = (400, 300)
+    
+    def __init__(self, parent, db_manager, chart_renderer=None):
+        super().__init__(parent, title="Emotional Analysis", size=(800, 540))
         self.db_manager = db_manager
+        self.analytics = EmotionalAnalytics(db_manager)
+        self.chart_renderer = chart_renderer or ChartRenderer()
+        self.chart_key = None
         self.SetBackgroundColour(wx.WHITE)
-        self.create_ui()
+        with theme.building(self):
+            self.create_ui()
         self.load_data()
     
     def create_ui(self):
         panel = wx.Panel(self)
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+        
+        # Range selector
+        range_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        range_label = wx.StaticText(panel, label="Range:")
+        range_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
+        range_sizer.Add(range_label, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+        
+        self.range_choice = wx.Choice(panel, choices=[label for label, _ in self.RANGE_CHOICES])
+        self.range_choice.SetSelection(0)
+        self.range_choice.Bind(wx.EVT_CHOICE, lambda e: self.load_data())
+        range_sizer.Add(self.range_choice, 0, wx.ALL, 5)
+        main_sizer.Add(range_sizer, 0, wx.LEFT | wx.TOP, 15)
+        
         sizer = wx.BoxSizer(wx.HORIZONTAL)
         
         # Left side - Pie chart
@@ -122,9 +146,21 @@ class AnalysisDialog(wx.Dialog):
         chart_title.SetFont(theme.get_font(14, wx.FONTWEIGHT_BOLD))
         left_sizer.Add(chart_title, 0, wx.ALL | wx.ALIGN_CENTER, 10)
         
-        self.figure = Figure(figsize=(4, 3), dpi=100)
-        self.canvas = FigureCanvas(left_panel, -1, self.figure)
-        left_sizer.Add(self.canvas, 1, wx.ALL | wx.EXPAND, 10)
+        # Charts are rendered off the UI thread; a placeholder shows meanwhile
+        self.chart_placeholder = wx.StaticText(left_panel, label="Rendering chart...",
+                                               size=self.CHART_SIZE,
+                                               style=wx.ALIGN_CENTER_HORIZONTAL | wx.ST_NO_AUTORESIZE)
+        self.chart_placeholder.SetForegroundColour(theme.SUB_TEXT)
+        left_sizer.Add(self.chart_placeholder, 1, wx.ALL | wx.EXPAND, 10)
+        
+        self.chart_bitmap = wx.StaticBitmap(left_panel, size=self.CHART_SIZE)
+        self.chart_bitmap.Hide()
+        left_sizer.Add(self.chart_bitmap, 1, wx.ALL | wx.ALIGN_CENTER, 10)
+        
+        self.stats_label = wx.StaticText(left_panel, label="")
+        self.stats_label.SetFont(theme.FONT_SMALL)
+        self.stats_label.SetForegroundColour(theme.SUB_TEXT)
+        left_sizer.Add(self.stats_label, 0, wx.ALL | wx.EXPAND, 10)
         
         left_panel.SetSizer(left_sizer)
         sizer.Add(left_panel, 1, wx.ALL | wx.EXPAND, 10)
@@ -155,7 +191,8 @@ class AnalysisDialog(wx.Dialog):
         right_panel.SetSizer(right_sizer)
         sizer.Add(right_panel, 1, wx.ALL | wx.EXPAND, 10)
         
-        panel.SetSizer(sizer)
+        main_sizer.Add(sizer, 1, wx.EXPAND)
+        panel.SetSizer(main_sizer)
         
         # Dialog sizer
         dialog_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -163,54 +200,24 @@ class AnalysisDialog(wx.Dialog):
         self.SetSizer(dialog_sizer)
     
     def load_data(self):
-        # Get data for last 4 days
-        entries = self.db_manager.get_recent_emotional_entries(4)
+        range_label, range_name = self.RANGE_CHOICES[self.range_choice.GetSelection()]
+        summary = self.analytics.summary(range_name)
+        entries = self.db_manager.get_emotional_entries(
+            summary["start_date"], summary["end_date"],
+            columns=("date", "mood", "day_rating", "notes")
+        )
         
         # Clear previous data
         self.list_ctrl.DeleteAllItems()
-        self.figure.clear()
-        
-        if not entries:
-            # No data message
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, "No data\nfor last 4 days", 
-                   ha='center', va='center', fontsize=14)
-            ax.axis('off')
-            self.canvas.draw()
-            return
-        
-        # Prepare mood data for pie chart
-        mood_counts = {}
-        for entry in entries:
-            mood = entry[2]
-            mood_counts[mood] = mood_counts.get(mood, 0) + 1
-        
-        # Create pie chart
-        ax = self.figure.add_subplot(111)
-        if mood_counts:
-            labels = list(mood_counts.keys())
-            sizes = list(mood_counts.values())
-            
-            # Simple color palette
-            colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', 
-                     '#FF99CC', '#99FFFF', '#FFFF99', '#CC99FF']
-            
-            ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
-                  colors=colors[:len(labels)])
-            ax.set_title('Last 4 Days Moods', fontsize=12)
-            ax.axis('equal')
-        else:
-            ax.text(0.5, 0.5, "No mood data", ha='center', va='center', fontsize=12)
-            ax.axis('off')
-        
-        self.canvas.draw()
+        self.stats_label.SetLabel(self.format_summary(summary) if entries else "")
+        self.request_chart(summary, range_label)
         
         # Fill table with data
         for i, entry in enumerate(entries):
-            date_str = entry[1]
-            mood = entry[2]
-            rating = entry[3]
-            notes = entry[4] if entry[4] else ""
+            date_str = entry.date
+            mood = entry.mood
+            rating = entry.day_rating
+            notes = entry.notes or ""
             
             index = self.list_ctrl.InsertItem(i, date_str)
             self.list_ctrl.SetItem(index, 1, mood)
@@ -219,8 +226,58 @@ class AnalysisDialog(wx.Dialog):
             
             # Color code rating
             if rating >= 8:
-                self.list_ctrl.SetItemTextColour(index, wx.Colour(0, 150, 0))  # Green
+                self.list_ctrl.SetItemTextColour(index, theme.get_colour(0, 150, 0))  # Green
             elif rating >= 5:
-                self.list_ctrl.SetItemTextColour(index, wx.Colour(200, 120, 0))  # Orange
+                self.list_ctrl.SetItemTextColour(index, theme.get_colour(200, 120, 0))  # Orange
             else:
-                self.list_ctrl.SetItemTextColour(index, wx.Colour(200, 0, 0))  # Red
\ No newline at end of file
+                self.list_ctrl.SetItemTextColour(index, theme.get_colour(200, 0, 0))  # Red
+    
+    def request_chart(self, summary, range_label):
+        # Same range + same data version means the cached image is still right
+        key = ("mood_pie", summary["start_date"], summary["end_date"],
+               self.db_manager.get_emotional_data_version())
+        self.chart_key = key
+        
+        image = self.chart_renderer.get_cached(key)
+        if image is not None:
+            self.show_chart(key, image)
+            return
+        
+        self.chart_bitmap.Hide()
+        self.chart_placeholder.SetLabel("Rendering chart...")
+        self.chart_placeholder.Show()
+        self.chart_placeholder.GetParent().Layout()
+        
+        # Mood counts come pre-grouped from SQL
+        mood_counts = summary["moods"]
+        self.chart_renderer.request(
+            key,
+            lambda: render_mood_pie(mood_counts, f"{range_label} Moods",
+                                    f"No data\nfor {range_label.lower()}", self.CHART_SIZE),
+            lambda key, image, error: wx.CallAfter(self.show_chart, key, image, error)
+        )
+    
+    def show_chart(self, key, image, error=None):
+        # Ignore results for a range the user has since moved away from
+        if not self or key != self.chart_key:
+            return
+        if error is not None:
+            self.chart_placeholder.SetLabel(f"Could not render the chart: {error}")
+            self.chart_placeholder.GetParent().Layout()
+            return
+        self.chart_bitmap.SetBitmap(wx.Bitmap.FromBufferRGBA(image.width, image.height, image.rgba))
+        self.chart_placeholder.Hide()
+        self.chart_bitmap.Show()
+        self.chart_bitmap.GetParent().Layout()
+    
+    def format_summary(self, summary):
+        lines = [f"Days logged: {summary['days_logged']}"]
+        if summary["average_rating"] is not None:
+            lines.append(f"Average rating: {summary['average_rating']:.1f} "
+                         f"(± {summary['rating_std']:.1f}), "
+                         f"{self.analytics.rolling_window}-day mean: {summary['rolling_mean']:.1f}")
+        if summary["best_weekday"]:
+            lines.append(f"Best day of the week: {summary['best_weekday']}")
+        lines.append(f"Current streak: {summary['current_streak']} days "
+                     f"(longest {summary['longest_streak']})")
+        return "\n".join(lines)
\ No newline at end of file
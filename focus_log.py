@@ -0,0 +1,64 @@
+import threading
+
+
+class FocusSessionLog:
+    # Buffers finished focus sessions in memory and writes them to SQLite in
+    # batches from a background thread, so the timer never waits on disk.
+    def __init__(self, db_manager, batch_size=20, flush_interval=30.0):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name="focus-log", daemon=True)
+        self.thread.start()
+    
+    def record(self, label, started_at, ended_at, planned_seconds, actual_seconds,
+               pauses=0, completed=True):
+        row = (
+            label or "",
+            started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            ended_at.strftime("%Y-%m-%d %H:%M:%S"),
+            int(planned_seconds),
+            int(round(actual_seconds)),
+            int(pauses),
+            1 if completed else 0,
+        )
+        with self.lock:
+            self.buffer.append(row)
+            full = len(self.buffer) >= self.batch_size
+        if full:
+            self.wake.set()
+    
+    def flush(self):
+        with self.lock:
+            rows, self.buffer = self.buffer, []
+        if rows:
+            try:
+                self.db_manager.add_focus_sessions(rows)
+            except Exception:
+                # Keep the sessions for the next attempt rather than losing them
+                with self.lock:
+                    self.buffer[:0] = rows
+                raise
+        return len(rows)
+    
+    def _run(self):
+        try:
+            while not self.stopping:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+                try:
+                    self.flush()
+                except Exception:
+                    pass
+        finally:
+            self.db_manager.release_connection()
+    
+    def close(self):
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+        self.flush()
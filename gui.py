@@ -1,24 +1,174 @@
+import os
+import sqlite3
+import threading
 import wx
 import wx.adv
+from calendar import monthrange
 from database import DatabaseManager
 from api_client import ZenQuotesAPI
 from emotional_tracker import EmotionalTracker
 from timer import TimerPanel
-from tasks import TaskManager
+from tasks import TaskManager, report_write_error
+from models import RuleOccurrence
+from task_store import TaskStore
+from focus_log import FocusSessionLog
+from db_writer import DatabaseWriter
+from watchdog import StallWatchdog
+import profiles
 import theme
 
 
+def choose_profile():
+    # $STUDYZONE_USER picks the profile outright; otherwise ask at startup when
+    # there is more than one to choose from. Returns None if cancelled.
+    if os.environ.get(profiles.PROFILE_ENV):
+        return profiles.resolve_profile()
+    names = list(profiles.list_profiles())
+    if len(names) <= 1:
+        return names[0] if names else profiles.DEFAULT_PROFILE
+    
+    new_profile = "New profile..."
+    with wx.SingleChoiceDialog(None, "Who is studying?", "Choose profile", names + [new_profile]) as dialog:
+        if dialog.ShowModal() != wx.ID_OK:
+            return None
+        choice = dialog.GetStringSelection()
+    while choice == new_profile:
+        with wx.TextEntryDialog(None, "Profile name:", "New profile") as dialog:
+            if dialog.ShowModal() != wx.ID_OK:
+                return None
+            name = dialog.GetValue().strip()
+        try:
+            choice = profiles.check_name(name)
+        except ValueError as e:
+            wx.MessageBox(str(e), "Error", wx.OK | wx.ICON_ERROR)
+    return choice
+
+
 class MainFrame(wx.Frame):
-    def __init__(self):
-        super().__init__(None, title="Personal Productivity App", size=(1000, 700))
-        self.db_manager = DatabaseManager()
+    # Home page "Upcoming / Overdue" section
+    UPCOMING_DAYS = 7
+    AGENDA_LIMIT = 50
+    
+    def __init__(self, db_name="task_manager.db", profile=None, archive_days=None, stall_ms=None):
+        # archive_days and stall_ms default to $STUDYZONE_ARCHIVE_DAYS and
+        # $STUDYZONE_STALL_MS; 0 turns the archive pass or the watchdog off
+        title = "Personal Productivity App"
+        if profile and profile != profiles.DEFAULT_PROFILE:
+            title += f" - {profile}"
+        super().__init__(None, title=title, size=(1000, 700))
+        self.db_manager = DatabaseManager(db_name)
         self.api_client = ZenQuotesAPI()
+        self.focus_log = FocusSessionLog(self.db_manager)
+        # All task and mood writes go through one background writer thread
+        self.db_writer = DatabaseWriter(self.db_manager)
+        # The store fills in on the writer thread; pages built before then are
+        # refreshed by on_tasks_loaded
+        self.task_store = TaskStore(self.db_manager, self.db_writer, wx.CallAfter,
+                                    on_load=self.on_tasks_loaded)
+        self.task_store.subscribe(self.on_task_event)
+        self.task_store.subscribe_rules(self.on_rule_event)
+        self.highlighted_month = None
         # Initialize with None, we'll create when needed with correct parent
         self.emotional_tracker = None
-        self.task_manager = TaskManager(self, self.db_manager)
+        self.task_manager = TaskManager(self, self.task_store)
+        
+        # Page cache: name -> page window, built on first visit and kept alive
+        self.pages = {}
+        self.dirty_pages = set()
+        self.page_builders = {
+            "home": (self.create_home_panel, self.refresh_home_page),
+            "add_task": (self.task_manager.create_add_task_panel, None),
+            "view_tasks": (self.task_manager.create_view_tasks_panel, self.task_manager.refresh_tasks),
+            "timer": (lambda parent: TimerPanel(parent, self.focus_log), None),
+            "emotional_tracker": (self.create_emotional_tracker_panel, None),
+        }
         
         self.create_ui()
         self.Centre()
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+        
+        # Logs the UI thread's stack whenever it stops answering for longer than
+        # stall_ms
+        self.watchdog = None
+        if stall_ms is None:
+            stall_ms = int(os.environ.get("STUDYZONE_STALL_MS", "500"))
+        if stall_ms > 0:
+            self.watchdog = StallWatchdog(
+                wx.CallAfter, os.environ.get("STUDYZONE_STALL_LOG", "stalls.log"), stall_ms / 1000
+            ).start()
+        
+        # Move completed tasks older than archive_days to the archive tier, off
+        # the UI thread, once the store has loaded
+        if archive_days is None:
+            archive_days = int(os.environ.get("STUDYZONE_ARCHIVE_DAYS", "90"))
+        self.archive_days = archive_days
+        
+        # Hidden diagnostics panel: Ctrl+Shift+D
+        diagnostics_id = wx.NewIdRef()
+        self.Bind(wx.EVT_MENU, self.show_diagnostics, id=diagnostics_id)
+        self.SetAcceleratorTable(wx.AcceleratorTable([
+            (wx.ACCEL_CTRL | wx.ACCEL_SHIFT, ord("D"), diagnostics_id)
+        ]))
+    
+    def show_diagnostics(self, event=None):
+        from diagnostics import DiagnosticsDialog
+        dialog = DiagnosticsDialog(self)
+        dialog.ShowModal()
+        dialog.Destroy()
+    
+    def on_tasks_loaded(self, count, error):
+        if not self or self.IsBeingDeleted():
+            return
+        if error is not None:
+            wx.MessageBox(f"Could not load tasks: {error}", "Error", wx.OK | wx.ICON_ERROR)
+            return
+        self.highlighted_month = None
+        self.invalidate_page("home", "view_tasks")
+        if self.archive_days > 0:
+            threading.Thread(target=self.archive_old_tasks, args=(self.archive_days,),
+                             name="archive", daemon=True).start()
+    
+    def archive_old_tasks(self, days):
+        # Worker thread: every batch, and the compaction after them, is a
+        # request to the writer thread, so edits queued meanwhile wait for
+        # one short batch at most
+        moved = 0
+        try:
+            cutoff = self.db_manager.archive_cutoff(days)
+            batch_size = self.db_manager.ARCHIVE_BATCH_SIZE
+            while True:
+                count = self.db_writer.submit(
+                    self.db_manager.archive_completed_batch, cutoff, batch_size
+                ).result()
+                moved += count
+                if count < batch_size:
+                    break
+            if moved:
+                self.db_writer.submit_alone(
+                    self.db_manager.compact, max_pages=2000, convert=False
+                ).result()
+        except (sqlite3.Error, RuntimeError):
+            # RuntimeError: the writer closed under us as the app shut down
+            pass
+        if moved:
+            wx.CallAfter(self.on_tasks_archived, cutoff)
+    
+    def on_tasks_archived(self, cutoff):
+        # Archived tasks leave the live store and every page built from it
+        self.task_store.drop_archived(cutoff)
+        self.highlighted_month = None
+        self.invalidate_page("home", "view_tasks")
+    
+    def on_close(self, event):
+        if self.watchdog:
+            self.watchdog.stop()
+        # Pending writes are committed; their UI callbacks are no longer wanted
+        self.task_store.unsubscribe(self.on_task_event)
+        self.task_store.unsubscribe_rules(self.on_rule_event)
+        self.db_writer.close()
+        self.focus_log.close()
+        self.db_manager.close()
+        event.Skip()
     
     def create_ui(self):
         # Create splitter window
@@ -36,6 +186,11 @@ class MainFrame(wx.Frame):
         self.content_sizer = wx.BoxSizer(wx.VERTICAL)
         self.content_panel.SetSizer(self.content_sizer)
         
+        # Pages live in a Simplebook; navigating only switches the visible one
+        self.book = wx.Simplebook(self.content_panel)
+        self.book.SetBackgroundColour(theme.CONTENT_BG)
+        self.content_sizer.Add(self.book, 1, wx.EXPAND)
+        
         # Set up splitter
         self.splitter.SplitVertically(self.sidebar_panel, self.content_panel, 200)
         self.splitter.SetMinimumPaneSize(200)
@@ -48,146 +203,269 @@ class MainFrame(wx.Frame):
     def create_sidebar(self):
         vbox = wx.BoxSizer(wx.VERTICAL)
         
-        # App title
-        title = wx.StaticText(self.sidebar_panel, label="Study Zone")
-        title.SetFont(theme.FONT_TITLE)
-        title.SetForegroundColour(theme.TITLE_TEXT)
-        vbox.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
-        
-        vbox.Add(wx.StaticLine(self.sidebar_panel), 0, wx.EXPAND | wx.ALL, 5)
-        
-        # Navigation buttons
-        nav_buttons = [
-            ("Home", self.show_home_page),
-            ("Add Task", self.show_add_task_page),
-            ("View Tasks", self.show_view_tasks_page),
-            ("Timer", self.show_timer_page),
-            ("Emotional Tracker", self.show_emotional_tracker_page)
-        ]
-        
-        for label, handler in nav_buttons:
-            btn = wx.Button(self.sidebar_panel, label=label)
-            btn.SetFont(theme.FONT_NORMAL)
-            btn.SetBackgroundColour(theme.BUTTON_SECONDARY_BG)
-            btn.SetForegroundColour(theme.BUTTON_TEXT)
-            btn.SetMinSize((180, 35))
-            btn.Bind(wx.EVT_BUTTON, handler)
-            vbox.Add(btn, 0, wx.ALL | wx.EXPAND, 5)
-        
-        self.sidebar_panel.SetSizer(vbox)
-    
-    def clear_content(self):
-        # Destroy all children of content panel
-        for child in self.content_panel.GetChildren():
-            child.Destroy()
-        
-        # Clear and reset the sizer
-        self.content_sizer.Clear(delete_windows=True)
-        self.content_panel.SetSizer(self.content_sizer)
+        with theme.building(self.sidebar_panel):
+            # App title
+            title = theme.label(self.sidebar_panel, "Study Zone", theme.FONT_TITLE, theme.TITLE_TEXT)
+            vbox.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
+            
+            vbox.Add(wx.StaticLine(self.sidebar_panel), 0, wx.EXPAND | wx.ALL, 5)
+            
+            # Navigation buttons
+            nav_buttons = [
+                ("Home", self.show_home_page),
+                ("Add Task", self.show_add_task_page),
+                ("View Tasks", self.show_view_tasks_page),
+                ("Timer", self.show_timer_page),
+                ("Emotional Tracker", self.show_emotional_tracker_page)
+            ]
+            
+            for label, handler in nav_buttons:
+                btn = theme.button(self.sidebar_panel, label, handler, font=theme.FONT_NORMAL,
+                                   min_size=(180, 35))
+                vbox.Add(btn, 0, wx.ALL | wx.EXPAND, 5)
+            
+            self.sidebar_panel.SetSizer(vbox)
     
-    def show_home_page(self, event=None):
-        self.clear_content()
+    # -------------------- Page cache --------------------
+    
+    def show_page(self, name):
+        page = self.pages.get(name)
+        builder, refresh = self.page_builders[name]
+        if page is None:
+            # Hidden until the page is fully built and laid out once
+            with theme.building(self.book):
+                page = builder(self.book)
+                self.book.AddPage(page, name)
+            self.pages[name] = page
+        elif name in self.dirty_pages and refresh:
+            refresh()
+        self.dirty_pages.discard(name)
+        
+        self.book.ChangeSelection(self.book.FindPage(page))
+        self.content_panel.Layout()
+    
+    def invalidate_page(self, *names):
+        # Mark pages stale; the visible one refreshes now, others on next visit
+        for name in names:
+            if name not in self.pages:
+                continue
+            refresh = self.page_builders[name][1]
+            if refresh and self.book.GetCurrentPage() is self.pages[name]:
+                refresh()
+            else:
+                self.dirty_pages.add(name)
+    
+    def on_task_event(self, action, task, previous):
+        # Patch the home calendar only if the change touches what it shows
+        if "home" not in self.pages:
+            return
+        shown_date = self.calendar.GetDate().FormatISODate()
+        dates = {task.due_date, previous.due_date if previous else task.due_date}
+        if any(date[:7] == shown_date[:7] for date in dates):
+            self.highlighted_month = None
+            self.highlight_month()
+        if shown_date in dates:
+            self.update_tasks_for_date(shown_date)
+        self.update_agenda()
+    
+    def on_rule_event(self, rule_id):
+        # Occurrences can land on any day, so redraw the visible month and day
+        if "home" not in self.pages:
+            return
+        self.highlighted_month = None
+        self.highlight_month()
+        self.update_tasks_for_date(self.calendar.GetDate().FormatISODate())
+    
+    # -------------------- Home --------------------
+    
+    def create_home_panel(self, parent):
+        panel = wx.Panel(parent)
+        panel.SetBackgroundColour(theme.CONTENT_BG)
+        sizer = wx.BoxSizer(wx.VERTICAL)
         
         # Thought of the day
-        thought_panel = wx.Panel(self.content_panel)
+        thought_panel = wx.Panel(panel)
         thought_panel.SetBackgroundColour(theme.HIGHLIGHT_COLOR)
         thought_sizer = wx.BoxSizer(wx.VERTICAL)
         
-        thought_title = wx.StaticText(thought_panel, label="Thought of the Day")
-        thought_title.SetFont(theme.get_font(14, wx.FONTWEIGHT_BOLD))
-        thought_title.SetForegroundColour(theme.SUB_TEXT)
+        thought_title = theme.field_label(thought_panel, "Thought of the Day",
+                                          theme.get_font(14, wx.FONTWEIGHT_BOLD))
         thought_sizer.Add(thought_title, 0, wx.ALL, 10)
         
-        thought_text = self.api_client.get_thought_of_day()
-        thought_label = wx.StaticText(thought_panel, label=thought_text)
-        thought_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_NORMAL, italic=True))
-        thought_label.Wrap(600)
-        thought_sizer.Add(thought_label, 0, wx.ALL | wx.EXPAND, 10)
+        # Use today's cached quote if we have one, otherwise fetch it off the UI thread
+        thought_text = self.api_client.get_cached_thought()
+        self.thought_label = wx.StaticText(thought_panel, label=thought_text or "Loading thought of the day...")
+        self.thought_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_NORMAL, italic=True))
+        self.thought_label.Wrap(600)
+        thought_sizer.Add(self.thought_label, 0, wx.ALL | wx.EXPAND, 10)
+        if not thought_text:
+            self.api_client.get_thought_of_day_async(
+                lambda text: wx.CallAfter(self.set_thought_of_day, text)
+            )
         
         thought_panel.SetSizer(thought_sizer)
-        self.content_sizer.Add(thought_panel, 0, wx.ALL | wx.EXPAND, 15)
+        sizer.Add(thought_panel, 0, wx.ALL | wx.EXPAND, 15)
         
-        self.content_sizer.Add(wx.StaticLine(self.content_panel), 0, wx.EXPAND | wx.ALL, 10)
+        sizer.Add(wx.StaticLine(panel), 0, wx.EXPAND | wx.ALL, 10)
         
         # Calendar
-        calendar_label = wx.StaticText(self.content_panel, label="Calendar")
-        calendar_label.SetFont(theme.FONT_SUBTITLE)
-        calendar_label.SetForegroundColour(theme.NORMAL_TEXT)
-        self.content_sizer.Add(calendar_label, 0, wx.ALL | wx.ALIGN_CENTER, 10)
+        sizer.Add(theme.label(panel, "Calendar", theme.FONT_SUBTITLE), 0, wx.ALL | wx.ALIGN_CENTER, 10)
         
-        self.calendar = wx.adv.CalendarCtrl(self.content_panel, style=wx.adv.CAL_SHOW_HOLIDAYS)
+        # The generic control supports per-day attributes on every platform
+        self.calendar = wx.adv.GenericCalendarCtrl(panel, style=wx.adv.CAL_SHOW_HOLIDAYS)
         self.calendar.Bind(wx.adv.EVT_CALENDAR_SEL_CHANGED, self.on_date_selected)
-        self.content_sizer.Add(self.calendar, 0, wx.ALL | wx.ALIGN_CENTER, 10)
+        self.calendar.Bind(wx.adv.EVT_CALENDAR_PAGE_CHANGED, self.on_month_changed)
+        sizer.Add(self.calendar, 0, wx.ALL | wx.ALIGN_CENTER, 10)
         
         # Tasks for selected date
-        self.tasks_label = wx.StaticText(self.content_panel, label="Tasks for selected date:")
-        self.tasks_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        self.tasks_label.SetForegroundColour(theme.NORMAL_TEXT)
-        self.content_sizer.Add(self.tasks_label, 0, wx.ALL, 10)
+        self.tasks_label = theme.label(panel, "Tasks for selected date:", theme.FONT_LABEL)
+        sizer.Add(self.tasks_label, 0, wx.ALL, 10)
         
-        self.tasks_list = wx.ListBox(self.content_panel, style=wx.LB_SINGLE)
+        self.tasks_list = wx.ListBox(panel, style=wx.LB_SINGLE)
         self.tasks_list.SetBackgroundColour(wx.WHITE)
-        self.content_sizer.Add(self.tasks_list, 1, wx.ALL | wx.EXPAND, 10)
+        # Double-click edits a task, or ticks off a recurring occurrence
+        self.tasks_list.Bind(wx.EVT_LISTBOX_DCLICK, self.on_day_item_activated)
+        self.day_items = []
+        sizer.Add(self.tasks_list, 1, wx.ALL | wx.EXPAND, 10)
+        
+        # Upcoming / overdue, straight from the SQL range queries
+        self.agenda_label = theme.label(panel, "Upcoming / Overdue", theme.FONT_LABEL)
+        sizer.Add(self.agenda_label, 0, wx.ALL, 10)
+        
+        self.agenda_list = wx.ListBox(panel, style=wx.LB_SINGLE)
+        self.agenda_list.SetBackgroundColour(wx.WHITE)
+        self.agenda_list.Bind(wx.EVT_LISTBOX_DCLICK, self.on_agenda_item_activated)
+        self.agenda_items = []
+        sizer.Add(self.agenda_list, 1, wx.ALL | wx.EXPAND, 10)
+        
+        panel.SetSizer(sizer)
         
         # Show today's tasks initially
+        self.highlight_month()
         self.update_tasks_for_date(self.calendar.GetDate().FormatISODate())
+        self.update_agenda()
         
-        # Force layout update
-        self.content_panel.Layout()
-        self.Layout()
+        panel.Layout()
+        return panel
+    
+    def refresh_home_page(self):
+        self.highlighted_month = None
+        self.highlight_month()
+        self.update_tasks_for_date(self.calendar.GetDate().FormatISODate())
+        self.update_agenda()
+    
+    def set_thought_of_day(self, text):
+        # The window may have been closed while the fetch was running
+        if not self.thought_label:
+            return
+        self.thought_label.SetLabel(text)
+        self.thought_label.Wrap(600)
+        self.thought_label.GetParent().Layout()
+        self.pages["home"].Layout()
     
     def on_date_selected(self, event):
+        self.highlight_month()
         selected_date = self.calendar.GetDate().FormatISODate()
         self.update_tasks_for_date(selected_date)
     
+    def on_month_changed(self, event):
+        self.highlight_month()
+        event.Skip()
+    
+    def highlight_month(self):
+        # Mark days with pending work, and days whose tasks are all done
+        date = self.calendar.GetDate()
+        year, month = date.GetYear(), date.GetMonth() + 1
+        if self.highlighted_month == (year, month):
+            return
+        self.highlighted_month = (year, month)
+        
+        counts = self.task_store.get_month_task_counts(year, month)
+        for day in range(1, monthrange(year, month)[1] + 1):
+            day_counts = counts.get(f"{year:04d}-{month:02d}-{day:02d}")
+            if day_counts is None:
+                self.calendar.ResetAttr(day)
+                continue
+            pending, completed = day_counts
+            # The control takes ownership of each attr, so never share one between days
+            if pending:
+                attr = wx.adv.CalendarDateAttr(theme.NORMAL_TEXT, theme.TASK_PANEL_BG,
+                                               theme.TASK_COLOR, theme.get_font(10, wx.FONTWEIGHT_BOLD),
+                                               wx.adv.CAL_BORDER_ROUND)
+            else:
+                attr = wx.adv.CalendarDateAttr(theme.SUB_TEXT, theme.HIGHLIGHT_COLOR)
+            self.calendar.SetAttr(day, attr)
+        self.calendar.Refresh()
+    
     def update_tasks_for_date(self, date):
-        tasks = self.db_manager.get_tasks_by_date(date)
+        # One-off tasks, then the recurring occurrences generated for this day
+        tasks = self.task_store.get_tasks_by_date(date)
+        self.day_items = tasks + self.task_store.get_occurrences(date, date)
         self.tasks_list.Clear()
         
-        if not tasks:
+        if not self.day_items:
             self.tasks_list.Append("No tasks for this date")
         else:
-            for task in tasks:
-                status = "✅ Completed" if task[4] else "⭕ Pending"
-                self.tasks_list.Append(f"{status}: {task[1]}")
+            for task in self.day_items:
+                status = "✅ Completed" if task.completed else "⭕ Pending"
+                repeat = " 🔁" if isinstance(task, RuleOccurrence) else ""
+                self.tasks_list.Append(f"{status}: {task.title}{repeat}")
         
         self.tasks_label.SetLabel(f"Tasks for {date}:")
     
+    def on_day_item_activated(self, event):
+        index = event.GetSelection()
+        if not 0 <= index < len(self.day_items):
+            return
+        item = self.day_items[index]
+        if isinstance(item, RuleOccurrence):
+            self.task_store.set_occurrence_completed(item.rule_id, item.due_date, not item.completed,
+                                                     callback=report_write_error)
+            return
+        self.task_manager.edit_task(item.id, self)
+    
+    def update_agenda(self):
+        # Overdue first (oldest first), then what is due in the next week
+        overdue = self.task_store.get_overdue(limit=self.AGENDA_LIMIT)
+        upcoming = self.task_store.get_upcoming(self.UPCOMING_DAYS, limit=self.AGENDA_LIMIT)
+        counts = self.task_store.get_status_counts()
+        self.agenda_items = overdue + upcoming
+        self.agenda_list.Clear()
+        
+        if not self.agenda_items:
+            self.agenda_list.Append("Nothing overdue or due this week")
+        for task in overdue:
+            self.agenda_list.Append(f"⚠️ Overdue since {task.due_date}: {task.title}")
+        for task in upcoming:
+            self.agenda_list.Append(f"📅 {task.due_date}: {task.title}")
+        
+        self.agenda_label.SetLabel(f"Upcoming / Overdue ({counts['overdue']} overdue, "
+                                   f"{counts['pending']} pending, {counts['completed']} done)")
+    
+    def on_agenda_item_activated(self, event):
+        index = event.GetSelection()
+        if not 0 <= index < len(self.agenda_items):
+            return
+        self.task_manager.edit_task(self.agenda_items[index].id, self)
+    
+    # -------------------- Navigation --------------------
+    
+    def create_emotional_tracker_panel(self, parent):
+        self.emotional_tracker = EmotionalTracker(parent, self.db_manager, self.db_writer)
+        return self.emotional_tracker.create_tracker_panel()
+    
+    def show_home_page(self, event=None):
+        self.show_page("home")
+    
     def show_add_task_page(self, event=None):
-        self.clear_content()
-        panel = self.task_manager.create_add_task_panel()
-        # Make sure the panel has content_panel as parent
-        panel.Reparent(self.content_panel)
-        self.content_sizer.Add(panel, 1, wx.EXPAND)
-        self.content_panel.Layout()
-        self.Layout()
+        self.show_page("add_task")
     
     def show_view_tasks_page(self, event=None):
-        self.clear_content()
-        panel = self.task_manager.create_view_tasks_panel()
-        # Make sure the panel has content_panel as parent
-        panel.Reparent(self.content_panel)
-        self.content_sizer.Add(panel, 1, wx.EXPAND)
-        self.content_panel.Layout()
-        self.Layout()
+        self.show_page("view_tasks")
     
     def show_timer_page(self, event=None):
-        self.clear_content()
-    
-        # Create TimerPanel directly in content_panel
-        timer_panel = TimerPanel(self.content_panel)
-        self.content_sizer.Add(timer_panel, 1, wx.EXPAND)
-    
-        self.content_panel.Layout()
-        self.Layout()
+        # The timer panel is kept alive, so a running countdown survives navigation
+        self.show_page("timer")
     
     def show_emotional_tracker_page(self, event=None):
-        self.clear_content()
-        
-        # Create EmotionalTracker with content_panel as parent
-        emotional_tracker = EmotionalTracker(self.content_panel, self.db_manager)
-        panel = emotional_tracker.create_tracker_panel()
-        self.content_sizer.Add(panel, 1, wx.EXPAND)
-        
-        self.content_panel.Layout()
-        self.Layout()
\ No newline at end of file
+        self.show_page("emotional_tracker")
@@ -0,0 +1,179 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Opt-in latency instrumentation. Nothing is wrapped until enable() runs, so
+# with instrumentation off the hot paths are the original, untouched methods.
+#
+#   STUDYZONE_PROFILE=1                    enable at startup (see main.py)
+#   STUDYZONE_PROFILE_DUMP=metrics.json    also write the metrics on exit
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class Histogram:
+    __slots__ = ("counts", "calls", "errors", "total_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+
+    def add(self, ms, failed=False):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.calls += 1
+        self.errors += failed
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the percentile, capped at the max seen
+        if not self.calls:
+            return 0.0
+        rank = fraction * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {("inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(BUCKETS_MS, self.counts) if count},
+        }
+
+
+class Metrics:
+    # Thread-safe name -> Histogram registry
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.started = time.time()
+
+    def record(self, name, ms, failed=False):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(ms, failed)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: histogram.as_dict() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.started = time.time()
+
+    def dump(self, path):
+        data = {"started": self.started, "dumped": time.time(), "metrics": self.snapshot()}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+METRICS = Metrics()
+_wrapped = []  # (owner, name, original) so disable() can put things back
+
+
+def timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            METRICS.record(name, (time.perf_counter() - started) * 1000, failed)
+    wrapper.instrumented = True
+    return wrapper
+
+
+def _is_method(value):
+    # staticmethod objects are callable, classmethod objects are not
+    return callable(value) or isinstance(value, (staticmethod, classmethod))
+
+
+def instrument(owner, names, prefix):
+    for name in names:
+        original = owner.__dict__.get(name)
+        if not _is_method(original):
+            continue
+        # Static and class methods: time the function, keep the descriptor, so
+        # no `self` is passed where none is expected
+        descriptor = type(original) if isinstance(original, (staticmethod, classmethod)) else None
+        func = original.__func__ if descriptor else original
+        if getattr(func, "instrumented", False):
+            continue
+        wrapper = timed(f"{prefix}.{name}", func)
+        setattr(owner, name, descriptor(wrapper) if descriptor else wrapper)
+        _wrapped.append((owner, name, original))
+
+
+def public_methods(cls, skip=()):
+    return [name for name, value in vars(cls).items()
+            if _is_method(value) and not name.startswith("_") and name not in skip]
+
+
+def is_enabled():
+    return bool(_wrapped)
+
+
+def enable(gui=True):
+    # Wraps the database, network and (if gui) page-building entry points.
+    # Call before the main frame is created: page builders bind methods then.
+    if _wrapped:
+        return
+    from database import DatabaseManager
+    from api_client import ZenQuotesAPI
+    # Connection plumbing runs inside the timed calls and would only add noise
+    instrument(DatabaseManager, public_methods(
+        DatabaseManager, skip=("get_connection", "release_connection", "transaction", "close")
+    ), "db")
+    instrument(ZenQuotesAPI, ["get_thought_of_day", "fetch_thought"], "api")
+    if gui:
+        from gui import MainFrame
+        from emotional_tracker import AnalysisDialog
+        instrument(MainFrame, [name for name in vars(MainFrame)
+                               if name.startswith(("show_", "create_")) and name.endswith(("_page", "_panel"))],
+                   "page")
+        instrument(AnalysisDialog, ["load_data"], "analysis")
+
+
+def disable():
+    while _wrapped:
+        owner, name, original = _wrapped.pop()
+        setattr(owner, name, original)
+
+
+def enable_from_environment(gui=True):
+    if os.environ.get("STUDYZONE_PROFILE", "") in ("", "0"):
+        return False
+    enable(gui)
+    dump_path = os.environ.get("STUDYZONE_PROFILE_DUMP")
+    if dump_path:
+        import atexit
+        atexit.register(METRICS.dump, dump_path)
+    return True
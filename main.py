@@ -1,14 +1,33 @@
-import wx
-from gui import MainFrame
+import sys
 
-class TaskManagerApp(wx.App):
-    def OnInit(self):
-        self.frame = MainFrame()
-        self.frame.Show()
-        return True
 
-if __name__ == "__main__":
+def run_gui():
+    # wx is only imported for the GUI, so the command line starts without it
+    import wx
+    import instrumentation
+    # Opt-in timings; must wrap MainFrame before it is created
+    instrumentation.enable_from_environment()
+    import profiles
+    from gui import MainFrame, choose_profile
+
+    class TaskManagerApp(wx.App):
+        def OnInit(self):
+            profile = choose_profile()
+            if profile is None:
+                return False
+            self.frame = MainFrame(profiles.prepare_path(profile), profile)
+            self.frame.Show()
+            return True
+
     app = TaskManagerApp()
     app.MainLoop()
 
 
+if __name__ == "__main__":
+    # Any arguments run the headless command line (see cli.py)
+    if len(sys.argv) > 1:
+        import instrumentation
+        instrumentation.enable_from_environment(gui=False)
+        from cli import main
+        sys.exit(main(sys.argv[1:]))
+    run_gui()
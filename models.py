@@ -0,0 +1,61 @@
+class Record:
+    # Compact row object; columns not selected by a query are left as None
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, None)
+        for column, value in zip(cursor.description, row):
+            setattr(record, column[0], value)
+        return record
+
+    @classmethod
+    def columns(cls, names=None):
+        # SQL column list for a projection, rejecting unknown names
+        if names is None:
+            return ", ".join(cls.__slots__)
+        unknown = set(names) - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"Unknown {cls.__name__} columns: {', '.join(sorted(unknown))}")
+        return ", ".join(names)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__
+                           if getattr(self, name) is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class Task(Record):
+    __slots__ = ("id", "title", "description", "due_date", "completed", "created_at",
+                 "uuid", "version", "site")
+
+    # Columns the list views actually render
+    LIST_COLUMNS = ("id", "title", "due_date", "completed")
+
+
+class EmotionalEntry(Record):
+    __slots__ = ("id", "date", "mood", "day_rating", "notes", "created_at",
+                 "uuid", "version", "site")
+
+
+class TaskRule(Record):
+    # A recurring task: stored once and expanded on demand (see recurrence.py)
+    __slots__ = ("id", "title", "description", "frequency", "interval",
+                 "start_date", "end_date", "created_at")
+
+
+class RuleOccurrence(Record):
+    # One generated occurrence of a TaskRule; quacks like a Task for display
+    __slots__ = ("rule_id", "title", "description", "due_date", "completed")
@@ -0,0 +1,149 @@
+import os
+import re
+import sqlite3
+from datetime import date
+
+# One database file per profile, so students sharing an install never contend
+# on the same write lock. The "default" profile is the original
+# task_manager.db next to the app; every other profile lives in PROFILE_DIR.
+#
+#   STUDYZONE_USER=alice python main.py          # GUI as alice
+#   python main.py --profile alice task list     # CLI as alice
+#   python main.py profile report                # all profiles, one SQL pass
+
+DEFAULT_PROFILE = "default"
+DEFAULT_DB = "task_manager.db"
+PROFILE_DIR = os.environ.get("STUDYZONE_PROFILE_DIR", "profiles")
+# Named STUDYZONE_USER because STUDYZONE_PROFILE already switches on timing
+PROFILE_ENV = "STUDYZONE_USER"
+
+_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+
+
+def check_name(name):
+    # Profile names become file names, so keep them to a safe alphabet
+    if not _NAME.fullmatch(name) or name.endswith(".db"):
+        raise ValueError(f"bad profile name {name!r}; use letters, digits, '.', '_' or '-'")
+    return name
+
+
+def profile_path(name, directory=None):
+    if check_name(name) == DEFAULT_PROFILE:
+        return DEFAULT_DB
+    return os.path.join(directory or PROFILE_DIR, f"{name}.db")
+
+
+def resolve_profile(name=None):
+    # Explicit choice first, then the environment, then the shared default
+    return check_name(name or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE)
+
+
+def list_profiles(directory=None):
+    # {name: path} for every profile that has a database file
+    found = {}
+    if os.path.exists(DEFAULT_DB):
+        found[DEFAULT_PROFILE] = DEFAULT_DB
+    directory = directory or PROFILE_DIR
+    try:
+        entries = sorted(os.listdir(directory))
+    except OSError:
+        entries = []
+    for entry in entries:
+        name, ext = os.path.splitext(entry)
+        if ext == ".db" and _NAME.fullmatch(name) and name != DEFAULT_PROFILE:
+            found[name] = os.path.join(directory, entry)
+    return found
+
+
+def prepare_path(name, directory=None):
+    # profile_path, creating the profile directory if needed
+    path = profile_path(name, directory)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def create_profile(name, directory=None):
+    # An empty, migrated database for the profile
+    from database import DatabaseManager
+    path = prepare_path(name, directory)
+    DatabaseManager(path).close()
+    return path
+
+
+class ProfileReport:
+    # Read-only reporting across profiles. The databases are ATTACHed to one
+    # in-memory connection and each report is a single UNION ALL query over
+    # them, instead of opening, querying and closing every file in turn.
+    # SQLite caps the number of attached databases (10 by default), so larger
+    # sets are reported in chunks of that size.
+    def __init__(self, profiles):
+        # profiles: {name: path}, e.g. from list_profiles()
+        self.profiles = dict(profiles)
+        self.conn = sqlite3.connect("file::memory:", uri=True)
+        self.conn.execute("PRAGMA query_only=ON")
+        self.chunk_size = self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _attach(self, chunk):
+        schemas = []
+        for i, (name, path) in enumerate(chunk):
+            schema = f"p{i}"
+            uri = "file:" + os.path.abspath(path).replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+            self.conn.execute("ATTACH DATABASE ? AS " + schema, (uri,))
+            schemas.append((name, schema))
+        return schemas
+
+    def _detach(self, schemas):
+        for _, schema in schemas:
+            self.conn.execute("DETACH DATABASE " + schema)
+
+    def _union(self, select, params):
+        # Runs `select` (with a {schema} placeholder) once per profile as one
+        # statement per chunk; yields rows prefixed with the profile name
+        items = list(self.profiles.items())
+        for start in range(0, len(items), self.chunk_size):
+            schemas = self._attach(items[start:start + self.chunk_size])
+            try:
+                sql = " UNION ALL ".join(
+                    f"SELECT ? AS profile, * FROM ({select.format(schema=schema)})"
+                    for _, schema in schemas
+                )
+                args = []
+                for name, _ in schemas:
+                    args += [name, *params]
+                yield from self.conn.execute(sql, args).fetchall()
+            finally:
+                self._detach(schemas)
+
+    def task_counts(self, today=None):
+        # {profile: {"pending", "overdue", "completed", "total"}}; "pending"
+        # excludes overdue tasks, as in DatabaseManager.get_task_status_counts
+        today = (today or date.today()).isoformat()
+        rows = self._union(
+            "SELECT COALESCE(SUM(completed = 0 AND due_date >= ?), 0), "
+            "COALESCE(SUM(completed = 0 AND due_date < ?), 0), "
+            "COALESCE(SUM(completed != 0), 0), COUNT(*) FROM {schema}.tasks",
+            (today, today)
+        )
+        return {profile: {"pending": pending, "overdue": overdue, "completed": completed, "total": total}
+                for profile, pending, overdue, completed, total in rows}
+
+    def mood_summary(self, start_date, end_date):
+        # {profile: {"entries", "average_rating"}} for entries in the range
+        rows = self._union(
+            "SELECT COUNT(*), AVG(day_rating) FROM {schema}.emotional_entries "
+            "WHERE date BETWEEN ? AND ?",
+            (start_date, end_date)
+        )
+        return {profile: {"entries": entries,
+                          "average_rating": None if average is None else round(average, 2)}
+                for profile, entries, average in rows}
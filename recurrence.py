@@ -0,0 +1,66 @@
+import heapq
+from calendar import monthrange
+from datetime import date, timedelta
+from models import RuleOccurrence
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+FREQUENCIES = (DAILY, WEEKLY, MONTHLY)
+
+
+def add_months(day, months, anchor_day):
+    # Same day of the month `months` later, clamped to the month's length
+    # (a rule anchored on the 31st falls on Feb 28/29, then back on Mar 31)
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    return date(year, month + 1, min(anchor_day, monthrange(year, month + 1)[1]))
+
+
+def occurrences(frequency, interval, start_date, end_date, window_start, window_end):
+    # Lazily yields the dates a rule falls on inside [window_start, window_end].
+    # The first date is found arithmetically, so the cost depends on the size
+    # of the window, never on how long ago the rule started.
+    first = max(start_date, window_start)
+    last = window_end if end_date is None else min(end_date, window_end)
+    if first > last:
+        return
+    if frequency in (DAILY, WEEKLY):
+        step = interval * (7 if frequency == WEEKLY else 1)
+        skipped = -(-(first - start_date).days // step)
+        day = start_date + timedelta(days=skipped * step)
+        while day <= last:
+            yield day
+            day += timedelta(days=step)
+    elif frequency == MONTHLY:
+        months = (first.year - start_date.year) * 12 + first.month - start_date.month
+        n = months // interval * interval
+        while True:
+            day = add_months(start_date, n, start_date.day)
+            if day > last:
+                return
+            if day >= first:
+                yield day
+            n += interval
+    else:
+        raise ValueError(f"Unknown frequency {frequency!r}")
+
+
+def expand_rules(rules, exceptions, start_date, end_date, include_skipped=False):
+    # Occurrences of `rules` in [start_date, end_date] (ISO strings), merged in
+    # date order. exceptions maps (rule_id, date) to (completed, skipped) and
+    # may hold more than the window.
+    window_start = date.fromisoformat(start_date)
+    window_end = date.fromisoformat(end_date)
+
+    def expand(rule):
+        for day in occurrences(rule.frequency, rule.interval, date.fromisoformat(rule.start_date),
+                               rule.end_date and date.fromisoformat(rule.end_date),
+                               window_start, window_end):
+            day = day.isoformat()
+            completed, skipped = exceptions.get((rule.id, day), (0, 0))
+            if skipped and not include_skipped:
+                continue
+            yield RuleOccurrence(rule_id=rule.id, title=rule.title, description=rule.description,
+                                 due_date=day, completed=completed)
+
+    return heapq.merge(*(expand(rule) for rule in rules), key=lambda occurrence: occurrence.due_date)
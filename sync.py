@@ -0,0 +1,192 @@
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from database import DatabaseManager
+
+# Incremental sync between copies of the database (e.g. laptop and desktop).
+# Triggers record every change to tasks and mood entries in change_log (see
+# database._add_change_log); a sync sends only the entries past the last
+# watermark each way, so its cost follows the number of changes rather than
+# the size of the database. Conflicts go to the higher (version, site), the
+# same winner on every replica.
+#
+#   python main.py sync run ~/Dropbox/desktop.db
+#   python main.py sync serve --port 8765              # on the desktop
+#   python main.py sync run http://desktop:8765        # on the laptop
+
+BATCH_SIZE = 500
+
+
+class SyncReport:
+    def __init__(self, peer):
+        self.peer = peer
+        self.sent = 0
+        self.received = 0
+        self.applied = 0
+        self.skipped = 0
+        # (side, table, uuid, reason) for changes one side could not store;
+        # side is "peer" for pushed changes, "local" for pulled ones
+        self.rejected = []
+
+    def __repr__(self):
+        return (f"SyncReport(sent={self.sent}, received={self.received}, "
+                f"applied={self.applied}, skipped={self.skipped}, rejected={len(self.rejected)})")
+
+
+class DatabasePeer:
+    # Another database file opened directly
+    def __init__(self, db):
+        self.db = db
+
+    def site(self):
+        return self.db.get_site_id()
+
+    def changes_since(self, since, exclude_site, limit):
+        return self.db.get_changes_since(since, exclude_site, limit)
+
+    def apply(self, changes):
+        return self.db.apply_changes(changes)
+
+    def close(self):
+        self.db.close()
+
+
+class HttpPeer:
+    # A database served by `serve` (python main.py sync serve)
+    TIMEOUT = 30
+
+    def __init__(self, url):
+        import requests
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+
+    def _post(self, path, payload):
+        response = self.session.post(self.url + path, json=payload, timeout=self.TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def site(self):
+        response = self.session.get(self.url + "/site", timeout=self.TIMEOUT)
+        response.raise_for_status()
+        return response.json()["site"]
+
+    def changes_since(self, since, exclude_site, limit):
+        result = self._post("/changes", {"since": since, "exclude_site": exclude_site, "limit": limit})
+        return result["changes"], result["next_since"]
+
+    def apply(self, changes):
+        result = self._post("/apply", {"changes": changes})
+        return result["applied"], result["skipped"], [tuple(item) for item in result["rejected"]]
+
+    def close(self):
+        self.session.close()
+
+
+def open_peer(target):
+    # A URL or the path of another database file
+    if target.startswith(("http://", "https://")):
+        return HttpPeer(target)
+    return DatabasePeer(DatabaseManager(target))
+
+
+def sync(db, peer, batch_size=BATCH_SIZE):
+    # Pushes our changes the peer has not seen, then pulls the peer's. Each
+    # batch advances the watermark only once it has been applied, so an
+    # interrupted sync resumes where it stopped; re-sent changes are skipped.
+    # Changes the other side rejects are listed in the report, not retried.
+    report = SyncReport(peer.site())
+    site = db.get_site_id()
+    if report.peer == site:
+        raise ValueError("cannot sync a database with itself; if it is a copied file, "
+                         "run `sync reset-site` on the copy first")
+    sent_seq, received_seq = db.get_sync_peer(report.peer)
+
+    while True:
+        changes, next_since = db.get_changes_since(sent_seq, report.peer, batch_size)
+        if changes:
+            rejected = peer.apply(changes)[2]
+            report.sent += len(changes)
+            report.rejected += [("peer", *item) for item in rejected]
+        if next_since != sent_seq:
+            sent_seq = next_since
+            db.set_sync_peer(report.peer, sent_seq=sent_seq)
+        if len(changes) < batch_size:
+            break
+
+    while True:
+        changes, next_since = peer.changes_since(received_seq, site, batch_size)
+        applied, skipped, rejected = db.apply_changes(changes, report.peer, next_since)
+        report.received += len(changes)
+        report.applied += applied
+        report.skipped += skipped
+        report.rejected += [("local", *item) for item in rejected]
+        received_seq = next_since
+        if len(changes) < batch_size:
+            break
+    return report
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    # GET /site, POST /changes and POST /apply over one DatabaseManager
+    db = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle(self):
+        # Each request runs on its own thread; give its connection back
+        try:
+            super().handle()
+        finally:
+            self.db.release_connection()
+
+    def do_GET(self):
+        if self.path == "/site":
+            self._send(200, {"site": self.db.get_site_id()})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/changes":
+                changes, next_since = self.db.get_changes_since(
+                    int(request["since"]), request.get("exclude_site"),
+                    min(int(request.get("limit", BATCH_SIZE)), 10000)
+                )
+                self._send(200, {"changes": changes, "next_since": next_since})
+            elif self.path == "/apply":
+                applied, skipped, rejected = self.db.apply_changes(request["changes"])
+                self._send(200, {"applied": applied, "skipped": skipped, "rejected": rejected})
+            else:
+                self._send(404, {"error": "not found"})
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+        except sqlite3.Error as e:
+            # e.g. the database is locked; the batch was rolled back
+            self._send(409, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(db, host="127.0.0.1", port=8765, background=False):
+    # Local HTTP stand-in for a sync server. Binds to localhost unless told
+    # otherwise; there is no authentication. Returns the server when
+    # `background` is set (call shutdown() to stop it), else serves forever.
+    handler = type("Handler", (SyncRequestHandler,), {"db": db})
+    server = ThreadingHTTPServer((host, port), handler)
+    if background:
+        threading.Thread(target=server.serve_forever, name="sync-server", daemon=True).start()
+        return server
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
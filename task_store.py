@@ -0,0 +1,349 @@
+import threading
+from bisect import bisect_left, insort
+from calendar import monthrange
+from datetime import date as Date
+from models import Task
+from recurrence import expand_rules
+
+
+class TaskStore:
+    # In-memory copy of the tasks table, indexed by id, by due date and in
+    # list order, that writes through to SQLite and notifies subscribers.
+    #
+    # Listeners are called as listener(action, task, previous) with action one
+    # of "add", "update" or "delete"; previous is the record before an update.
+    #
+    # With a DatabaseWriter, writes return a Future and the store is patched
+    # (and listeners told) only after the write commits, through `dispatch`
+    # (wx.CallAfter in the GUI). callback(task, error) then runs, so the
+    # issuing panel always reads its own write back.
+    # Only what the lists render and sort by; EditTaskDialog reads the full
+    # row (description included) from the database when it opens
+    COLUMNS = Task.LIST_COLUMNS + ("created_at",)
+
+    def __init__(self, db_manager, writer=None, dispatch=None, on_load=None):
+        self.db_manager = db_manager
+        self.writer = writer
+        self.dispatch = dispatch or (lambda func, *args: func(*args))
+        self.lock = threading.RLock()
+        self.listeners = []
+        # Called as listener(rule_id) when a recurring rule or one of its
+        # occurrences changes
+        self.rule_listeners = []
+        self.by_id = {}
+        self.by_date = {}
+        # (due_date, id) ascending; the task list shows it reversed
+        self.order = []
+        # (due_date, id) of the open tasks and the number of completed ones,
+        # so status counts never scan the table
+        self.pending = []
+        self.completed = 0
+        # Recurring rules by id and their exceptions, {(rule_id, date):
+        # (completed, skipped)}; occurrences are expanded from these in memory
+        self.rules = {}
+        self.exceptions = {}
+        self.load(on_load)
+
+    def load(self, callback=None):
+        # Reads the tasks table and swaps the indexes in. With a writer the
+        # read runs on its thread, queued with the writes, so no commit is
+        # missed or applied twice; the store stays empty until callback(count,
+        # error) runs. Returns the count, or a Future with a writer.
+        return self._write(self._read_all, self._swap, callback)
+
+    def _read_all(self):
+        by_id = {}
+        by_date = {}
+        for task in self.db_manager.get_all_tasks(columns=self.COLUMNS):
+            by_id[task.id] = task
+            by_date.setdefault(task.due_date, []).append(task)
+        for tasks in by_date.values():
+            tasks.sort(key=self._day_order)
+        order = sorted((task.due_date, task.id) for task in by_id.values())
+        pending = [(due_date, task_id) for due_date, task_id in order if not by_id[task_id].completed]
+        rules = {rule.id: rule for rule in self.db_manager.get_task_rules()}
+        return (by_id, by_date, order, pending, len(order) - len(pending),
+                rules, self.db_manager.get_rule_exceptions())
+
+    def _swap(self, indexes):
+        with self.lock:
+            (self.by_id, self.by_date, self.order, self.pending, self.completed,
+             self.rules, self.exceptions) = indexes
+        return len(self.order)
+
+    def drop_archived(self, cutoff):
+        # After an archive pass: forgets the completed tasks due before
+        # `cutoff` that have left the live table, rather than reloading it all
+        with self.lock:
+            candidates = [self.by_id[task_id] for _, task_id in self.order[:bisect_left(self.order, (cutoff,))]]
+            candidates = [task for task in candidates if task.completed]
+        if not candidates:
+            return 0
+        live = self.db_manager.get_live_task_ids(task.id for task in candidates)
+        with self.lock:
+            # Filtered in one pass each; removing thousands one by one from
+            # the lists is quadratic
+            gone = [task for task in candidates if task.id not in live and self.by_id.get(task.id) is task]
+            gone_ids = {task.id for task in gone}
+            for task in gone:
+                del self.by_id[task.id]
+            # Only completed tasks are archived
+            self.completed -= len(gone)
+            for day in {task.due_date for task in gone}:
+                tasks = [task for task in self.by_date[day] if task.id not in gone_ids]
+                if tasks:
+                    self.by_date[day] = tasks
+                else:
+                    del self.by_date[day]
+            self.order = [item for item in self.order if item[1] not in gone_ids]
+        return len(gone)
+
+    @staticmethod
+    def _day_order(task):
+        return (task.created_at or "", task.id)
+
+    def _index(self, task):
+        self.by_id[task.id] = task
+        self.by_date.setdefault(task.due_date, []).append(task)
+        if task.completed:
+            self.completed += 1
+        else:
+            insort(self.pending, (task.due_date, task.id))
+
+    def _unindex(self, task):
+        del self.by_id[task.id]
+        if task.completed:
+            self.completed -= 1
+        else:
+            del self.pending[bisect_left(self.pending, (task.due_date, task.id))]
+        day = self.by_date[task.due_date]
+        day.remove(task)
+        if not day:
+            del self.by_date[task.due_date]
+        del self.order[bisect_left(self.order, (task.due_date, task.id))]
+
+    # -------------------- Events --------------------
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def publish(self, action, task, previous=None):
+        for listener in list(self.listeners):
+            listener(action, task, previous)
+
+    def subscribe_rules(self, listener):
+        self.rule_listeners.append(listener)
+
+    def unsubscribe_rules(self, listener):
+        if listener in self.rule_listeners:
+            self.rule_listeners.remove(listener)
+
+    def publish_rule(self, rule_id):
+        for listener in list(self.rule_listeners):
+            listener(rule_id)
+
+    # -------------------- Reads --------------------
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def get_tasks_by_date(self, date):
+        return list(self.by_date.get(date, ()))
+
+    def get_overdue(self, limit=None):
+        # Range queries run in SQL on the due_date indexes
+        return self.db_manager.get_overdue(columns=Task.LIST_COLUMNS, limit=limit)
+
+    def get_upcoming(self, n_days=7, limit=None):
+        return self.db_manager.get_upcoming(n_days, columns=Task.LIST_COLUMNS, limit=limit)
+
+    def get_status_counts(self, today=None):
+        # Same shape as DatabaseManager.get_task_status_counts, from memory
+        today = (today or Date.today()).isoformat()
+        with self.lock:
+            overdue = bisect_left(self.pending, (today,))
+            return {"pending": len(self.pending) - overdue, "overdue": overdue,
+                    "completed": self.completed, "total": len(self.order)}
+
+    def get_occurrences(self, start_date, end_date):
+        # Recurring-task occurrences are generated for the range, never stored
+        with self.lock:
+            rules = sorted((rule for rule in self.rules.values()
+                            if rule.start_date <= end_date and (rule.end_date is None or rule.end_date >= start_date)),
+                           key=lambda rule: (rule.start_date, rule.id))
+            return list(expand_rules(rules, self.exceptions, start_date, end_date))
+
+    def get_month_task_counts(self, year, month):
+        # Same shape as DatabaseManager.get_month_task_counts, from the date
+        # index plus the month's generated occurrences
+        last_day = monthrange(year, month)[1]
+        counts = {}
+        for occurrence in self.get_occurrences(f"{year:04d}-{month:02d}-01",
+                                               f"{year:04d}-{month:02d}-{last_day:02d}"):
+            pending, completed = counts.get(occurrence.due_date, (0, 0))
+            if occurrence.completed:
+                counts[occurrence.due_date] = (pending, completed + 1)
+            else:
+                counts[occurrence.due_date] = (pending + 1, completed)
+        with self.lock:
+            for day in range(1, last_day + 1):
+                date = f"{year:04d}-{month:02d}-{day:02d}"
+                tasks = self.by_date.get(date)
+                if tasks:
+                    completed = sum(1 for task in tasks if task.completed)
+                    pending_rules, completed_rules = counts.get(date, (0, 0))
+                    counts[date] = (len(tasks) - completed + pending_rules, completed + completed_rules)
+        return counts
+
+    def search(self, query, limit=50):
+        # Ranked full-text search runs in SQLite; results come from the live index
+        hits = self.db_manager.search_tasks(query, limit, columns=("id",))
+        with self.lock:
+            return [self.by_id[hit.id] for hit in hits if hit.id in self.by_id]
+
+    def count(self):
+        return len(self.order)
+
+    def get_row(self, index):
+        # Task at position `index` of the all-tasks list (newest due date first)
+        with self.lock:
+            if not 0 <= index < len(self.order):
+                return None
+            return self.by_id[self.order[-1 - index][1]]
+
+    def index_of(self, task):
+        with self.lock:
+            return len(self.order) - 1 - bisect_left(self.order, (task.due_date, task.id))
+
+    # -------------------- Writes --------------------
+
+    def _write(self, write, apply, callback):
+        if self.writer is None:
+            result = apply(write())
+            if callback:
+                callback(result, None)
+            return result
+
+        def done(future):
+            error = future.exception()
+            result = None if error else apply(future.result())
+            if callback:
+                callback(result, error)
+
+        future = self.writer.submit(write)
+        future.add_done_callback(lambda f: self.dispatch(done, f))
+        return future
+
+    def add(self, title, description, due_date, callback=None):
+        def write():
+            # Same transaction as the insert, so the row is always there
+            return self.db_manager.get_task(self.db_manager.add_task(title, description, due_date))
+
+        def apply(task):
+            with self.lock:
+                self._index(task)
+                insort(self.order, (task.due_date, task.id))
+            self.publish("add", task)
+            return task
+
+        return self._write(write, apply, callback)
+
+    def update(self, task_id, title, description, due_date, completed, callback=None):
+        def write():
+            self.db_manager.update_task(task_id, title, description, due_date, completed)
+            return self.db_manager.get_task(task_id)
+
+        def apply(row):
+            with self.lock:
+                previous = self.by_id.get(task_id)
+                if previous is None:
+                    if row is None:
+                        return None
+                    # Added by the command line or a sync after the store
+                    # loaded; it joins the store now
+                    task = row
+                else:
+                    # As stored: the database normalizes the due date
+                    source = row or Task(title=title, description=description, due_date=due_date,
+                                         completed=completed)
+                    task = type(previous)(**previous.as_dict())
+                    task.title = source.title
+                    task.description = source.description
+                    task.due_date = source.due_date
+                    task.completed = source.completed
+                    self._unindex(previous)
+                self._index(task)
+                self.by_date[task.due_date].sort(key=self._day_order)
+                insort(self.order, (task.due_date, task.id))
+            if previous is None:
+                self.publish("add", task)
+            else:
+                self.publish("update", task, previous)
+            return task
+
+        return self._write(write, apply, callback)
+
+    def delete(self, task_id, callback=None):
+        def write():
+            self.db_manager.delete_task(task_id)
+
+        def apply(_):
+            with self.lock:
+                task = self.by_id.get(task_id)
+                if task is None:
+                    return None
+                self._unindex(task)
+            self.publish("delete", task)
+            return task
+
+        return self._write(write, apply, callback)
+
+    # -------------------- Recurring tasks --------------------
+    # Each write reads its rule and exceptions back in the same transaction;
+    # _rule_changed swaps them into the store. Callbacks get the rule id.
+
+    def add_rule(self, title, description, frequency, start_date, interval=1, end_date=None,
+                 callback=None):
+        def write():
+            return self._read_rule(self.db_manager.add_task_rule(
+                title, description, frequency, start_date, interval, end_date
+            ))
+        return self._write(write, self._rule_changed, callback)
+
+    def set_occurrence_completed(self, rule_id, date, completed=True, callback=None):
+        def write():
+            self.db_manager.set_occurrence_completed(rule_id, date, completed)
+            return self._read_rule(rule_id)
+        return self._write(write, self._rule_changed, callback)
+
+    def skip_occurrence(self, rule_id, date, callback=None):
+        def write():
+            self.db_manager.skip_occurrence(rule_id, date)
+            return self._read_rule(rule_id)
+        return self._write(write, self._rule_changed, callback)
+
+    def delete_rule(self, rule_id, callback=None):
+        def write():
+            self.db_manager.delete_task_rule(rule_id)
+            return self._read_rule(rule_id)
+        return self._write(write, self._rule_changed, callback)
+
+    def _read_rule(self, rule_id):
+        # The rule is None once deleted
+        return rule_id, self.db_manager.get_task_rule(rule_id), self.db_manager.get_rule_exceptions(rule_id)
+
+    def _rule_changed(self, state):
+        rule_id, rule, exceptions = state
+        with self.lock:
+            if rule is None:
+                self.rules.pop(rule_id, None)
+            else:
+                self.rules[rule_id] = rule
+            self.exceptions = {key: value for key, value in self.exceptions.items() if key[0] != rule_id}
+            self.exceptions.update(exceptions)
+        self.publish_rule(rule_id)
+        return rule_id
@@ -3,113 +3,189 @@ import wx.adv
 import theme
 
 
+def report_write_error(task, error):
+    # TaskStore callback for writes whose dialog has already closed
+    if error is not None:
+        wx.MessageBox(f"Could not save the change: {error}", "Error", wx.OK | wx.ICON_ERROR)
+
+
+class VirtualTaskList(wx.ListCtrl):
+    # Virtual list over all tasks, reading rows straight from the TaskStore and
+    # patching only the rows touched by a store event
+    SEARCH_LIMIT = 200
+    
+    def __init__(self, parent, task_store):
+        super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+        self.task_store = task_store
+        # While searching, rows come from the ranked results instead of the store
+        self.search_query = ""
+        self.results = None
+        
+        self.InsertColumn(0, "Status", width=70)
+        self.InsertColumn(1, "Title", width=320)
+        self.InsertColumn(2, "Due Date", width=120)
+        
+        self.task_store.subscribe(self.on_task_event)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
+    
+    def on_destroy(self, event):
+        if event.GetEventObject() is self:
+            self.task_store.unsubscribe(self.on_task_event)
+        event.Skip()
+    
+    def refresh(self):
+        if self.search_query:
+            self.results = self.task_store.search(self.search_query, self.SEARCH_LIMIT)
+            self.SetItemCount(len(self.results))
+        else:
+            self.results = None
+            self.SetItemCount(self.task_store.count())
+        self.Refresh()
+    
+    def set_search(self, query):
+        self.search_query = query.strip()
+        self.refresh()
+    
+    def get_row(self, index):
+        if self.results is not None:
+            return self.results[index] if index < len(self.results) else None
+        return self.task_store.get_row(index)
+    
+    def on_task_event(self, action, task, previous):
+        if self.search_query:
+            self.refresh()
+            return
+        count = self.task_store.count()
+        if action == "update" and previous.due_date == task.due_date:
+            self.RefreshItem(self.task_store.index_of(task))
+            return
+        
+        # Rows shift from the first affected position downwards
+        positions = [self.task_store.index_of(t) for t in (task, previous) if t is not None]
+        first = max(0, min(positions))
+        self.SetItemCount(count)
+        if count:
+            self.RefreshItems(min(first, count - 1), count - 1)
+    
+    def get_task_id(self, index):
+        task = self.get_row(index)
+        return task.id if task else None
+    
+    def OnGetItemText(self, item, column):
+        task = self.get_row(item)
+        if task is None:
+            return ""
+        if column == 0:
+            return "✅" if task.completed else "⭕"
+        if column == 1:
+            return task.title
+        return task.due_date
+
+
 class TaskManager:
-    def __init__(self, parent, db_manager):
+    # Wait this long after the last keystroke before searching
+    SEARCH_DELAY_MS = 250
+    REPEAT_CHOICES = [("Never", None), ("Daily", "daily"), ("Weekly", "weekly"), ("Monthly", "monthly")]
+    
+    def __init__(self, parent, task_store):
         self.parent = parent
-        self.db_manager = db_manager
+        self.task_store = task_store
+        self.search_timer = None
     
-    def create_add_task_panel(self):
-        panel = wx.Panel(self.parent)
+    def create_add_task_panel(self, parent=None):
+        panel = wx.Panel(parent or self.parent)
         panel.SetBackgroundColour(theme.TASK_PANEL_BG)
         vbox = wx.BoxSizer(wx.VERTICAL)
         
-        # Title
-        title = wx.StaticText(panel, label="Add New Task")
-        title.SetFont(theme.FONT_SUBTITLE)
-        title.SetForegroundColour(theme.NORMAL_TEXT)
-        vbox.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
-        
-        # Create a white content panel for better contrast
-        content_panel = wx.Panel(panel)
-        content_panel.SetBackgroundColour(wx.WHITE)
-        content_vbox = wx.BoxSizer(wx.VERTICAL)
-        
-        # Task title
-        title_label = wx.StaticText(content_panel, label="Task Title:")
-        title_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        title_label.SetForegroundColour(theme.SUB_TEXT)
-        content_vbox.Add(title_label, 0, wx.ALL, 10)
-        
-        self.title_input = wx.TextCtrl(content_panel)
-        self.title_input.SetFont(theme.FONT_NORMAL)
-        content_vbox.Add(self.title_input, 0, wx.ALL | wx.EXPAND, 10)
-        
-        # Task description
-        desc_label = wx.StaticText(content_panel, label="Description:")
-        desc_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        desc_label.SetForegroundColour(theme.SUB_TEXT)
-        content_vbox.Add(desc_label, 0, wx.ALL, 10)
-        
-        self.desc_input = wx.TextCtrl(content_panel, style=wx.TE_MULTILINE, size=(-1, 100))
-        self.desc_input.SetFont(theme.FONT_NORMAL)
-        content_vbox.Add(self.desc_input, 0, wx.ALL | wx.EXPAND, 10)
-        
-        # Due date
-        date_label = wx.StaticText(content_panel, label="Due Date:")
-        date_label.SetFont(theme.get_font(12, wx.FONTWEIGHT_BOLD))
-        date_label.SetForegroundColour(theme.SUB_TEXT)
-        content_vbox.Add(date_label, 0, wx.ALL, 10)
-        
-        self.date_picker = wx.adv.DatePickerCtrl(content_panel, style=wx.adv.DP_DROPDOWN | wx.adv.DP_SHOWCENTURY)
-        content_vbox.Add(self.date_picker, 0, wx.ALL | wx.EXPAND, 10)
-        
-        # Add the content panel to main panel
-        content_panel.SetSizer(content_vbox)
-        vbox.Add(content_panel, 1, wx.ALL | wx.EXPAND, 10)
-        
-        # Add button
-        add_btn = wx.Button(panel, label="Add Task")
-        add_btn.SetBackgroundColour(theme.BUTTON_PRIMARY_BG)
-        add_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        add_btn.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        add_btn.SetMinSize((120, 35))
-        add_btn.Bind(wx.EVT_BUTTON, self.on_add_task)
-        
-        vbox.Add(add_btn, 0, wx.ALL | wx.ALIGN_CENTER, 10)
-        
-        panel.SetSizer(vbox)
-        panel.Layout()
+        with theme.building(panel):
+            # Title
+            vbox.Add(theme.label(panel, "Add New Task", theme.FONT_SUBTITLE), 0, wx.ALL | wx.ALIGN_CENTER, 15)
+            
+            # Create a white content panel for better contrast
+            content_panel = wx.Panel(panel)
+            content_panel.SetBackgroundColour(wx.WHITE)
+            content_vbox = wx.BoxSizer(wx.VERTICAL)
+            
+            self.title_input = theme.form_row(content_panel, content_vbox, "Task Title:",
+                                              wx.TextCtrl(content_panel))
+            self.title_input.SetFont(theme.FONT_NORMAL)
+            
+            self.desc_input = theme.form_row(content_panel, content_vbox, "Description:",
+                                             wx.TextCtrl(content_panel, style=wx.TE_MULTILINE, size=(-1, 100)))
+            self.desc_input.SetFont(theme.FONT_NORMAL)
+            
+            self.date_picker = theme.form_row(content_panel, content_vbox, "Due Date:", wx.adv.DatePickerCtrl(
+                content_panel, style=wx.adv.DP_DROPDOWN | wx.adv.DP_SHOWCENTURY))
+            
+            # Repeat: a recurring task is stored once as a rule, starting on the due date
+            repeat_sizer = wx.BoxSizer(wx.HORIZONTAL)
+            self.repeat_choice = wx.Choice(content_panel, choices=[name for name, _ in self.REPEAT_CHOICES])
+            self.repeat_choice.SetSelection(0)
+            self.repeat_choice.Bind(wx.EVT_CHOICE, self.on_repeat_changed)
+            repeat_sizer.Add(self.repeat_choice, 0, wx.RIGHT | wx.ALIGN_CENTER_VERTICAL, 10)
+            
+            repeat_sizer.Add(wx.StaticText(content_panel, label="every"), 0, wx.RIGHT | wx.ALIGN_CENTER_VERTICAL, 5)
+            self.interval_spin = wx.SpinCtrl(content_panel, min=1, max=365, initial=1, size=(70, -1))
+            repeat_sizer.Add(self.interval_spin, 0, wx.RIGHT | wx.ALIGN_CENTER_VERTICAL, 10)
+            
+            self.until_cb = wx.CheckBox(content_panel, label="until")
+            self.until_cb.Bind(wx.EVT_CHECKBOX, self.on_repeat_changed)
+            repeat_sizer.Add(self.until_cb, 0, wx.RIGHT | wx.ALIGN_CENTER_VERTICAL, 5)
+            self.until_picker = wx.adv.DatePickerCtrl(content_panel, style=wx.adv.DP_DROPDOWN | wx.adv.DP_SHOWCENTURY)
+            repeat_sizer.Add(self.until_picker, 0, wx.ALIGN_CENTER_VERTICAL)
+            content_vbox.Add(theme.field_label(content_panel, "Repeat:"), 0, wx.ALL, 10)
+            content_vbox.Add(repeat_sizer, 0, wx.ALL, 10)
+            self.on_repeat_changed()
+            
+            # Add the content panel to main panel
+            content_panel.SetSizer(content_vbox)
+            vbox.Add(content_panel, 1, wx.ALL | wx.EXPAND, 10)
+            
+            add_btn = theme.button(panel, "Add Task", self.on_add_task, theme.BUTTON_PRIMARY_BG, min_size=(120, 35))
+            vbox.Add(add_btn, 0, wx.ALL | wx.ALIGN_CENTER, 10)
+            
+            panel.SetSizer(vbox)
         return panel
     
-    def create_view_tasks_panel(self):
-        panel = wx.Panel(self.parent)
+    def create_view_tasks_panel(self, parent=None):
+        panel = wx.Panel(parent or self.parent)
         panel.SetBackgroundColour(theme.TASK_PANEL_BG)
         vbox = wx.BoxSizer(wx.VERTICAL)
         
-        # Title
-        title = wx.StaticText(panel, label="All Tasks")
-        title.SetFont(theme.FONT_SUBTITLE)
-        title.SetForegroundColour(theme.NORMAL_TEXT)
-        vbox.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
-        
-        # Create a white panel for the list
-        list_panel = wx.Panel(panel)
-        list_panel.SetBackgroundColour(wx.WHITE)
-        list_vbox = wx.BoxSizer(wx.VERTICAL)
-        
-        # Tasks list
-        self.tasks_list = wx.ListBox(list_panel, style=wx.LB_SINGLE | wx.LB_NEEDED_SB)
-        self.tasks_list.SetBackgroundColour(wx.WHITE)
-        self.tasks_list.SetFont(theme.FONT_NORMAL)
-        
-        self.tasks_list.Bind(wx.EVT_LISTBOX_DCLICK, self.on_task_selected)
-        list_vbox.Add(self.tasks_list, 1, wx.ALL | wx.EXPAND, 10)
-        
-        list_panel.SetSizer(list_vbox)
-        vbox.Add(list_panel, 1, wx.ALL | wx.EXPAND, 10)
-        
-        # Refresh button
-        refresh_btn = wx.Button(panel, label="Refresh")
-        refresh_btn.SetBackgroundColour(theme.BUTTON_SECONDARY_BG)
-        refresh_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        refresh_btn.SetFont(theme.FONT_NORMAL)
-        refresh_btn.SetMinSize((100, 35))
-        refresh_btn.Bind(wx.EVT_BUTTON, self.refresh_tasks)
-        
-        vbox.Add(refresh_btn, 0, wx.ALL | wx.ALIGN_CENTER, 10)
-        
-        panel.SetSizer(vbox)
-        panel.Layout()
+        with theme.building(panel):
+            # Title
+            vbox.Add(theme.label(panel, "All Tasks", theme.FONT_SUBTITLE), 0, wx.ALL | wx.ALIGN_CENTER, 15)
+            
+            # Search as you type
+            self.search_ctrl = wx.SearchCtrl(panel)
+            self.search_ctrl.SetDescriptiveText("Search tasks")
+            self.search_ctrl.ShowCancelButton(True)
+            self.search_ctrl.SetFont(theme.FONT_NORMAL)
+            self.search_ctrl.Bind(wx.EVT_TEXT, self.on_search_text)
+            self.search_ctrl.Bind(wx.EVT_SEARCHCTRL_CANCEL_BTN, lambda e: self.search_ctrl.SetValue(""))
+            vbox.Add(self.search_ctrl, 0, wx.LEFT | wx.RIGHT | wx.EXPAND, 10)
+            
+            # Create a white panel for the list
+            list_panel = wx.Panel(panel)
+            list_panel.SetBackgroundColour(wx.WHITE)
+            list_vbox = wx.BoxSizer(wx.VERTICAL)
+            
+            # Tasks list
+            self.tasks_list = VirtualTaskList(list_panel, self.task_store)
+            self.tasks_list.SetBackgroundColour(wx.WHITE)
+            self.tasks_list.SetFont(theme.FONT_NORMAL)
+            
+            self.tasks_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_task_selected)
+            list_vbox.Add(self.tasks_list, 1, wx.ALL | wx.EXPAND, 10)
+            
+            list_panel.SetSizer(list_vbox)
+            vbox.Add(list_panel, 1, wx.ALL | wx.EXPAND, 10)
+            
+            refresh_btn = theme.button(panel, "Refresh", self.refresh_tasks, font=theme.FONT_NORMAL,
+                                       min_size=(100, 35))
+            vbox.Add(refresh_btn, 0, wx.ALL | wx.ALIGN_CENTER, 10)
+            
+            panel.SetSizer(vbox)
         self.refresh_tasks()
         return panel
     
@@ -122,47 +198,88 @@ class TaskManager:
             wx.MessageBox("Please enter a task title!", "Error", wx.OK | wx.ICON_ERROR)
             return
         
-        self.db_manager.add_task(title, description, due_date)
+        frequency = self.REPEAT_CHOICES[self.repeat_choice.GetSelection()][1]
+        if frequency is None:
+            self.task_store.add(title, description, due_date, callback=self.on_task_added)
+            return
+        
+        end_date = self.until_picker.GetValue().FormatISODate() if self.until_cb.GetValue() else None
+        if end_date is not None and end_date < due_date:
+            wx.MessageBox("The repeat end date is before the due date!", "Error", wx.OK | wx.ICON_ERROR)
+            return
+        self.task_store.add_rule(title, description, frequency, due_date, self.interval_spin.GetValue(),
+                                 end_date, callback=self.on_task_added)
+    
+    def on_repeat_changed(self, event=None):
+        repeating = self.repeat_choice.GetSelection() > 0
+        self.interval_spin.Enable(repeating)
+        self.until_cb.Enable(repeating)
+        self.until_picker.Enable(repeating and self.until_cb.GetValue())
+    
+    def on_task_added(self, task, error):
+        # Called once the write has committed and the task store has the row
+        if error is not None:
+            wx.MessageBox(f"Could not add the task: {error}", "Error", wx.OK | wx.ICON_ERROR)
+            return
         wx.MessageBox("Task added successfully!", "Success", wx.OK | wx.ICON_INFORMATION)
+        if not self.title_input:
+            return
         
         # Clear inputs
         self.title_input.SetValue("")
         self.desc_input.SetValue("")
+        self.repeat_choice.SetSelection(0)
+        self.interval_spin.SetValue(1)
+        self.until_cb.SetValue(False)
+        self.on_repeat_changed()
     
     def refresh_tasks(self, event=None):
-        self.tasks_list.Clear()
-        tasks = self.db_manager.get_all_tasks()
-        for task in tasks:
-            status = "✅" if task[4] else "⭕"
-            display_text = f"{status} {task[1]} {task[3]}"
-            # Store task ID as client data
-            self.tasks_list.Append(display_text)
-            # Set client data for the last appended item
-            self.tasks_list.SetClientData(self.tasks_list.GetCount() - 1, task[0])
+        # Rows are read from the task store as they scroll into view
+        self.tasks_list.refresh()
+    
+    def on_search_text(self, event):
+        # Debounce: restart the countdown on every keystroke
+        if self.search_timer and self.search_timer.IsRunning():
+            self.search_timer.Restart(self.SEARCH_DELAY_MS)
+        else:
+            self.search_timer = wx.CallLater(self.SEARCH_DELAY_MS, self.run_search)
+    
+    def run_search(self):
+        if self.search_ctrl:
+            self.tasks_list.set_search(self.search_ctrl.GetValue())
     
     def on_task_selected(self, event):
-        selection = self.tasks_list.GetSelection()
+        selection = event.GetIndex()
         if selection == wx.NOT_FOUND:
             return
         
-        task_id = self.tasks_list.GetClientData(selection)
+        task_id = self.tasks_list.get_task_id(selection)
         if task_id is None:
             return
         
-        dialog = EditTaskDialog(self.parent, self, task_id)
-        if dialog.ShowModal() == wx.ID_OK:
-            self.refresh_tasks()
+        # The list patches itself from the store's update/delete events
+        self.edit_task(task_id)
+    
+    def edit_task(self, task_id, parent=None):
+        # Reads the whole row: the store keeps only the list columns and may
+        # not know the task at all (added by the command line or a sync)
+        task = self.task_store.db_manager.get_task(task_id)
+        if task is None:
+            wx.MessageBox("This task no longer exists.", "Edit Task", wx.OK | wx.ICON_INFORMATION)
+            return
+        dialog = EditTaskDialog(parent or self.parent, self, task)
+        dialog.ShowModal()
         dialog.Destroy()
 
 
 class EditTaskDialog(wx.Dialog):
-    def __init__(self, parent, task_manager, task_id):
+    def __init__(self, parent, task_manager, task):
         super().__init__(parent, title="Edit Task", size=(500, 400))
         self.task_manager = task_manager
-        self.task_id = task_id
-        self.task = self.task_manager.db_manager.get_task(task_id)
-        self.create_ui()
-        self.Layout()
+        self.task_id = task.id
+        self.task = task
+        with theme.building(self):
+            self.create_ui()
         self.Fit()  # Adjust size to fit contents
 
     def create_ui(self):
@@ -174,45 +291,29 @@ class EditTaskDialog(wx.Dialog):
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         
         # Title
-        title = wx.StaticText(panel, label="Edit Task")
-        title.SetFont(theme.FONT_SUBTITLE)
-        title.SetForegroundColour(theme.NORMAL_TEXT)
-        main_sizer.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
+        main_sizer.Add(theme.label(panel, "Edit Task", theme.FONT_SUBTITLE), 0, wx.ALL | wx.ALIGN_CENTER, 15)
         
         # Create a white content panel
         content_panel = wx.Panel(panel)
         content_panel.SetBackgroundColour(wx.WHITE)
         content_vbox = wx.BoxSizer(wx.VERTICAL)
         
-        # Task title
-        title_label = wx.StaticText(content_panel, label="Task Title:")
-        title_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        title_label.SetForegroundColour(theme.SUB_TEXT)
-        content_vbox.Add(title_label, 0, wx.ALL, 8)
-        
-        self.title_input = wx.TextCtrl(content_panel, value=self.task[1])
+        self.title_input = theme.form_row(content_panel, content_vbox, "Task Title:",
+                                          wx.TextCtrl(content_panel, value=self.task.title),
+                                          font=theme.FONT_BUTTON, border=8)
         self.title_input.SetFont(theme.FONT_NORMAL)
-        content_vbox.Add(self.title_input, 0, wx.ALL | wx.EXPAND, 8)
         
-        # Task description
-        desc_label = wx.StaticText(content_panel, label="Description:")
-        desc_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        desc_label.SetForegroundColour(theme.SUB_TEXT)
-        content_vbox.Add(desc_label, 0, wx.ALL, 8)
-        
-        self.desc_input = wx.TextCtrl(content_panel, value=self.task[2] or "", 
-                                     style=wx.TE_MULTILINE, size=(-1, 60))
+        self.desc_input = theme.form_row(content_panel, content_vbox, "Description:",
+                                         wx.TextCtrl(content_panel, value=self.task.description or "",
+                                                     style=wx.TE_MULTILINE, size=(-1, 60)),
+                                         font=theme.FONT_BUTTON, border=8)
         self.desc_input.SetFont(theme.FONT_NORMAL)
-        content_vbox.Add(self.desc_input, 0, wx.ALL | wx.EXPAND, 8)
         
         # Due date
-        date_label = wx.StaticText(content_panel, label="Due Date:")
-        date_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        date_label.SetForegroundColour(theme.SUB_TEXT)
-        content_vbox.Add(date_label, 0, wx.ALL, 8)
+        content_vbox.Add(theme.field_label(content_panel, "Due Date:", theme.FONT_BUTTON), 0, wx.ALL, 8)
         
         # Try to parse the date from the task
-        due_date = self.task[3]
+        due_date = self.task.due_date
         
         # Create date picker with compact size
         self.date_picker = wx.adv.DatePickerCtrl(content_panel, 
@@ -240,7 +341,7 @@ class EditTaskDialog(wx.Dialog):
         # Completed checkbox
         self.completed_cb = wx.CheckBox(content_panel, label="Task Completed")
         self.completed_cb.SetFont(theme.FONT_NORMAL)
-        self.completed_cb.SetValue(bool(self.task[4]))
+        self.completed_cb.SetValue(bool(self.task.completed))
         content_vbox.Add(self.completed_cb, 0, wx.ALL, 15)
         
         content_panel.SetSizer(content_vbox)
@@ -249,29 +350,12 @@ class EditTaskDialog(wx.Dialog):
         # Buttons
         button_sizer = wx.BoxSizer(wx.HORIZONTAL)
         
-        save_btn = wx.Button(panel, label="Save")
-        delete_btn = wx.Button(panel, label="Delete")
-        cancel_btn = wx.Button(panel, label="Cancel")
-        
-        # Style buttons
-        save_btn.SetBackgroundColour(theme.BUTTON_PRIMARY_BG)
-        save_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        save_btn.SetFont(theme.FONT_NORMAL)
-        save_btn.SetMinSize((80, 30))
-        
-        delete_btn.SetBackgroundColour(theme.BUTTON_WARNING_BG)
-        delete_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        delete_btn.SetFont(theme.FONT_NORMAL)
-        delete_btn.SetMinSize((80, 30))
-        
-        cancel_btn.SetBackgroundColour(theme.BUTTON_SECONDARY_BG)
-        cancel_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        cancel_btn.SetFont(theme.FONT_NORMAL)
-        cancel_btn.SetMinSize((80, 30))
-        
-        save_btn.Bind(wx.EVT_BUTTON, self.on_save)
-        delete_btn.Bind(wx.EVT_BUTTON, self.on_delete)
-        cancel_btn.Bind(wx.EVT_BUTTON, lambda e: self.EndModal(wx.ID_CANCEL))
+        save_btn = theme.button(panel, "Save", self.on_save, theme.BUTTON_PRIMARY_BG,
+                                theme.FONT_NORMAL, (80, 30))
+        delete_btn = theme.button(panel, "Delete", self.on_delete, theme.BUTTON_WARNING_BG,
+                                  theme.FONT_NORMAL, (80, 30))
+        cancel_btn = theme.button(panel, "Cancel", lambda e: self.EndModal(wx.ID_CANCEL),
+                                  theme.BUTTON_SECONDARY_BG, theme.FONT_NORMAL, (80, 30))
         
         button_sizer.Add(save_btn, 0, wx.ALL, 5)
         button_sizer.Add(delete_btn, 0, wx.ALL, 5)
@@ -280,13 +364,11 @@ class EditTaskDialog(wx.Dialog):
         main_sizer.Add(button_sizer, 0, wx.ALL | wx.ALIGN_CENTER, 10)
         
         panel.SetSizer(main_sizer)
-        panel.Layout()
 
         # Set the dialog's sizer to include the panel (this fixes the expansion issue)
         dialog_sizer = wx.BoxSizer(wx.VERTICAL)
         dialog_sizer.Add(panel, 1, wx.EXPAND)
         self.SetSizer(dialog_sizer)
-        self.Layout()
 
     def on_save(self, event):
         title = self.title_input.GetValue().strip()
@@ -298,12 +380,14 @@ class EditTaskDialog(wx.Dialog):
             wx.MessageBox("Please enter a task title!", "Error", wx.OK | wx.ICON_ERROR)
             return
         
-        self.task_manager.db_manager.update_task(self.task_id, title, description, due_date, completed)
+        # The dialog closes right away; the list updates once the write commits
+        self.task_manager.task_store.update(self.task_id, title, description, due_date, completed,
+                                            callback=report_write_error)
         self.EndModal(wx.ID_OK)
     
     def on_delete(self, event):
         confirm = wx.MessageBox("Are you sure you want to delete this task?", "Confirm Delete", 
                               wx.YES_NO | wx.ICON_QUESTION)
         if confirm == wx.YES:
-            self.task_manager.db_manager.delete_task(self.task_id)
+            self.task_manager.task_store.delete(self.task_id, callback=report_write_error)
             self.EndModal(wx.ID_OK)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import sqlite3
+
+# The schema as the app created it before there were migrations
+BASELINE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        due_date TEXT NOT NULL,
+        completed INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS emotional_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        mood TEXT NOT NULL,
+        day_rating INTEGER,
+        notes TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+'''
+
+
+def create_baseline(path, tasks=(), moods=()):
+    # tasks: (title, due_date); moods: (date, mood, day_rating), stored as
+    # typed, since the old app never validated them
+    conn = sqlite3.connect(str(path))
+    conn.executescript(BASELINE_SCHEMA)
+    conn.executemany("INSERT INTO tasks (title, description, due_date) VALUES (?, '', ?)", tasks)
+    conn.executemany("INSERT INTO emotional_entries (date, mood, day_rating, notes) VALUES (?, ?, ?, '')",
+                     moods)
+    conn.commit()
+    conn.close()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of modules run from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def make_db(tmp_path):
+    # make_db(name) opens (and migrates) tmp_path/name; all closed afterwards
+    opened = []
+
+    def make(name="app.db"):
+        db = DatabaseManager(str(tmp_path / name))
+        opened.append(db)
+        return db
+
+    yield make
+    for db in opened:
+        db.close()
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api_client import ZenQuotesAPI
+
+QUOTE = [{"q": "Small steps every day.", "a": "Somebody"}]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Answers with the server's current (status, body, delay)
+    def do_GET(self):
+        self.server.hits += 1
+        status, body, delay = self.server.reply
+        time.sleep(delay)
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    # A local stand-in for zenquotes.io on an ephemeral port
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.hits = 0
+    server.reply = (200, json.dumps(QUOTE), 0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(server, tmp_path):
+    api = ZenQuotesAPI(f"http://127.0.0.1:{server.server_address[1]}/api/today",
+                       str(tmp_path / "quote_cache.json"))
+    api.TIMEOUT = (1, 0.2)
+    yield api
+    api.session.close()
+
+
+def write_cache(api, quote, day):
+    with open(api.cache_path, "w", encoding="utf-8") as f:
+        json.dump({"date": day.isoformat(), "quote": quote}, f)
+
+
+def test_fetches_once_then_serves_the_cache(api, server):
+    expected = '"Small steps every day." - Somebody'
+    assert api.get_thought_of_day() == expected
+    assert api.get_thought_of_day() == expected
+    assert server.hits == 1
+    # A fresh client (the next start) reads it from disk
+    assert ZenQuotesAPI(api.base_url, api.cache_path).get_cached_thought() == expected
+
+
+def test_offline_start_never_touches_the_network(api, server):
+    write_cache(api, "Cached today", date.today())
+    server.shutdown()
+    assert api.get_thought_of_day() == "Cached today"
+    assert server.hits == 0
+
+
+@pytest.mark.parametrize("reply", [
+    (200, json.dumps(QUOTE), 1),   # slower than the read timeout
+    (500, "oops", 0),
+    (200, "not json", 0),
+    (200, "[]", 0),
+])
+def test_failures_fall_back_to_the_last_cached_quote(api, server, reply):
+    write_cache(api, "From yesterday", date.today() - timedelta(days=1))
+    server.reply = reply
+    assert api.get_thought_of_day() == "From yesterday"
+    assert server.hits == 1
+
+
+def test_failures_without_a_cache(api, server):
+    server.reply = (200, json.dumps(QUOTE), 1)
+    assert api.get_thought_of_day() == ZenQuotesAPI.OFFLINE_QUOTE
+    server.reply = (500, "oops", 0)
+    assert api.get_thought_of_day() == ZenQuotesAPI.FALLBACK_QUOTE
+
+
+def test_unreachable_server(tmp_path):
+    api = ZenQuotesAPI("http://127.0.0.1:9/api/today", str(tmp_path / "quote_cache.json"))
+    assert api.get_thought_of_day() == ZenQuotesAPI.OFFLINE_QUOTE
+
+
+def test_async_hands_the_quote_to_the_callback(api):
+    results = []
+    api.get_thought_of_day_async(results.append).join(5)
+    assert results == ['"Small steps every day." - Somebody']
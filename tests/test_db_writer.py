@@ -0,0 +1,114 @@
+import threading
+from datetime import date
+
+import pytest
+
+from db_writer import DatabaseWriter
+
+
+@pytest.fixture
+def db(make_db):
+    return make_db()
+
+
+@pytest.fixture
+def writer(db):
+    writer = DatabaseWriter(db)
+    yield writer
+    writer.close()
+
+
+def hold(writer, db, statements=None):
+    # Occupies the writer thread until the returned event is set, so the
+    # requests submitted meanwhile pile up into one batch
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        if statements is not None:
+            db.get_connection().set_trace_callback(statements.append)
+        started.set()
+        release.wait(5)
+
+    writer.submit(block)
+    assert started.wait(5)
+    return release
+
+
+def titles(db):
+    return sorted(task.title for task in db.get_all_tasks())
+
+
+def test_requests_queued_during_a_commit_share_one(db, writer):
+    statements = []
+    release = hold(writer, db, statements)
+    futures = [writer.submit(db.add_task, f"Task {i}", "", "2024-03-01") for i in range(10)]
+    release.set()
+    assert len({future.result(5) for future in futures}) == 10
+    # One transaction, each request in its own savepoint
+    assert statements.count("BEGIN IMMEDIATE") == 1
+    assert statements.count("SAVEPOINT sp1") == 10
+
+
+def test_a_failing_request_only_undoes_itself(db, writer):
+    def add_then_fail():
+        db.add_task("Doomed", "", "2024-03-01")
+        raise ValueError("no")
+
+    release = hold(writer, db)
+    before = writer.submit(db.add_task, "Before", "", "2024-03-01")
+    failing = writer.submit(add_then_fail)
+    after = writer.submit(db.add_task, "After", "", "2024-03-01")
+    release.set()
+    assert before.result(5) and after.result(5)
+    with pytest.raises(ValueError):
+        failing.result(5)
+    assert titles(db) == ["After", "Before"]
+
+
+def test_invalid_input_is_reported_to_its_caller(db, writer):
+    with pytest.raises(ValueError):
+        writer.submit(db.add_task, "Bad date", "", "2024-02-30").result(5)
+    assert writer.submit(db.add_task, "Good", "", "2024-02-29").result(5)
+    assert titles(db) == ["Good"]
+
+
+def test_submit_alone_runs_outside_a_transaction_in_order(db, writer):
+    in_transaction = lambda: db.get_connection().in_transaction  # noqa: E731
+    release = hold(writer, db)
+    added = writer.submit(db.add_task, "First", "", "2024-03-01")
+    alone = writer.submit_alone(lambda: (in_transaction(), titles(db)))
+    batched = writer.submit(in_transaction)
+    release.set()
+    assert added.result(5)
+    assert alone.result(5) == (False, ["First"])
+    assert batched.result(5) is True
+
+
+def test_archive_batches_and_compaction_through_the_writer(db, writer):
+    for day in range(1, 6):
+        task_id = db.add_task(f"Old {day}", "", f"2024-01-0{day}")
+        db.set_task_completed(task_id)
+    cutoff = db.archive_cutoff(30, date(2024, 6, 1))
+    assert writer.submit(db.archive_completed_batch, cutoff, 3).result(5) == 3
+    assert writer.submit(db.archive_completed_batch, cutoff, 3).result(5) == 2
+    assert writer.submit_alone(db.compact, max_pages=2000, convert=False).result(5) >= 0
+    assert db.count_archived_tasks() == 5
+
+
+def test_flush_async_resolves_after_earlier_writes(db, writer):
+    release = hold(writer, db)
+    writer.submit(db.add_task, "Saved", "", "2024-03-01")
+    flushed = writer.flush_async()
+    assert not flushed.done()
+    release.set()
+    flushed.result(5)
+    assert titles(db) == ["Saved"]
+
+
+def test_closed_writer_refuses_requests(db):
+    writer = DatabaseWriter(db)
+    future = writer.submit(db.add_task, "Last", "", "2024-03-01")
+    writer.close()
+    assert future.result(5)
+    with pytest.raises(RuntimeError):
+        writer.submit(db.add_task, "Too late", "", "2024-03-01")
@@ -0,0 +1,106 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from focus_log import FocusSessionLog
+
+
+@pytest.fixture
+def db(make_db):
+    return make_db()
+
+
+def session(log, label, started_at, minutes, **kwargs):
+    started_at = datetime.fromisoformat(started_at)
+    log.record(label, started_at, started_at + timedelta(minutes=minutes), 25 * 60, minutes * 60, **kwargs)
+
+
+def stored(db):
+    return db.get_connection().execute(
+        "SELECT label, started_at, actual_seconds, pauses, completed FROM focus_sessions ORDER BY id"
+    ).fetchall()
+
+
+def test_sessions_are_buffered_until_flushed(db):
+    log = FocusSessionLog(db, batch_size=100, flush_interval=60)
+    session(log, "Maths", "2024-03-04 09:00:00", 25, pauses=2)
+    session(log, None, "2024-03-04 10:00:00", 10, completed=False)
+    assert stored(db) == []
+    assert log.flush() == 2
+    assert stored(db) == [("Maths", "2024-03-04 09:00:00", 1500, 2, 1), ("", "2024-03-04 10:00:00", 600, 0, 0)]
+    log.close()
+
+
+def test_a_full_batch_is_written_in_the_background(db):
+    log = FocusSessionLog(db, batch_size=3, flush_interval=60)
+    for hour in range(3):
+        session(log, "Reading", f"2024-03-04 1{hour}:00:00", 20)
+    deadline = time.monotonic() + 5
+    while len(stored(db)) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(stored(db)) == 3
+    log.close()
+
+
+def test_close_writes_what_is_left(db):
+    log = FocusSessionLog(db, batch_size=100, flush_interval=60)
+    session(log, "Maths", "2024-03-04 09:00:00", 25)
+    log.close()
+    assert len(stored(db)) == 1
+
+
+def test_a_failed_write_keeps_the_sessions(db, monkeypatch):
+    log = FocusSessionLog(db, batch_size=100, flush_interval=60)
+    session(log, "Maths", "2024-03-04 09:00:00", 25)
+
+    def locked(rows):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(db, "add_focus_sessions", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        log.flush()
+    monkeypatch.undo()
+    session(log, "Maths", "2024-03-04 10:00:00", 25)
+    assert log.flush() == 2
+    assert [row[1] for row in stored(db)] == ["2024-03-04 09:00:00", "2024-03-04 10:00:00"]
+    log.close()
+
+
+def test_totals_by_day_week_and_label(db):
+    log = FocusSessionLog(db, batch_size=100, flush_interval=60)
+    # Tue 31 Dec and Thu 2 Jan share the Monday 30 Dec week; Mon 6 Jan starts the next
+    session(log, "Maths", "2024-12-31 23:50:00", 30)  # counts on the day it started
+    session(log, "Maths", "2025-01-02 09:00:00", 15)
+    session(log, "Essay", "2025-01-02 14:00:00", 60)
+    session(log, "Essay", "2025-01-06 08:00:00", 45)
+    log.close()
+    assert db.get_focus_by_day("2024-12-31", "2025-01-06") == [
+        ("2024-12-31", 1, 30.0), ("2025-01-02", 2, 75.0), ("2025-01-06", 1, 45.0),
+    ]
+    assert db.get_focus_by_week("2024-12-01", "2025-01-31") == [
+        ("2024-12-30", 3, 105.0), ("2025-01-06", 1, 45.0),
+    ]
+    assert db.get_focus_by_label("2024-12-01", "2025-01-31") == [("Essay", 2, 105.0), ("Maths", 2, 45.0)]
+    # Range bounds are inclusive days
+    assert db.get_focus_by_day("2025-01-02", "2025-01-02") == [("2025-01-02", 2, 75.0)]
+
+
+def test_sunday_closes_its_week(db):
+    db.add_focus_sessions([
+        ("", "2024-03-03 10:00:00", "2024-03-03 10:30:00", 1800, 1800, 0, 1),  # Sunday
+        ("", "2024-03-04 10:00:00", "2024-03-04 10:30:00", 1800, 1800, 0, 1),  # Monday
+    ])
+    assert [week for week, _, _ in db.get_focus_by_week("2024-03-01", "2024-03-31")] == [
+        "2024-02-26", "2024-03-04",
+    ]
+
+
+def test_empty_log(db):
+    log = FocusSessionLog(db, batch_size=100, flush_interval=60)
+    assert log.flush() == 0
+    log.close()
+    assert stored(db) == []
+    assert db.get_focus_by_day("2024-01-01", "2024-12-31") == []
+    assert db.get_focus_by_week("2024-01-01", "2024-12-31") == []
+    assert db.get_focus_by_label("2024-01-01", "2024-12-31") == []
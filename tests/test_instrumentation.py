@@ -0,0 +1,42 @@
+from datetime import date
+
+import pytest
+
+import instrumentation
+from database import DatabaseManager
+
+
+@pytest.fixture
+def instrumented():
+    instrumentation.METRICS.reset()
+    instrumentation.enable(gui=False)
+    yield instrumentation.METRICS
+    instrumentation.disable()
+    instrumentation.METRICS.reset()
+
+
+def test_static_methods_keep_working(instrumented, make_db):
+    assert isinstance(DatabaseManager.__dict__["archive_cutoff"], staticmethod)
+    db = make_db()
+    assert db.archive_cutoff(30, date(2024, 3, 31)) == "2024-03-01"
+    assert DatabaseManager.archive_cutoff(30, date(2024, 3, 31)) == "2024-03-01"
+    assert instrumented.snapshot()["db.archive_cutoff"]["calls"] == 2
+
+
+def test_archive_pass_with_instrumentation(instrumented, make_db):
+    db = make_db()
+    task_id = db.add_task("Old", "", "2024-01-01")
+    db.set_task_completed(task_id)
+    assert db.archive_completed_tasks(30, today=date(2024, 6, 1)) == 1
+    assert db.count_archived_tasks() == 1
+    metrics = instrumented.snapshot()
+    assert metrics["db.archive_completed_tasks"]["errors"] == 0
+    assert metrics["db.archive_cutoff"]["calls"] == 1
+
+
+def test_disable_restores_the_originals(make_db):
+    original = DatabaseManager.__dict__["archive_cutoff"]
+    instrumentation.enable(gui=False)
+    assert DatabaseManager.__dict__["archive_cutoff"] is not original
+    instrumentation.disable()
+    assert DatabaseManager.__dict__["archive_cutoff"] is original
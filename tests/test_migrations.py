@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import MIGRATIONS, DatabaseManager, split_statements
+
+from baseline import create_baseline
+
+
+def schema(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return sorted(conn.execute("SELECT type, name, sql FROM sqlite_master").fetchall())
+    finally:
+        conn.close()
+
+
+def test_baseline_database_is_migrated_and_keeps_its_rows(tmp_path, make_db):
+    path = tmp_path / "old.db"
+    create_baseline(path, tasks=[("Read", "2024-03-01"), ("Write", "2024/3/2")],
+                    moods=[("2024-03-01", "happy", 8)])
+    db = make_db("old.db")
+    assert db.schema_version() == len(MIGRATIONS)
+    tasks = sorted(db.get_all_tasks(), key=lambda t: t.id)
+    assert [(t.title, t.due_date) for t in tasks] == [("Read", "2024-03-01"), ("Write", "2024-03-02")]
+    # Existing rows become replicated rows with a stable identity
+    assert all(t.uuid and t.version == 1 for t in tasks)
+    assert len({t.uuid for t in tasks}) == 2
+    assert len(db.get_changes_since(0)[0]) == 3
+    assert db.search_tasks("read")[0].title == "Read"
+    # And the result matches a database created from scratch
+    make_db("new.db")
+    assert schema(path) == schema(tmp_path / "new.db")
+
+
+def test_migrated_database_accepts_new_rows(tmp_path, make_db):
+    create_baseline(tmp_path / "old.db", tasks=[("Read", "2024-03-01")])
+    db = make_db("old.db")
+    task_id = db.add_task("New", "", "2024-03-05")
+    assert db.get_task(task_id).uuid
+    with pytest.raises(ValueError):
+        db.add_task("Bad", "", "soon")
+
+
+def test_reopening_is_a_no_op(tmp_path, make_db):
+    create_baseline(tmp_path / "old.db", tasks=[("Read", "2024-03-01")])
+    first = make_db("old.db").get_all_tasks()
+    assert make_db("old.db").get_all_tasks() == first
+
+
+def test_concurrent_openers_migrate_once(tmp_path):
+    path = str(tmp_path / "old.db")
+    create_baseline(path, tasks=[("Read", "2024-03-01")])
+    errors = []
+
+    def open_db():
+        try:
+            DatabaseManager(path).close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_db) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    db = DatabaseManager(path)
+    try:
+        assert db.schema_version() == len(MIGRATIONS)
+        assert len(db.get_all_tasks()) == 1
+    finally:
+        db.close()
+
+
+def test_newer_schema_is_refused(tmp_path):
+    path = str(tmp_path / "future.db")
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {len(MIGRATIONS) + 1}")
+    conn.close()
+    with pytest.raises(RuntimeError):
+        DatabaseManager(path)
+
+
+def test_split_statements_keeps_trigger_bodies_whole():
+    script = '''
+        CREATE TABLE t (x TEXT DEFAULT 'a;b');  -- a comment; still one statement
+        CREATE TRIGGER t_insert AFTER INSERT ON t BEGIN
+            UPDATE t SET x = x || ';' WHERE rowid = NEW.rowid;
+        END;
+    '''
+    statements = list(split_statements(script))
+    assert len(statements) == 2
+    conn = sqlite3.connect(":memory:")
+    for statement in statements:
+        conn.execute(statement)
+    conn.execute("INSERT INTO t DEFAULT VALUES")
+    assert conn.execute("SELECT x FROM t").fetchone() == ("a;b;",)
@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from recurrence import DAILY, MONTHLY, WEEKLY, occurrences
+from task_store import TaskStore
+
+
+def dates(*args):
+    return list(occurrences(*args))
+
+
+def test_daily_with_interval_starts_on_the_rule_grid():
+    # Window opens between occurrences; the first one is the next on the grid
+    assert dates(DAILY, 3, date(2024, 1, 1), None, date(2024, 1, 5), date(2024, 1, 12)) == [
+        date(2024, 1, 7), date(2024, 1, 10),
+    ]
+
+
+def test_weekly_window_far_from_start():
+    result = dates(WEEKLY, 2, date(2000, 1, 3), None, date(2024, 6, 1), date(2024, 6, 30))
+    assert result == [date(2024, 6, 3), date(2024, 6, 17)]
+    assert all((day - date(2000, 1, 3)).days % 14 == 0 for day in result)
+
+
+def test_monthly_clamps_to_month_end_and_recovers():
+    assert dates(MONTHLY, 1, date(2024, 1, 31), None, date(2024, 1, 1), date(2024, 4, 30)) == [
+        date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30),
+    ]
+
+
+def test_monthly_interval():
+    assert dates(MONTHLY, 3, date(2023, 11, 15), None, date(2024, 1, 1), date(2024, 12, 31)) == [
+        date(2024, 2, 15), date(2024, 5, 15), date(2024, 8, 15), date(2024, 11, 15),
+    ]
+
+
+def test_end_date_and_window_bounds_are_inclusive():
+    assert dates(DAILY, 1, date(2024, 1, 1), date(2024, 1, 3), date(2024, 1, 3), date(2024, 1, 10)) == [
+        date(2024, 1, 3),
+    ]
+
+
+@pytest.mark.parametrize("window", [
+    (date(2023, 1, 1), date(2023, 12, 31)),  # before the rule starts
+    (date(2024, 2, 1), date(2024, 2, 28)),   # after it ends
+])
+def test_no_occurrences_outside_the_rule(window):
+    assert dates(WEEKLY, 1, date(2024, 1, 1), date(2024, 1, 31), *window) == []
+
+
+def test_unknown_frequency():
+    with pytest.raises(ValueError):
+        dates("yearly", 1, date(2024, 1, 1), None, date(2024, 1, 1), date(2024, 12, 31))
+
+
+def occurrence_rows(occurrences):
+    return [(o.rule_id, o.due_date, o.completed) for o in occurrences]
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    ("2024-02-30", None), ("2024/01/01", None), ("", None), ("2024-01-01", "tomorrow"),
+    ("2024-01-10", "2024-01-09"),
+])
+def test_rule_dates_are_validated(make_db, start_date, end_date):
+    db = make_db()
+    with pytest.raises(ValueError):
+        db.add_task_rule("Bad", "", DAILY, start_date, end_date=end_date)
+    assert db.get_task_rules() == []
+
+
+def test_store_expands_rules_in_memory(make_db, monkeypatch):
+    db = make_db()
+    db.add_task_rule("Before load", "", WEEKLY, "2024-01-01")
+    store = TaskStore(db)
+    daily = store.add_rule("Daily", "", DAILY, "2024-01-01", end_date="2024-01-31")
+    store.set_occurrence_completed(daily, "2024-01-02")
+    store.skip_occurrence(daily, "2024-01-03")
+    expected = occurrence_rows(db.iter_rule_occurrences("2024-01-01", "2024-01-08"))
+    counts = db.get_rule_occurrence_counts("2024-01-01", "2024-01-31")
+
+    # Reads never go back to SQLite
+    def no_query(*args, **kwargs):
+        raise AssertionError("queried the database")
+    monkeypatch.setattr(db, "get_connection", no_query)
+    assert occurrence_rows(store.get_occurrences("2024-01-01", "2024-01-08")) == expected
+    assert "Daily" not in {o.title for o in store.get_occurrences("2024-01-03", "2024-01-03")}
+    month = store.get_month_task_counts(2024, 1)
+    assert month == counts and month["2024-01-01"] == (2, 0) and month["2024-01-02"] == (0, 1)
+    monkeypatch.undo()
+
+    store.delete_rule(daily)
+    assert {o.title for o in store.get_occurrences("2024-01-01", "2024-01-31")} == {"Before load"}
+    assert store.exceptions == {}
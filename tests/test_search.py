@@ -0,0 +1,55 @@
+import pytest
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(make_db):
+    db = make_db()
+    db.add_task("Calculus homework", "integrals and series", "2024-03-01")
+    db.add_task("History essay", "draft the calculus of power chapter", "2024-03-02")
+    db.add_task("Read", "", "2024-03-03")
+    db.add_task("Reading list for calculus", "", "2024-03-04")
+    return db
+
+
+def titles(tasks):
+    return [task.title for task in tasks]
+
+
+def test_best_match_first(db):
+    # A title hit in a short document beats a passing mention in a long one
+    found = titles(db.search_tasks("calculus"))
+    assert set(found) == {"Calculus homework", "History essay", "Reading list for calculus"}
+    assert found[-1] == "History essay"
+
+
+def test_every_word_matches_as_a_prefix(db):
+    assert titles(db.search_tasks("calc hom")) == ["Calculus homework"]
+    assert set(titles(db.search_tasks("rea"))) == {"Read", "Reading list for calculus"}
+    assert set(titles(db.search_tasks("r"))) == {"Read", "Reading list for calculus"}
+    assert db.search_tasks("calculus essay homework") == []
+
+
+def test_limit(db):
+    assert len(db.search_tasks("calculus", limit=2)) == 2
+
+
+@pytest.mark.parametrize("query", ["", "   ", '"', "*", '""*', "NEAR", "NEAR(a b)", "AND",
+                                   "OR NOT", "-calculus", "title:read", "(", "don't", "a*b"])
+def test_odd_input_is_text_not_query_syntax(db, query):
+    # Never a syntax error; operators and punctuation are just words
+    assert isinstance(db.search_tasks(query), list)
+
+
+def test_quotes_and_stars_are_ignored(db):
+    assert titles(db.search_tasks('"calc*"')) == titles(db.search_tasks("calc"))
+
+
+def test_only_the_newest_matches_are_ranked(db, monkeypatch):
+    monkeypatch.setattr(DatabaseManager, "SEARCH_CANDIDATES", 1)
+    monkeypatch.setattr(DatabaseManager, "SEARCH_SHORT_CANDIDATES", 1)
+    # The limit still wins over a smaller candidate cap
+    assert len(db.search_tasks("calculus")) == 3
+    assert titles(db.search_tasks("calculus", limit=1)) == ["Reading list for calculus"]
+    assert titles(db.search_tasks("re", limit=1)) == ["Reading list for calculus"]
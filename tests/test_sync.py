@@ -0,0 +1,177 @@
+import io
+from datetime import date
+
+import pytest
+
+from sync import DatabasePeer, sync
+
+from baseline import create_baseline
+
+
+def task_rows(db, include_archived=False):
+    # Replica-independent view of the tasks: ids differ between files
+    return sorted((t.uuid, t.title, t.description, t.due_date, t.completed, t.version, t.site)
+                  for t in db.get_all_tasks(include_archived=include_archived))
+
+
+def both_ways(a, b):
+    # sync() pushes a's changes and pulls b's in one run
+    return sync(a, DatabasePeer(b))
+
+
+def edit_task(db, task_id, **values):
+    task = db.get_task(task_id, include_archived=True)
+    fields = {name: getattr(task, name) for name in ("title", "description", "due_date", "completed")}
+    fields.update(values)
+    db.update_task(task_id, fields["title"], fields["description"], fields["due_date"], fields["completed"])
+
+
+def id_of(db, uuid, include_archived=False):
+    return next(t.id for t in db.get_all_tasks(include_archived=include_archived) if t.uuid == uuid)
+
+
+@pytest.fixture
+def pair(make_db):
+    a, b = make_db("a.db"), make_db("b.db")
+    task_id = a.add_task("Essay", "draft", "2024-05-01")
+    a.add_emotional_entry("calm", 7, "", "2024-05-01")
+    both_ways(a, b)
+    return a, b, a.get_task(task_id).uuid
+
+
+def test_first_sync_copies_rows_and_second_is_empty(pair):
+    a, b, _ = pair
+    assert task_rows(a) == task_rows(b)
+    assert len(b.get_emotional_entries("2024-01-01", "2024-12-31")) == 1
+    report = both_ways(a, b)
+    assert (report.sent, report.received, report.rejected) == (0, 0, [])
+
+
+def test_changes_made_on_both_sides_meet(pair):
+    a, b, _ = pair
+    a.add_task("From a", "", "2024-05-02")
+    b.add_task("From b", "", "2024-05-03")
+    report = both_ways(b, a)
+    assert (report.sent, report.applied) == (1, 1)
+    assert task_rows(a) == task_rows(b)
+    assert {t.title for t in a.get_all_tasks()} == {"Essay", "From a", "From b"}
+
+
+@pytest.mark.parametrize("first", ["a", "b"])
+def test_concurrent_edits_converge_whoever_syncs_first(pair, first):
+    a, b, uuid = pair
+    edit_task(a, id_of(a, uuid), title="Essay (a)")
+    edit_task(b, id_of(b, uuid), title="Essay (b)")
+    if first == "a":
+        both_ways(a, b)
+    else:
+        both_ways(b, a)
+    assert task_rows(a) == task_rows(b)
+    # The higher (version, site) wins; both edits were version 2
+    winner = max([a, b], key=lambda db: db.get_site_id())
+    assert a.get_task(id_of(a, uuid)).title == ("Essay (a)" if winner is a else "Essay (b)")
+    # Settled: another run may re-read the edit from the other side but
+    # changes nothing
+    assert both_ways(a, b).applied == 0
+    assert task_rows(a) == task_rows(b)
+
+
+def test_later_edit_beats_an_older_one(pair):
+    a, b, uuid = pair
+    edit_task(a, id_of(a, uuid), title="v2")
+    edit_task(a, id_of(a, uuid), title="v3")
+    edit_task(b, id_of(b, uuid), title="other v2")
+    both_ways(b, a)
+    assert b.get_task(id_of(b, uuid)).title == "v3"
+    assert task_rows(a) == task_rows(b)
+
+
+@pytest.mark.parametrize("deleter", ["a", "b"])
+def test_delete_against_edit_converges(pair, deleter):
+    a, b, uuid = pair
+    deleting, editing = (a, b) if deleter == "a" else (b, a)
+    deleting.delete_task(id_of(deleting, uuid))
+    edit_task(editing, id_of(editing, uuid), completed=1)
+    both_ways(a, b)
+    both_ways(b, a)
+    assert task_rows(a) == task_rows(b)
+
+
+def test_delete_wins_over_an_older_edit(pair):
+    a, b, uuid = pair
+    edit_task(a, id_of(a, uuid), title="edited")
+    both_ways(a, b)
+    b.delete_task(id_of(b, uuid))
+    both_ways(a, b)
+    assert task_rows(a) == task_rows(b) == []
+
+
+def test_archiving_is_not_a_deletion(pair):
+    a, b, uuid = pair
+    edit_task(a, id_of(a, uuid), completed=1)
+    both_ways(a, b)
+    assert a.archive_completed_tasks(30, today=date(2024, 12, 1)) == 1
+    report = both_ways(a, b)
+    assert report.sent == 0
+    assert [t.uuid for t in b.get_all_tasks()] == [uuid]
+
+
+def test_edits_reach_archived_rows(pair):
+    a, b, uuid = pair
+    edit_task(a, id_of(a, uuid), completed=1)
+    both_ways(a, b)
+    a.archive_completed_tasks(30, today=date(2024, 12, 1))
+    edit_task(b, id_of(b, uuid), description="final")
+    assert both_ways(b, a).sent == 1
+    # Updated where it lives: still archived, not copied back to the live table
+    assert a.get_all_tasks() == []
+    assert a.get_task(id_of(a, uuid, True), include_archived=True).description == "final"
+    assert task_rows(a, include_archived=True) == task_rows(b)
+
+
+def test_archived_rows_reach_a_new_replica(pair, make_db):
+    a, b, uuid = pair
+    edit_task(a, id_of(a, uuid), completed=1)
+    a.archive_completed_tasks(30, today=date(2024, 12, 1))
+    c = make_db("c.db")
+    both_ways(c, a)
+    assert task_rows(c) == task_rows(a, include_archived=True)
+
+
+def test_legacy_rows_sync_and_a_bad_date_is_rejected_alone(tmp_path, make_db):
+    create_baseline(tmp_path / "legacy.db", tasks=[
+        ("ok", "2024-03-01"), ("slashes", "2024/1/5"), ("typo", "next tuesday"),
+    ])
+    legacy, fresh = make_db("legacy.db"), make_db("fresh.db")
+    report = both_ways(fresh, legacy)
+    assert report.applied == 2
+    assert [(side, table) for side, table, _, _ in report.rejected] == [("local", "tasks")]
+    assert sorted((t.title, t.due_date) for t in fresh.get_all_tasks()) == [
+        ("ok", "2024-03-01"), ("slashes", "2024-01-05"),
+    ]
+    # The watermark moved past it: the next run neither retries nor fails
+    report = both_ways(fresh, legacy)
+    assert (report.received, report.rejected) == (0, [])
+
+
+def test_sync_with_itself_is_refused(make_db):
+    db = make_db()
+    with pytest.raises(ValueError):
+        sync(db, DatabasePeer(make_db()))
+
+
+def test_imported_rows_are_logged_and_replicated(pair):
+    a, b, _ = pair
+    lines = ["title,due_date"] + [f"Imported {i},2024-06-{i % 28 + 1:02d}" for i in range(20)]
+    assert a.import_tasks(io.StringIO("\n".join(lines) + "\n")).inserted == 20
+    imported = [t for t in a.get_all_tasks() if t.title.startswith("Imported")]
+    assert all(t.uuid and t.version == 1 and t.site == a.get_site_id() for t in imported)
+    assert len({t.uuid for t in imported}) == 20
+    # The full-text index was filled set-based along with them
+    assert len(a.search_tasks("imported")) == 20
+    assert both_ways(a, b).sent == 20
+    assert task_rows(a) == task_rows(b)
+    # The insert trigger is back for ordinary writes
+    task_id = a.add_task("After", "", "2024-07-01")
+    assert a.get_task(task_id).version == 1
+    assert both_ways(a, b).sent == 1
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+import pytest
+
+from task_store import TaskStore
+
+TODAY = date(2024, 3, 15)
+
+
+@pytest.fixture
+def db(make_db):
+    return make_db()
+
+
+@pytest.fixture
+def store(db):
+    db.add_task("Loaded", "", "2024-03-10")
+    return TaskStore(db)
+
+
+def assert_counts_match(store, db, today=TODAY):
+    assert store.get_status_counts(today) == db.get_task_status_counts(today=today)
+
+
+def test_counts_follow_every_write(store, db):
+    assert_counts_match(store, db)
+    past = store.add("Past", "", "2024-03-01")
+    future = store.add("Future", "", "2024-03-20")
+    store.add("Today", "", TODAY.isoformat())
+    assert store.get_status_counts(TODAY) == {"pending": 2, "overdue": 2, "completed": 0, "total": 4}
+    assert_counts_match(store, db)
+
+    store.update(past.id, past.title, "", past.due_date, 1)
+    assert_counts_match(store, db)
+    store.update(future.id, "Moved back", "", "2024-03-02", 0)
+    assert_counts_match(store, db)
+    store.update(past.id, past.title, "", past.due_date, 0)
+    assert_counts_match(store, db)
+    store.delete(future.id)
+    assert store.get_status_counts(TODAY) == {"pending": 1, "overdue": 2, "completed": 0, "total": 3}
+    assert_counts_match(store, db)
+
+
+def test_archived_tasks_leave_the_counts(store, db):
+    old = store.add("Old", "", "2023-12-01")
+    store.update(old.id, old.title, "", old.due_date, 1)
+    store.add("Open but old", "", "2023-12-02")
+    assert db.archive_completed_tasks(30, today=TODAY) == 1
+    assert store.drop_archived(db.archive_cutoff(30, TODAY)) == 1
+    assert store.get_status_counts(TODAY)["completed"] == 0
+    assert_counts_match(store, db)
+
+
+def test_overdue_from_midnight(store, db):
+    due = TODAY.isoformat()
+    store.add("Due today", "", due)
+    counts = store.get_status_counts(TODAY)
+    tomorrow = store.get_status_counts(TODAY + timedelta(days=1))
+    assert tomorrow["overdue"] == counts["overdue"] + 1
+    assert tomorrow["pending"] == counts["pending"] - 1
+    for today in (TODAY, TODAY + timedelta(days=1)):
+        assert_counts_match(store, db, today)
+
+
+def test_update_of_a_task_added_behind_the_stores_back(store, db):
+    # e.g. by the command line or a sync after the store loaded
+    events = []
+    store.subscribe(lambda action, task, previous: events.append((action, task.title)))
+    task_id = db.add_task("Outside", "", "2024-03-01")
+    assert store.get(task_id) is None
+    task = store.update(task_id, "Outside, edited", "", "2024-03-01", 0)
+    assert store.get(task_id) is task and task.title == "Outside, edited"
+    assert events == [("add", "Outside, edited")]
+    assert_counts_match(store, db)
+
+
+def test_update_of_an_unknown_id_changes_nothing(store, db):
+    events = []
+    store.subscribe(lambda *args: events.append(args))
+    before = store.get_status_counts(TODAY)
+    assert store.update(999, "Nobody", "", "2024-03-01", 0) is None
+    assert store.get(999) is None and events == []
+    assert store.get_status_counts(TODAY) == before
+
+
+def test_update_indexes_the_due_date_as_stored(store, db):
+    task = store.add("Padded", "", "2024-03-05")
+    updated = store.update(task.id, task.title, "", " 2024-03-06 ", 0)
+    assert updated.due_date == "2024-03-06"
+    assert [t.id for t in store.get_tasks_by_date("2024-03-06")] == [task.id]
+    assert store.get_row(store.index_of(updated)) is updated
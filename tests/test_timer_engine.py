@@ -0,0 +1,94 @@
+import pytest
+
+from timer_engine import FINISHED, IDLE, PAUSED, RUNNING, CountdownTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def timer(clock):
+    timer = CountdownTimer(clock)
+    timer.set_duration(60)
+    return timer
+
+
+def test_counts_down_from_the_deadline(timer, clock):
+    assert timer.start()
+    assert timer.state == RUNNING
+    clock.now += 0.4
+    # Whole seconds round up, so the display stays at the full minute
+    assert timer.remaining_seconds() == 60
+    clock.now += 20
+    assert timer.remaining() == pytest.approx(39.6)
+    assert timer.progress() == pytest.approx(20.4 / 60)
+
+
+def test_tick_reports_completion_once(timer, clock):
+    timer.start()
+    clock.now += 59.9
+    assert not timer.tick()
+    # A late tick still finishes, without drift
+    clock.now += 5
+    assert timer.tick()
+    assert not timer.tick()
+    assert timer.state == FINISHED
+    assert timer.remaining() == 0
+
+
+def test_pause_and_resume_keep_remaining_time(timer, clock):
+    timer.start()
+    clock.now += 10
+    assert timer.pause() is False
+    assert timer.state == PAUSED
+    clock.now += 300
+    assert timer.remaining() == pytest.approx(50)
+    timer.start()
+    clock.now += 50
+    assert timer.tick()
+    assert timer.pause_count == 1
+
+
+def test_pause_after_the_deadline_finishes(timer, clock):
+    timer.start()
+    clock.now += 61
+    assert timer.pause() is True
+    assert timer.state == FINISHED
+    assert timer.pause_count == 0
+    assert timer.pause() is False
+
+
+def test_start_after_finish_restarts(timer, clock):
+    timer.start()
+    clock.now += 60
+    timer.tick()
+    assert timer.start()
+    assert timer.remaining() == 60
+
+
+def test_zero_duration_does_not_start(clock):
+    timer = CountdownTimer(clock)
+    timer.set_duration(0)
+    assert not timer.start()
+    assert timer.state == IDLE
+    assert timer.progress() == 0.0
+
+
+def test_reset(timer, clock):
+    timer.start()
+    clock.now += 10
+    timer.reset(90)
+    assert timer.state == IDLE
+    assert timer.remaining() == 90
+    timer.reset()
+    assert timer.total == 90
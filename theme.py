@@ -1,5 +1,6 @@
 # theme.py
 import wx
+from contextlib import contextmanager
 
 # ---- APP COLORS ----
 APP_BG = wx.Colour(245, 247, 250)        # light grey
@@ -29,8 +30,26 @@ HIGHLIGHT_COLOR = wx.Colour(240, 240, 240)
 
 BORDER_COLOR = wx.Colour(220, 220, 220)
 
-# Helper function for fonts
-def get_font(size=10, weight=wx.FONTWEIGHT_NORMAL, italic=False):
+# ---- STYLE REGISTRY ----
+# Fonts and colours are created once per distinct spec and then shared. wx
+# reference-counts them, so sharing is free as long as callers never modify a
+# returned object in place (copy it first with wx.Font(font) etc).
+_fonts = {}
+_colours = {}
+STYLE_STATS = {"created": 0, "reused": 0}
+
+
+def _cached(cache, key, factory):
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = factory()
+        STYLE_STATS["created"] += 1
+    else:
+        STYLE_STATS["reused"] += 1
+    return value
+
+
+def _new_font(size, weight, italic):
     font = wx.Font()
     font.SetPointSize(size)
     font.SetFamily(wx.FONTFAMILY_DEFAULT)
@@ -40,11 +59,68 @@ def get_font(size=10, weight=wx.FONTWEIGHT_NORMAL, italic=False):
         font.SetStyle(wx.FONTSTYLE_ITALIC)
     return font
 
+
+def get_font(size=10, weight=wx.FONTWEIGHT_NORMAL, italic=False):
+    return _cached(_fonts, (size, weight, italic), lambda: _new_font(size, weight, italic))
+
+
+def get_colour(red, green, blue):
+    return _cached(_colours, (red, green, blue), lambda: wx.Colour(red, green, blue))
+
+
 # Predefined fonts
 FONT_TITLE = get_font(18, wx.FONTWEIGHT_BOLD)
 FONT_SUBTITLE = get_font(14, wx.FONTWEIGHT_BOLD)
 FONT_NORMAL = get_font(10, wx.FONTWEIGHT_NORMAL)
 FONT_SMALL = get_font(9, wx.FONTWEIGHT_NORMAL)
+FONT_LABEL = get_font(12, wx.FONTWEIGHT_BOLD)
+FONT_BUTTON = get_font(11, wx.FONTWEIGHT_BOLD)
 
 BORDER_RADIUS = 8
 CONTENT_PADDING = 10
+
+
+# ---- BUILDERS ----
+# Shared styling for the widgets every page repeats. Build pages inside
+# `with building(panel):` so nothing repaints until the single final Layout.
+
+@contextmanager
+def building(window):
+    window.Freeze()
+    try:
+        yield window
+    finally:
+        window.Layout()
+        window.Thaw()
+
+
+def label(parent, text, font=FONT_NORMAL, colour=NORMAL_TEXT, style=0):
+    widget = wx.StaticText(parent, label=text, style=style)
+    widget.SetFont(font)
+    widget.SetForegroundColour(colour)
+    return widget
+
+
+def field_label(parent, text, font=FONT_LABEL):
+    # Bold grey caption above or beside a form control
+    return label(parent, text, font, SUB_TEXT)
+
+
+def button(parent, text, handler=None, background=BUTTON_SECONDARY_BG, font=FONT_BUTTON,
+           min_size=None):
+    widget = wx.Button(parent, label=text)
+    widget.SetBackgroundColour(background)
+    widget.SetForegroundColour(BUTTON_TEXT)
+    widget.SetFont(font)
+    if min_size:
+        widget.SetMinSize(min_size)
+    if handler:
+        widget.Bind(wx.EVT_BUTTON, handler)
+    return widget
+
+
+def form_row(parent, sizer, text, control, proportion=0, font=FONT_LABEL, border=10):
+    # Caption plus control stacked in a vertical sizer; returns the control
+    sizer.Add(field_label(parent, text, font), 0, wx.ALL, border)
+    sizer.Add(control, proportion, wx.ALL | wx.EXPAND, border)
+    return control
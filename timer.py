@@ -1,6 +1,8 @@
 import wx
 import os
+from datetime import datetime
 import theme
+from timer_engine import CountdownTimer, IDLE, FINISHED
 
 # Try to import platform-specific sound
 try:
@@ -11,15 +13,22 @@ except ImportError:
 
 
 class TimerPanel(wx.Panel):
-    def __init__(self, parent):
+    # Redraw interval; the countdown itself comes from the engine's deadline
+    TICK_MS = 200
+
+    def __init__(self, parent, focus_log=None):
         super().__init__(parent)
         self.SetBackgroundColour(theme.TIMER_PANEL_BG)
+        # Finished and abandoned sessions are handed to the (buffered) focus log
+        self.focus_log = focus_log
+        self.session_started_at = None
 
-        self.is_running = False
-        self.remaining_time = 0
-        self.total_time = 0
+        # The engine owns the countdown; this panel only renders it
+        self.engine = CountdownTimer()
+        self.shown_label = None
+        self.shown_progress = None
 
-        # wx Timer (better than threading)
+        # wx Timer only drives redraws, so a late tick can't skew the countdown
         self.timer = wx.Timer(self)
         self.Bind(wx.EVT_TIMER, self.run_timer, self.timer)
 
@@ -28,173 +37,139 @@ class TimerPanel(wx.Panel):
     def build_ui(self):
         vbox = wx.BoxSizer(wx.VERTICAL)
         
-        # Title
-        title = wx.StaticText(self, label="Focus Timer")
-        title.SetFont(theme.FONT_SUBTITLE)
-        title.SetForegroundColour(theme.NORMAL_TEXT)
-        vbox.Add(title, 0, wx.ALL | wx.ALIGN_CENTER, 15)
-        
-        # Timer display
-        self.timer_display = wx.StaticText(self, label="25:00", style=wx.ALIGN_CENTER)
-        self.timer_display.SetFont(wx.Font(48, wx.FONTFAMILY_DEFAULT,
-                                           wx.FONTSTYLE_NORMAL,
-                                           wx.FONTWEIGHT_BOLD))
-        self.timer_display.SetForegroundColour(theme.TIMER_COLOR)
-        vbox.Add(self.timer_display, 0, wx.ALL | wx.ALIGN_CENTER, 20)
-        
-        # Progress indicator
-        progress_sizer = wx.BoxSizer(wx.VERTICAL)
-        
-        progress_label = wx.StaticText(self, label="Progress:")
-        progress_label.SetFont(theme.FONT_SMALL)
-        progress_label.SetForegroundColour(theme.SUB_TEXT)
-        progress_sizer.Add(progress_label, 0, wx.ALL, 5)
-        
-        self.progress_gauge = wx.Gauge(self, range=100, size=(-1, 10))
-        self.progress_gauge.SetValue(0)
-        self.progress_gauge.SetBackgroundColour(wx.Colour(230, 230, 230))
-        self.progress_gauge.SetForegroundColour(theme.TIMER_COLOR)
-        progress_sizer.Add(self.progress_gauge, 0, wx.ALL | wx.EXPAND, 5)
-        
-        vbox.Add(progress_sizer, 0, wx.ALL | wx.EXPAND, 10)
-        
-        # Inputs in white panel
-        input_panel = wx.Panel(self)
-        input_panel.SetBackgroundColour(wx.WHITE)
-        grid = wx.FlexGridSizer(2, 2, 10, 10)
-        
-        minutes_label = wx.StaticText(input_panel, label="Minutes:")
-        minutes_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        minutes_label.SetForegroundColour(theme.SUB_TEXT)
-        grid.Add(minutes_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        
-        self.minutes_input = wx.SpinCtrl(input_panel, min=0, max=180, initial=25)
-        self.minutes_input.SetFont(theme.FONT_NORMAL)
-        grid.Add(self.minutes_input, 0, wx.EXPAND)
-        
-        seconds_label = wx.StaticText(input_panel, label="Seconds:")
-        seconds_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        seconds_label.SetForegroundColour(theme.SUB_TEXT)
-        grid.Add(seconds_label, 0, wx.ALIGN_CENTER_VERTICAL)
-        
-        self.seconds_input = wx.SpinCtrl(input_panel, min=0, max=59, initial=0)
-        self.seconds_input.SetFont(theme.FONT_NORMAL)
-        grid.Add(self.seconds_input, 0, wx.EXPAND)
-        
-        input_panel.SetSizer(grid)
-        vbox.Add(input_panel, 0, wx.ALL | wx.EXPAND, 10)
-        
-        # Description
-        desc_label = wx.StaticText(self, label="Timer Description:")
-        desc_label.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        desc_label.SetForegroundColour(theme.SUB_TEXT)
-        vbox.Add(desc_label, 0, wx.ALL, 5)
-        
-        desc_panel = wx.Panel(self)
-        desc_panel.SetBackgroundColour(wx.WHITE)
-        desc_sizer = wx.BoxSizer(wx.HORIZONTAL)
-        
-        self.desc_input = wx.TextCtrl(desc_panel, value="Focus Time")
-        self.desc_input.SetFont(theme.FONT_NORMAL)
-        desc_sizer.Add(self.desc_input, 1, wx.ALL | wx.EXPAND, 5)
-        
-        desc_panel.SetSizer(desc_sizer)
-        vbox.Add(desc_panel, 0, wx.ALL | wx.EXPAND, 5)
-        
-        # Buttons
-        hbox = wx.BoxSizer(wx.HORIZONTAL)
-        
-        self.start_btn = wx.Button(self, label="▶ Start")
-        self.pause_btn = wx.Button(self, label="⏸ Pause")
-        self.reset_btn = wx.Button(self, label="↺ Reset")
-        
-        # Style buttons
-        self.start_btn.SetBackgroundColour(theme.BUTTON_PRIMARY_BG)
-        self.start_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        self.start_btn.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        self.start_btn.SetMinSize((90, 35))
-        
-        self.pause_btn.SetBackgroundColour(theme.BUTTON_SECONDARY_BG)
-        self.pause_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        self.pause_btn.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        self.pause_btn.SetMinSize((90, 35))
-        
-        self.reset_btn.SetBackgroundColour(theme.BUTTON_SECONDARY_BG)
-        self.reset_btn.SetForegroundColour(theme.BUTTON_TEXT)
-        self.reset_btn.SetFont(theme.get_font(11, wx.FONTWEIGHT_BOLD))
-        self.reset_btn.SetMinSize((90, 35))
-        
-        self.start_btn.Bind(wx.EVT_BUTTON, self.on_start)
-        self.pause_btn.Bind(wx.EVT_BUTTON, self.on_pause)
-        self.reset_btn.Bind(wx.EVT_BUTTON, self.on_reset)
-        
-        hbox.Add(self.start_btn, 0, wx.ALL, 5)
-        hbox.Add(self.pause_btn, 0, wx.ALL, 5)
-        hbox.Add(self.reset_btn, 0, wx.ALL, 5)
-        
-        vbox.Add(hbox, 0, wx.ALIGN_CENTER | wx.TOP, 10)
-        
-        self.SetSizer(vbox)
+        with theme.building(self):
+            # Title
+            vbox.Add(theme.label(self, "Focus Timer", theme.FONT_SUBTITLE), 0, wx.ALL | wx.ALIGN_CENTER, 15)
+            
+            # Timer display
+            self.timer_display = theme.label(self, "25:00", theme.get_font(48, wx.FONTWEIGHT_BOLD),
+                                             theme.TIMER_COLOR, wx.ALIGN_CENTER)
+            vbox.Add(self.timer_display, 0, wx.ALL | wx.ALIGN_CENTER, 20)
+            
+            # Progress indicator
+            progress_sizer = wx.BoxSizer(wx.VERTICAL)
+            
+            progress_sizer.Add(theme.label(self, "Progress:", theme.FONT_SMALL, theme.SUB_TEXT), 0, wx.ALL, 5)
+            
+            self.progress_gauge = wx.Gauge(self, range=100, size=(-1, 10))
+            self.progress_gauge.SetValue(0)
+            self.progress_gauge.SetBackgroundColour(theme.get_colour(230, 230, 230))
+            self.progress_gauge.SetForegroundColour(theme.TIMER_COLOR)
+            progress_sizer.Add(self.progress_gauge, 0, wx.ALL | wx.EXPAND, 5)
+            
+            vbox.Add(progress_sizer, 0, wx.ALL | wx.EXPAND, 10)
+            
+            # Inputs in white panel
+            input_panel = wx.Panel(self)
+            input_panel.SetBackgroundColour(wx.WHITE)
+            grid = wx.FlexGridSizer(2, 2, 10, 10)
+            
+            grid.Add(theme.field_label(input_panel, "Minutes:", theme.FONT_BUTTON), 0, wx.ALIGN_CENTER_VERTICAL)
+            
+            self.minutes_input = wx.SpinCtrl(input_panel, min=0, max=180, initial=25)
+            self.minutes_input.SetFont(theme.FONT_NORMAL)
+            grid.Add(self.minutes_input, 0, wx.EXPAND)
+            
+            grid.Add(theme.field_label(input_panel, "Seconds:", theme.FONT_BUTTON), 0, wx.ALIGN_CENTER_VERTICAL)
+            
+            self.seconds_input = wx.SpinCtrl(input_panel, min=0, max=59, initial=0)
+            self.seconds_input.SetFont(theme.FONT_NORMAL)
+            grid.Add(self.seconds_input, 0, wx.EXPAND)
+            
+            input_panel.SetSizer(grid)
+            vbox.Add(input_panel, 0, wx.ALL | wx.EXPAND, 10)
+            
+            # Description
+            vbox.Add(theme.field_label(self, "Timer Description:", theme.FONT_BUTTON), 0, wx.ALL, 5)
+            
+            desc_panel = wx.Panel(self)
+            desc_panel.SetBackgroundColour(wx.WHITE)
+            desc_sizer = wx.BoxSizer(wx.HORIZONTAL)
+            
+            self.desc_input = wx.TextCtrl(desc_panel, value="Focus Time")
+            self.desc_input.SetFont(theme.FONT_NORMAL)
+            desc_sizer.Add(self.desc_input, 1, wx.ALL | wx.EXPAND, 5)
+            
+            desc_panel.SetSizer(desc_sizer)
+            vbox.Add(desc_panel, 0, wx.ALL | wx.EXPAND, 5)
+            
+            # Buttons
+            hbox = wx.BoxSizer(wx.HORIZONTAL)
+            
+            self.start_btn = theme.button(self, "▶ Start", self.on_start, theme.BUTTON_PRIMARY_BG,
+                                          min_size=(90, 35))
+            self.pause_btn = theme.button(self, "⏸ Pause", self.on_pause, min_size=(90, 35))
+            self.reset_btn = theme.button(self, "↺ Reset", self.on_reset, min_size=(90, 35))
+            
+            hbox.Add(self.start_btn, 0, wx.ALL, 5)
+            hbox.Add(self.pause_btn, 0, wx.ALL, 5)
+            hbox.Add(self.reset_btn, 0, wx.ALL, 5)
+            
+            vbox.Add(hbox, 0, wx.ALIGN_CENTER | wx.TOP, 10)
+            
+            self.SetSizer(vbox)
 
     # -------------------- Buttons --------------------
 
     def on_start(self, event):
-        if self.remaining_time <= 0:
+        if self.engine.state in (IDLE, FINISHED):
             minutes = self.minutes_input.GetValue()
             seconds = self.seconds_input.GetValue()
-            self.remaining_time = (minutes * 60) + seconds
-            self.total_time = self.remaining_time
-            
-            # Reset progress gauge
-            if hasattr(self, 'progress_gauge'):
-                self.progress_gauge.SetValue(0)
+            self.engine.set_duration((minutes * 60) + seconds)
+            self.session_started_at = datetime.now()
 
-        if self.remaining_time == 0:
+        if not self.engine.start():
             wx.MessageBox("Set a time greater than 0.", "Error")
             return
 
-        self.is_running = True
         self.start_btn.SetLabel("▶ Resume")
-        self.timer.Start(1000)   # 1 second interval
+        self.update_display()
+        self.timer.Start(self.TICK_MS)
 
     def on_pause(self, event):
-        self.is_running = False
+        finished = self.engine.pause()
         self.timer.Stop()
+        self.update_display()
+        if finished:
+            self.timer_complete()
 
     def on_reset(self, event):
-        self.is_running = False
         self.timer.Stop()
+        if self.engine.tick():
+            # Ran out before the tick that would have noticed
+            self.update_display()
+            self.timer_complete()
+        elif self.engine.state not in (IDLE, FINISHED):
+            self.log_session(completed=False)
 
         minutes = self.minutes_input.GetValue()
         seconds = self.seconds_input.GetValue()
 
-        self.remaining_time = (minutes * 60) + seconds
-        self.update_display(self.remaining_time)
+        self.engine.reset((minutes * 60) + seconds)
+        self.update_display()
         self.start_btn.SetLabel("▶ Start")
-        
-        # Reset progress gauge
-        if hasattr(self, 'progress_gauge'):
-            self.progress_gauge.SetValue(0)
 
     # -------------------- Timer --------------------
 
     def run_timer(self, event):
-        if self.remaining_time > 0 and self.is_running:
-            self.update_display(self.remaining_time)
-            self.remaining_time -= 1
-        else:
+        finished = self.engine.tick()
+        self.update_display()
+        if finished:
             self.timer.Stop()
             self.timer_complete()
 
-    def update_display(self, seconds):
-        mins = seconds // 60
-        secs = seconds % 60
-        self.timer_display.SetLabel(f"{mins:02d}:{secs:02d}")
-        
-        # Update progress gauge if total_time > 0
-        if hasattr(self, 'progress_gauge') and self.total_time > 0:
-            progress = int(((self.total_time - seconds) / self.total_time) * 100)
+    def update_display(self):
+        # Only touch the widgets when what they show actually changes
+        seconds = self.engine.remaining_seconds()
+        label = f"{seconds // 60:02d}:{seconds % 60:02d}"
+        if label != self.shown_label:
+            self.timer_display.SetLabel(label)
+            self.shown_label = label
+
+        progress = int(self.engine.progress() * 100)
+        if progress != self.shown_progress:
             self.progress_gauge.SetValue(progress)
+            self.shown_progress = progress
 
     # -------------------- Alarm --------------------
 
@@ -207,14 +182,20 @@ class TimerPanel(wx.Panel):
             # Cross platform fallback
             wx.Bell()
 
+    def log_session(self, completed):
+        if self.focus_log is None or self.session_started_at is None:
+            return
+        actual = self.engine.total - self.engine.remaining()
+        if actual > 0:
+            self.focus_log.record(
+                self.desc_input.GetValue().strip(), self.session_started_at, datetime.now(),
+                self.engine.total, actual, self.engine.pause_count, completed
+            )
+        self.session_started_at = None
+
     def timer_complete(self):
-        self.is_running = False
-        self.remaining_time = 0
         self.start_btn.SetLabel("▶ Start")
-        
-        # Set progress to 100%
-        if hasattr(self, 'progress_gauge'):
-            self.progress_gauge.SetValue(100)
+        self.log_session(completed=True)
 
         self.play_alarm()
 
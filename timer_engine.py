@@ -0,0 +1,82 @@
+import math
+import time
+
+IDLE = "idle"
+RUNNING = "running"
+PAUSED = "paused"
+FINISHED = "finished"
+
+
+class CountdownTimer:
+    # UI-independent countdown. Remaining time is derived from a monotonic
+    # deadline rather than counted ticks, so late or missed ticks never drift.
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.total = 0
+        self.state = IDLE
+        self.deadline = None
+        self.paused_remaining = 0.0
+        self.pause_count = 0
+
+    def set_duration(self, seconds):
+        self.total = max(0, int(seconds))
+        self.state = IDLE
+        self.deadline = None
+        self.paused_remaining = float(self.total)
+        self.pause_count = 0
+
+    def start(self):
+        # Starts a fresh countdown or resumes a paused one; returns False if
+        # there is nothing to count down
+        if self.state == RUNNING:
+            return True
+        if self.state == FINISHED:
+            self.set_duration(self.total)
+        if self.paused_remaining <= 0:
+            return False
+        self.deadline = self.clock() + self.paused_remaining
+        self.state = RUNNING
+        return True
+
+    def pause(self):
+        # Returns True if the countdown had already run out, in which case it
+        # is finished rather than paused and the caller must complete it
+        if self.state != RUNNING:
+            return False
+        if self.tick():
+            return True
+        self.paused_remaining = self.deadline - self.clock()
+        self.deadline = None
+        self.state = PAUSED
+        self.pause_count += 1
+        return False
+
+    def reset(self, seconds=None):
+        self.set_duration(self.total if seconds is None else seconds)
+
+    def tick(self):
+        # Call periodically; returns True exactly once, when the countdown ends
+        if self.state == RUNNING and self.clock() >= self.deadline:
+            self.state = FINISHED
+            self.deadline = None
+            self.paused_remaining = 0.0
+            return True
+        return False
+
+    def remaining(self):
+        if self.state == RUNNING:
+            return max(0.0, self.deadline - self.clock())
+        return self.paused_remaining
+
+    def remaining_seconds(self):
+        # Whole seconds for display: shows 25:00 until a full second has passed
+        return int(math.ceil(self.remaining() - 1e-9))
+
+    def progress(self):
+        if self.total <= 0:
+            return 0.0
+        return min(1.0, max(0.0, 1.0 - self.remaining() / self.total))
+
+    @property
+    def is_running(self):
+        return self.state == RUNNING
@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Each stall is written as a "#" header line followed by collapsed stacks
+# ("outer;inner;leaf count", root first), ready for flame graph tools:
+#   grep -v '^#' stalls.log | flamegraph.pl > stalls.svg
+
+
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StallWatchdog:
+    # Background thread that posts a heartbeat to the UI thread through `post`
+    # (wx.CallAfter in the GUI). If a heartbeat is not answered within
+    # `threshold` seconds the UI thread is stalled: its stack is sampled every
+    # `sample_interval` until it answers, then the samples go to the log.
+    def __init__(self, post, log_path="stalls.log", threshold=0.5, interval=0.1,
+                 sample_interval=0.01, thread_id=None, clock=time.monotonic):
+        self.post = post
+        self.log_path = log_path
+        self.threshold = threshold
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.clock = clock
+        self.answered = threading.Event()
+        self.stopping = threading.Event()
+        self.stalls = 0
+        self.thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _beat(self):
+        # Runs on the UI thread
+        self.answered.set()
+
+    def _run(self):
+        while not self.stopping.is_set():
+            self.answered.clear()
+            sent = self.clock()
+            try:
+                self.post(self._beat)
+            except Exception:
+                # The main loop is gone (application shutting down)
+                return
+            if not self.answered.wait(self.threshold):
+                self._sample_stall(sent)
+            self.stopping.wait(self.interval)
+
+    def _sample_stall(self, sent):
+        samples = Counter()
+        while not self.answered.is_set() and not self.stopping.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            samples[collapse_stack(frame)] += 1
+            del frame
+            self.answered.wait(self.sample_interval)
+        self.stalls += 1
+        self.write(self.clock() - sent, samples)
+
+    def write(self, duration, samples):
+        lines = [f"# stall {self.stalls}: {duration * 1000:.0f} ms at "
+                 f"{datetime.now().isoformat(timespec='seconds')}, {sum(samples.values())} samples"]
+        lines += [f"{stack} {count}" for stack, count in samples.most_common()]
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            pass
+
+    def stop(self):
+        self.stopping.set()
+        self.answered.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(1.0)